@@ -5,7 +5,11 @@ admin.site.register(Course)
 admin.site.register(Video)
 admin.site.register(VideoComment)
 admin.site.register(VideoViews)
+admin.site.register(VideoStats)
+admin.site.register(VideoViewer)
 admin.site.register(VideoLike)
+admin.site.register(VideoRecommendation)
+admin.site.register(SearchPosting)
 admin.site.register(SubscribeCourse)
 admin.site.register(Notification)
 admin.site.register(CommentLike)
@@ -0,0 +1,58 @@
+from django.db.models import Count, Exists, F, OuterRef, Window
+from django.db.models.functions import RowNumber
+
+from .models import CommentLike, VideoComment
+
+
+def active_comments(request, **filters):
+    """
+    Flat queryset of active comments with everything the comment serializers
+    read (author, like count, liked-by-user) resolved in the same query.
+    """
+    comments = (
+        VideoComment.active_objects.active()
+        .filter(**filters)
+        .select_related('user__user')
+        .annotate(likes_total=Count('likes'))
+        # Meta.ordering is dropped from aggregate queries
+        .order_by(*VideoComment._meta.ordering)
+    )
+    if request and request.user.is_authenticated:
+        comments = comments.annotate(
+            liked_by_user=Exists(
+                CommentLike.objects.filter(comment=OuterRef('pk'), user=request.user.profile)
+            )
+        )
+    return comments
+
+
+# replies shown under each top-level comment of a page; the rest, and deeper
+# levels, are paged through `comment/<id>/replies`
+REPLY_PREVIEW_SIZE = 3
+
+
+def active_threads(request, top_level, video, preview=REPLY_PREVIEW_SIZE):
+    """
+    Attach to each comment of a page of top-level comments its `preview`
+    newest active replies (as `active_replies`), loaded in one query.
+    `descendants_count` tells how many more there are.
+    """
+    top_level = list(top_level)
+    by_id = {comment.id: comment for comment in top_level}
+    for comment in top_level:
+        comment.video = video
+        comment.active_replies = []
+    if not top_level or preview <= 0:
+        return top_level
+
+    replies = active_comments(request, parent_id__in=by_id).annotate(
+        position=Window(
+            RowNumber(),
+            partition_by=F('parent_id'),
+            order_by=[F('created_dt').desc(nulls_last=True), F('id').desc()],
+        )
+    ).filter(position__lte=preview)
+    for reply in replies:
+        reply.video = video
+        by_id[reply.parent_id].active_replies.append(reply)
+    return top_level
@@ -0,0 +1,84 @@
+from django.db import models
+from rest_framework import serializers
+
+from .models import CommentLike, VideoLike
+
+
+class LikedState:
+    """
+    Which videos and comments the current profile liked, resolved for a
+    whole batch of ids with one query per kind and kept on the request so
+    every serializer of that request answers from the same sets.
+    """
+    models = {'video': VideoLike, 'comment': CommentLike}
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.resolved = {kind: set() for kind in self.models}
+        self.liked = {kind: set() for kind in self.models}
+
+    def prime(self, kind, ids):
+        ids = set(ids) - self.resolved[kind]
+        if not ids or self.profile is None:
+            return
+        field = f'{kind}_id'
+        self.liked[kind].update(
+            self.models[kind].objects.filter(user=self.profile, **{f'{field}__in': ids})
+            .values_list(field, flat=True)
+        )
+        self.resolved[kind].update(ids)
+
+    def is_liked(self, kind, object_id):
+        if self.profile is None:
+            return False
+        self.prime(kind, [object_id])
+        return object_id in self.liked[kind]
+
+    def as_dict(self, kind, ids):
+        self.prime(kind, ids)
+        return {str(object_id): object_id in self.liked[kind] for object_id in ids}
+
+
+def liked_state(request):
+    """The LikedState of this request (anonymous users like nothing)."""
+    if request is None:
+        return LikedState(None)
+    # kept on the underlying HttpRequest, shared by every DRF Request wrapping it
+    http_request = getattr(request, '_request', request)
+    state = getattr(http_request, '_liked_state', None)
+    if state is None:
+        user = request.user
+        state = LikedState(user.profile if user.is_authenticated else None)
+        http_request._liked_state = state
+    return state
+
+
+def unresolved_ids(items):
+    """
+    Ids of the items, and of every active reply already attached below them,
+    that don't carry a `liked_by_user` annotation from their own query.
+    """
+    ids = []
+    stack = list(items)
+    while stack:
+        item = stack.pop()
+        if not hasattr(item, 'liked_by_user'):
+            ids.append(item.id)
+        stack.extend(getattr(item, 'active_replies', ()))
+    return ids
+
+
+class LikedStateListSerializer(serializers.ListSerializer):
+    """
+    Resolves the liked state of the whole list before serializing its items.
+    The child declares `liked_kind`, and may define `liked_objects(items)`
+    when the liked objects are nested inside the items.
+    """
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        liked_objects = getattr(self.child, 'liked_objects', None)
+        ids = unresolved_ids(liked_objects(items) if liked_objects else items)
+        if ids:
+            liked_state(self.context.get('request')).prime(self.child.liked_kind, ids)
+        return super().to_representation(items)
@@ -0,0 +1,252 @@
+"""
+In-process load driver used by the run_load_benchmark command: requests go
+straight through the WSGI / ASGI application objects of core.wsgi and
+core.asgi, with a small cookie jar standing in for the browser.
+"""
+import asyncio
+import io
+import json
+import random
+import sys
+import time
+from http.cookies import SimpleCookie
+from urllib.parse import urlsplit
+
+import django
+
+# name -> (method, path template); {video} is one of the worker's videos
+ENDPOINTS = {
+    'courses': ('GET', '/api/courses_list'),
+    'video': ('GET', '/api/video/{video}'),
+    'comments': ('GET', '/api/video/{video}/comments'),
+    'like': ('PATCH', '/api/video/{video}/like'),
+    'view': ('PATCH', '/api/video/{video}/views'),
+    'check_auth': ('GET', '/users/check-auth/'),
+}
+DEFAULT_MIX = 'courses=25,video=25,comments=20,like=10,view=10,check_auth=10'
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"unknown endpoint {name!r}, expected one of {', '.join(ENDPOINTS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class CookieJar:
+    def __init__(self):
+        self.cookies = {}
+
+    def header(self):
+        return '; '.join(f'{name}={value}' for name, value in self.cookies.items())
+
+    def update(self, set_cookie_headers):
+        for header in set_cookie_headers:
+            cookie = SimpleCookie()
+            cookie.load(header)
+            for name, morsel in cookie.items():
+                if morsel['max-age'] == '0' or not morsel.value:
+                    self.cookies.pop(name, None)
+                else:
+                    self.cookies[name] = morsel.value
+
+
+class WSGIClient:
+    def __init__(self, host, remote_addr):
+        from core.wsgi import application
+        self.application = application
+        self.host = host
+        self.remote_addr = remote_addr
+        self.jar = CookieJar()
+
+    def request(self, method, path, body=None, remote_addr=None):
+        url = urlsplit(path)
+        payload = json.dumps(body).encode() if body is not None else b''
+        environ = {
+            'REQUEST_METHOD': method,
+            'PATH_INFO': url.path,
+            'QUERY_STRING': url.query,
+            'SERVER_NAME': self.host,
+            'SERVER_PORT': '443',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_HOST': self.host,
+            'HTTP_COOKIE': self.jar.header(),
+            'REMOTE_ADDR': remote_addr or self.remote_addr,
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(payload)),
+            'wsgi.input': io.BytesIO(payload),
+            'wsgi.errors': sys.stderr,
+            'wsgi.url_scheme': 'https',
+            'wsgi.version': (1, 0),
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = headers
+
+        chunks = self.application(environ, start_response)
+        try:
+            content = b''.join(chunks)
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+        self.jar.update(value for name, value in response['headers'] if name.lower() == 'set-cookie')
+        return response['status'], content
+
+
+class ASGIClient:
+    def __init__(self, host, remote_addr):
+        from core.asgi import application
+        self.application = application
+        self.host = host
+        self.remote_addr = remote_addr
+        self.jar = CookieJar()
+        self.loop = asyncio.new_event_loop()
+
+    def request(self, method, path, body=None, remote_addr=None):
+        return self.loop.run_until_complete(self.arequest(method, path, body, remote_addr))
+
+    async def arequest(self, method, path, body=None, remote_addr=None):
+        url = urlsplit(path)
+        payload = json.dumps(body).encode() if body is not None else b''
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': method,
+            'scheme': 'https',
+            'path': url.path,
+            'raw_path': url.path.encode(),
+            'query_string': url.query.encode(),
+            'headers': [
+                (b'host', self.host.encode()),
+                (b'cookie', self.jar.header().encode()),
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(payload)).encode()),
+            ],
+            'client': (remote_addr or self.remote_addr, 50000),
+            'server': (self.host, 443),
+        }
+        response = {'body': []}
+        received = asyncio.Event()
+        finished = asyncio.Event()
+
+        async def receive():
+            # the body once, then a disconnect only after the response is out
+            if not received.is_set():
+                received.set()
+                return {'type': 'http.request', 'body': payload, 'more_body': False}
+            await finished.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+                response['headers'] = message['headers']
+            elif message['type'] == 'http.response.body':
+                response['body'].append(message.get('body', b''))
+
+        try:
+            await self.application(scope, receive, send)
+        finally:
+            finished.set()
+        self.jar.update(value.decode() for name, value in response['headers'] if name.lower() == b'set-cookie')
+        return response['status'], b''.join(response['body'])
+
+    def close(self):
+        self.loop.close()
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples, wall_seconds):
+    """samples: (endpoint, seconds, status) -> per endpoint and overall throughput and percentiles (ms)."""
+    def report(rows):
+        latencies = sorted(seconds * 1000 for _, seconds, _ in rows)
+        return {
+            'requests': len(rows),
+            'errors': sum(1 for _, _, status in rows if status >= 400),
+            'throughput_rps': round(len(rows) / wall_seconds, 2) if wall_seconds else None,
+            'mean_ms': round(sum(latencies) / len(latencies), 2) if latencies else None,
+            'p50_ms': round(percentile(latencies, 0.50), 2) if latencies else None,
+            'p95_ms': round(percentile(latencies, 0.95), 2) if latencies else None,
+            'p99_ms': round(percentile(latencies, 0.99), 2) if latencies else None,
+            'max_ms': round(latencies[-1], 2) if latencies else None,
+        }
+
+    by_endpoint = {}
+    for sample in samples:
+        by_endpoint.setdefault(sample[0], []).append(sample)
+    return {
+        'overall': report(samples),
+        'endpoints': {name: report(rows) for name, rows in sorted(by_endpoint.items())},
+    }
+
+
+def setup_process():
+    # process pool initializer: spawned workers start without Django
+    django.setup()
+
+
+def run_worker(config):
+    """
+    Log in as `config['email']` and run `config['requests']` requests drawn
+    from the mix (after `config['warmup']` unmeasured ones). Returns the
+    measured (endpoint, seconds, status) samples.
+    """
+    from django.db import connections
+
+    from api.models import Video
+
+    client_class = WSGIClient if config['handler'] == 'wsgi' else ASGIClient
+    client = client_class(config['host'], f"10.0.{config['index'] // 256 % 256}.{config['index'] % 256}")
+    try:
+        status, content = client.request('POST', '/users/token/', {'email': config['email'], 'password': config['password']})
+        if status != 200:
+            raise RuntimeError(f"login as {config['email']} failed ({status}): {content[:200]!r}")
+
+        video_ids = list(
+            Video.objects.filter(
+                is_active=True, course__is_active=True,
+                course__subscriber__user__user__email=config['email'], course__subscriber__is_active=True,
+            ).values_list('id', flat=True)
+        )
+        if not video_ids:
+            raise RuntimeError(f"{config['email']} is not subscribed to any course with videos")
+
+        rng = random.Random(config['seed'])
+        names = list(config['mix'])
+        weights = [config['mix'][name] for name in names]
+        samples = []
+        for number in range(config['warmup'] + config['requests']):
+            name = rng.choices(names, weights)[0]
+            method, template = ENDPOINTS[name]
+            path = template.format(video=rng.choice(video_ids))
+            # a fresh address per view request so views aren't all deduplicated
+            remote_addr = f"10.{1 + config['index'] % 250}.{number // 256 % 256}.{number % 256}" if name == 'view' else None
+            started = time.perf_counter()
+            status, _ = client.request(method, path, remote_addr=remote_addr)
+            elapsed = time.perf_counter() - started
+            if number >= config['warmup']:
+                samples.append((name, elapsed, status))
+
+        # leave the account reusable by the next run
+        client.request('POST', '/users/logout/')
+        return samples
+    finally:
+        if hasattr(client, 'close'):
+            client.close()
+        connections.close_all()
@@ -0,0 +1,185 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from rest_framework import serializers
+from rest_framework.request import Request
+
+from api.comment_tree import REPLY_PREVIEW_SIZE, active_comments, active_threads
+from api.models import Course, Video, VideoComment
+from api.pagination import KeysetPagination
+from api.serializers import CommentSerializer, ProfileSerializerSpecific
+from users.models import Profile, User
+
+# fields both outputs carry for every comment they show
+COMPARED_FIELDS = ['id', 'author', 'content', 'created_dt', 'total_replies', 'likes_count', 'is_liked_by_user']
+
+
+class LegacyReplySerializer(serializers.ModelSerializer):
+    # the recursive serializer VideoCommentsView used before keyset paging:
+    # the whole active tree, with a few queries per node
+    author = ProfileSerializerSpecific(source='user', read_only=True)
+    replies = serializers.SerializerMethodField()
+    total_replies = serializers.SerializerMethodField()
+    likes_count = serializers.SerializerMethodField()
+    is_liked_by_user = serializers.SerializerMethodField()
+
+    class Meta:
+        model = VideoComment
+        fields = ['id', 'author', 'content', 'created_dt', 'replies', 'total_replies', 'likes_count', 'is_liked_by_user']
+
+    def get_replies(self, obj):
+        return LegacyReplySerializer(obj.replies.filter(is_active=True), many=True, context=self.context).data
+
+    def get_total_replies(self, obj):
+        def count_replies(comment):
+            replies = comment.replies.filter(is_active=True)
+            total = replies.count()
+            for reply in replies:
+                total += count_replies(reply)
+            return total
+
+        return count_replies(obj)
+
+    def get_likes_count(self, obj):
+        return obj.likes.count()
+
+    def get_is_liked_by_user(self, obj):
+        request = self.context.get('request', None)
+        if request and request.user.is_authenticated:
+            return obj.likes.filter(user=request.user.profile).exists()
+        return False
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark VideoCommentsView against comment tree size and depth, comparing the legacy "
+        "recursive serializer with the keyset page and reply previews the view serves now. "
+        "Runs in a rolled back transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10, 50, 200, 1000])
+        parser.add_argument('--depths', type=int, nargs='+', default=[1, 3, 8])
+        parser.add_argument('--top-level', type=int, default=5, help="top-level comments per tree")
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'size':>6} {'depth':>5} {'legacy q':>9} {'legacy ms':>10} {'view q':>7} {'view ms':>8}")
+        for size in options['sizes']:
+            for depth in options['depths']:
+                row = self.run_case(size, depth, options)
+                self.stdout.write(
+                    f"{size:>6} {depth:>5} {row['legacy_queries']:>9} {row['legacy_ms']:>10.1f} "
+                    f"{row['view_queries']:>7} {row['view_ms']:>8.1f}"
+                )
+
+    def run_case(self, size, depth, options):
+        with transaction.atomic():
+            request, video = self.build_tree(size, depth, options)
+
+            def legacy():
+                comments = VideoComment.active_objects.active().filter(video=video, parent__isnull=True)
+                return LegacyReplySerializer(comments, many=True, context={'request': request}).data
+
+            def view():
+                # what VideoCommentsView.list does for the first page
+                paginator = KeysetPagination()
+                page = paginator.paginate_queryset(
+                    active_comments(request, video=video, parent__isnull=True), request
+                )
+                threads = active_threads(request, page, video)
+                return CommentSerializer(threads, many=True, context={'request': request}).data
+
+            legacy_queries, legacy_ms, legacy_data = self.measure(legacy, options['repeat'])
+            view_queries, view_ms, view_data = self.measure(view, options['repeat'])
+            for problem in self.compare(legacy_data, view_data):
+                self.stderr.write(f"size={size} depth={depth}: {problem}")
+
+            transaction.set_rollback(True)
+
+        return {
+            'legacy_queries': legacy_queries, 'legacy_ms': legacy_ms,
+            'view_queries': view_queries, 'view_ms': view_ms,
+        }
+
+    def compare(self, legacy_data, view_data):
+        """
+        The view shows a page of the legacy top-level comments, each with the
+        newest REPLY_PREVIEW_SIZE of its direct replies; both must agree on them.
+        """
+        def fields(comment):
+            return {field: comment[field] for field in COMPARED_FIELDS}
+
+        def newest(replies):
+            return sorted(replies, key=lambda reply: (reply['created_dt'] or '', reply['id']), reverse=True)
+
+        legacy_by_id = {comment['id']: comment for comment in legacy_data}
+        for comment in view_data:
+            expected = legacy_by_id.get(comment['id'])
+            if expected is None:
+                yield f"comment {comment['id']} isn't in the legacy output"
+                continue
+            if fields(comment) != fields(expected):
+                yield f"comment {comment['id']} differs from the legacy output"
+            preview = [fields(reply) for reply in newest(expected['replies'])[:REPLY_PREVIEW_SIZE]]
+            if [fields(reply) for reply in comment['replies']] != preview:
+                yield f"the reply preview of comment {comment['id']} differs from the legacy replies"
+
+    def measure(self, serialize, repeat):
+        timings = []
+        for _ in range(repeat):
+            queries = []
+            with connection.execute_wrapper(lambda execute, *args: queries.append(1) or execute(*args)):
+                started = time.perf_counter()
+                data = serialize()
+                timings.append((time.perf_counter() - started) * 1000)
+        return len(queries), min(timings), data
+
+    def build_tree(self, size, depth, options):
+        rng = random.Random(options['seed'])
+        user = User(email=f"bench_{size}_{depth}@example.com", user_name=f"bench_{size}_{depth}")
+        user.set_unusable_password()
+        user.save()
+        profile = Profile.objects.create(user=user, full_name="bench")
+
+        course = Course.objects.create(title=f"bench {size}/{depth}")
+        video = Video.objects.create(title="bench", course=course, embed_code="-", author=profile)
+
+        top_count = min(options['top_level'], size)
+        levels = [[VideoComment(video=video, user=profile, content="top") for _ in range(top_count)]]
+        VideoComment.objects.bulk_create(levels[0])
+
+        # attach the remaining comments level by level; each reply picks a random parent
+        # among the comments that can still nest, so the deepest level reaches `depth`
+        remaining = size - top_count
+        candidates = list(levels[0])
+        per_level = max(1, remaining // max(depth, 1)) if depth else 0
+        for level in range(1, depth + 1):
+            if remaining <= 0:
+                break
+            count = remaining if level == depth else min(per_level, remaining)
+            replies = []
+            for _ in range(count):
+                parent = rng.choice(candidates)
+                replies.append(VideoComment(
+                    video=video, user=profile, content="reply",
+                    parent=parent, root_id=parent.root_id or parent.id,
+                ))
+            VideoComment.objects.bulk_create(replies)
+            levels.append(replies)
+            remaining -= count
+            candidates = replies
+
+        # bulk_create skips VideoComment.save, which keeps descendants_count
+        for level in reversed(levels[1:]):
+            for reply in level:
+                reply.parent.descendants_count += 1 + reply.descendants_count
+        VideoComment.objects.bulk_update([c for level in levels for c in level], ['descendants_count'])
+
+        request = Request(RequestFactory().get('/'))
+        request.user = user
+        return request, video
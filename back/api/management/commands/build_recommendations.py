@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.recommendations import build_recommendations, recommendation_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the related videos index (VideoRecommendation) from likes, views and "
+        "subscriptions. Run it periodically, e.g. nightly from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=None, help="videos stored per video, defaults to RECOMMENDATIONS['TOP_K']")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        conf = recommendation_settings()
+        if options['top_k']:
+            conf['TOP_K'] = options['top_k']
+
+        started = time.perf_counter()
+        rows = build_recommendations(conf, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored {rows} recommendation(s) in {time.perf_counter() - started:.1f}s."
+        ))
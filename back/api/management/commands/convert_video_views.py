@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.models import VideoViewer, VideoViews
+from api.stats import hash_viewer, rebuild_video_stats
+
+
+class Command(BaseCommand):
+    help = "Move the legacy VideoViews IP lists into hashed VideoViewer rows and rebuild the view counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--keep', action='store_true', help="don't clear the legacy IP lists after converting")
+
+    def handle(self, *args, **options):
+        legacy = VideoViews.objects.exclude(views=[]).order_by('id')
+        converted = 0
+        last_id = 0
+
+        while True:
+            batch = list(legacy.filter(id__gt=last_id)[:options['batch_size']])
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            with transaction.atomic():
+                for video_views in batch:
+                    viewers = {hash_viewer(ip) for ip in video_views.views if ip}
+                    VideoViewer.objects.bulk_create(
+                        [VideoViewer(video_id=video_views.video_id, viewer_hash=h) for h in viewers],
+                        ignore_conflicts=True,
+                    )
+                    if not options['keep']:
+                        video_views.views = []
+                        video_views.save(update_fields=['views'])
+
+                rebuild_video_stats([video_views.video_id for video_views in batch])
+            converted += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Converted view lists of {converted} video(s)."))
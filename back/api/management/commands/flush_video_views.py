@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api import view_buffer
+
+
+class Command(BaseCommand):
+    help = (
+        "Merge buffered video view hits into the database. Only useful with a shared "
+        "cache backend; the in-process cache is flushed by the web workers themselves."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="keep flushing every --interval seconds")
+        parser.add_argument('--interval', type=int, default=None)
+
+    def handle(self, *args, **options):
+        interval = options['interval'] or view_buffer.buffer_settings()['FLUSH_INTERVAL']
+
+        while True:
+            merged = view_buffer.flush()
+            self.stdout.write(f"Merged {merged} buffered view hit(s).")
+            if not options['loop']:
+                break
+            time.sleep(interval)
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.models import Video
+from api.stats import rebuild_video_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized per-video counters (likes, comments, views) from the source tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--video', type=int, nargs='*', help="only rebuild these video ids")
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        video_ids = Video.objects.order_by('id').values_list('id', flat=True)
+        if options['video']:
+            video_ids = video_ids.filter(id__in=options['video'])
+        video_ids = list(video_ids)
+
+        batch_size = options['batch_size']
+        for start in range(0, len(video_ids), batch_size):
+            with transaction.atomic():
+                rebuild_video_stats(video_ids[start:start + batch_size])
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stats for {len(video_ids)} video(s)."))
@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.models import Video, VideoComment
+
+
+def thread_roots(parents):
+    """Map every comment id to its top-level comment id (None for top-level comments)."""
+    roots = {}
+    for comment_id in parents:
+        path = []
+        node = comment_id
+        while node not in roots and parents.get(node) is not None:
+            path.append(node)
+            node = parents[node]
+        if node not in roots:
+            roots[node] = None
+        top = roots[node] or node
+        for visited in path:
+            roots[visited] = top
+    return roots
+
+
+def descendant_counts(parents, active):
+    """Active replies below every comment, counted through active replies only."""
+    children = {comment_id: [] for comment_id in parents}
+    for comment_id, parent_id in parents.items():
+        if parent_id in children:
+            children[parent_id].append(comment_id)
+
+    counts = {}
+    stack = [(comment_id, False) for comment_id, parent_id in parents.items() if parent_id not in children]
+    while stack:
+        node, children_done = stack.pop()
+        if children_done:
+            counts[node] = sum(1 + counts[child] for child in children[node] if active[child])
+            continue
+        stack.append((node, True))
+        stack.extend((child, False) for child in children[node])
+    return counts
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored thread root and descendant reply count of every video comment."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--video', type=int, nargs='*', help="only repair the comments of these video ids")
+
+    def handle(self, *args, **options):
+        video_ids = Video.objects.order_by('id').values_list('id', flat=True)
+        if options['video']:
+            video_ids = video_ids.filter(id__in=options['video'])
+
+        repaired = 0
+        for video_id in video_ids.iterator():
+            with transaction.atomic():
+                rows = list(
+                    VideoComment.objects.select_for_update()
+                    .filter(video_id=video_id)
+                    .values_list('id', 'parent_id', 'root_id', 'is_active', 'descendants_count')
+                )
+                if not rows:
+                    continue
+                parents = {row[0]: row[1] for row in rows}
+                roots = thread_roots(parents)
+                counts = descendant_counts(parents, {row[0]: row[3] for row in rows})
+
+                changed = [
+                    VideoComment(id=comment_id, root_id=roots[comment_id], descendants_count=counts[comment_id])
+                    for comment_id, _, root_id, _, stored_count in rows
+                    if roots[comment_id] != root_id or counts[comment_id] != stored_count
+                ]
+                VideoComment.objects.bulk_update(changed, ['root', 'descendants_count'], batch_size=500)
+            repaired += len(changed)
+
+        self.stdout.write(self.style.SUCCESS(f"Repaired {repaired} comment(s)."))
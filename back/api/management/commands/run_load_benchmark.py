@@ -0,0 +1,97 @@
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api import load_benchmark
+from users.identity import invalidate_identity
+from users.models import Profile
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the app in process through core.wsgi or core.asgi with a weighted request mix "
+        "and report throughput and p50/p95/p99 latency per endpoint as JSON. Logs in as "
+        "seed_benchmark_data users (one per worker) and writes likes and views to the database. "
+        "On SQLite, concurrent writes may fail with 'database is locked' and count as errors."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--handler', choices=('wsgi', 'asgi'), default='wsgi')
+        parser.add_argument('--pool', choices=('thread', 'process'), default='thread')
+        parser.add_argument('--workers', type=int, default=4, help="concurrent clients, each logged in as its own user")
+        parser.add_argument('--requests', type=int, default=1000, help="measured requests in total")
+        parser.add_argument('--warmup', type=int, default=10, help="unmeasured requests per worker")
+        parser.add_argument('--mix', default=load_benchmark.DEFAULT_MIX, help="endpoint=weight,... of " + ', '.join(load_benchmark.ENDPOINTS))
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--password', default='benchmark', help="password of the seed_benchmark_data users")
+        parser.add_argument('--host', default=None, help="Host header, defaults to the first ALLOWED_HOSTS entry")
+        parser.add_argument('--output', default=None, help="write the JSON report to this file instead of stdout")
+
+    def handle(self, *args, **options):
+        try:
+            mix = load_benchmark.parse_mix(options['mix'])
+        except ValueError as error:
+            raise CommandError(error)
+
+        workers = options['workers']
+        accounts = list(
+            Profile.objects.filter(
+                user__email__endswith='@benchmark.invalid', user__is_staff=False,
+                subscribed_user__is_active=True,
+            ).order_by('id').values_list('user_id', 'user__email').distinct()[:workers]
+        )
+        if len(accounts) < workers:
+            raise CommandError(f"Need {workers} subscribed benchmark users, run seed_benchmark_data first.")
+        user_ids = [user_id for user_id, _ in accounts]
+        emails = [email for _, email in accounts]
+        # a previous run that was interrupted leaves the accounts marked as in use
+        Profile.objects.filter(user_id__in=user_ids).update(is_logged_in=False, current_session_key=None)
+        invalidate_identity(*user_ids)
+
+        host = options['host'] or next((h for h in settings.ALLOWED_HOSTS if h not in ('*', '')), 'localhost').lstrip('.')
+        share, extra = divmod(options['requests'], workers)
+        configs = [
+            {
+                'index': index, 'email': email, 'password': options['password'], 'handler': options['handler'],
+                'host': host, 'mix': mix, 'seed': options['seed'] + index,
+                'requests': share + (index < extra), 'warmup': options['warmup'],
+            }
+            for index, email in enumerate(emails)
+        ]
+
+        if options['pool'] == 'process':
+            # don't let spawned workers inherit an open connection
+            connection.close()
+            executor = ProcessPoolExecutor(
+                workers, mp_context=multiprocessing.get_context('spawn'), initializer=load_benchmark.setup_process,
+            )
+        else:
+            executor = ThreadPoolExecutor(workers)
+
+        started = time.perf_counter()
+        with executor:
+            results = list(executor.map(load_benchmark.run_worker, configs))
+        wall = time.perf_counter() - started
+
+        report = {
+            'handler': options['handler'],
+            'pool': options['pool'],
+            'workers': workers,
+            'database': connection.vendor,
+            'mix': mix,
+            'seed': options['seed'],
+            'wall_seconds': round(wall, 3),
+            **load_benchmark.summarize([sample for samples in results for sample in samples], wall),
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as report_file:
+                report_file.write(output + '\n')
+            self.stderr.write(f"Report written to {options['output']}")
+        else:
+            self.stdout.write(output)
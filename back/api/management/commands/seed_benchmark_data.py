@@ -0,0 +1,257 @@
+import random
+import time
+from collections import defaultdict
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.models import (
+    CommentLike, Course, SubscribeCourse, Video, VideoComment, VideoLike, VideoStats, VideoViewer,
+)
+from api.recommendations import build_recommendations, recommendation_settings
+from api.search_index import rebuild_search_index
+from api.stats import hash_viewer
+from users.models import Profile, User
+from users.search import profile_search_text
+
+EMAIL_DOMAIN = 'benchmark.invalid'
+COURSE_PREFIX = 'Benchmark course'
+
+
+def chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-create a deterministic synthetic dataset (users, courses, videos, subscriptions, "
+        "likes, comment trees, viewers and stats) for reproducing slow endpoints locally. "
+        "Every user shares one password hash; rows are inserted with bulk_create in chunks, "
+        "then the derived indexes (recommendations, course search) are built from them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--staff', type=int, default=3, help="staff users authoring the videos")
+        parser.add_argument('--courses', type=int, default=20)
+        parser.add_argument('--videos-per-course', type=int, default=20)
+        parser.add_argument('--subscriptions-per-user', type=int, default=3)
+        parser.add_argument('--video-likes-per-user', type=int, default=10)
+        parser.add_argument('--comments-per-video', type=int, default=10, help="top-level comments per video")
+        parser.add_argument('--depth', type=int, default=3, help="reply levels below a top-level comment")
+        parser.add_argument('--fanout', type=int, default=1, help="average replies per comment")
+        parser.add_argument('--comment-likes', type=int, default=2, help="average likes per comment")
+        parser.add_argument('--viewers-per-video', type=int, default=50, help="average distinct viewers per video")
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--password', default='benchmark', help="password of every generated user")
+        parser.add_argument('--clear', action='store_true', help="delete previously generated data first")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.chunk_size = options['chunk_size']
+        self.options = options
+
+        if options['clear']:
+            self.step("cleared", self.clear)
+        elif User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').exists():
+            raise CommandError("Benchmark data already exists, run with --clear to replace it.")
+
+        with transaction.atomic():
+            users, staff = self.step("users", self.create_users)
+            courses = self.step("courses", self.create_courses)
+            _, videos = self.step("videos", self.create_videos, courses, staff)
+            _, subscriptions = self.step("subscriptions", self.create_subscriptions, users, courses)
+            counts = defaultdict(lambda: {'likes_count': 0, 'comments_count': 0, 'views_count': 0})
+            self.step("video likes", self.create_video_likes, users, subscriptions, videos, counts)
+            comments = self.step("comments", self.create_comments, users, videos, counts)
+            self.step("comment likes", self.create_comment_likes, users, comments)
+            self.step("viewers", self.create_viewers, videos, counts)
+            self.step("video stats", self.create_stats, videos, counts)
+            self.step("recommendations", build_recommendations, recommendation_settings())
+            self.step("search index", rebuild_search_index)
+
+    def step(self, label, create, *args):
+        started = time.perf_counter()
+        result = create(*args)
+        elapsed = time.perf_counter() - started
+        rows = result[0] if isinstance(result, tuple) else result
+        rows = rows if isinstance(rows, int) else len(rows)
+        self.stdout.write(f"{label:>15}: {rows:>9} rows in {elapsed:.1f}s")
+        return result
+
+    def insert(self, model, objects, ids=True):
+        """bulk_create `objects` in chunks and return the created ids (or the row count)."""
+        created = []
+        total = 0
+        for chunk in chunks(objects, self.chunk_size):
+            model.objects.bulk_create(chunk)
+            total += len(chunk)
+            if ids:
+                created.extend(obj.pk for obj in chunk)
+        return created if ids else total
+
+    def clear(self):
+        # cascades to profiles, subscriptions, likes, comments and viewers
+        deleted, _ = User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').delete()
+        deleted += Course.objects.filter(title__startswith=COURSE_PREFIX).delete()[0]
+        return deleted
+
+    def create_users(self):
+        password = make_password(self.options['password'])
+        total = self.options['users'] + self.options['staff']
+
+        def users():
+            for index in range(total):
+                yield User(
+                    email=f"user{index}@{EMAIL_DOMAIN}", user_name=f"bench_{index}",
+                    password=password, is_staff=index < self.options['staff'],
+                )
+
+        user_ids = self.insert(User, users())
+
+        def profiles():
+            for index, user_id in enumerate(user_ids):
+                # 'z' is not a hex digit, so these never collide with generated profile ids
+                profile_id = f"profile_z{index:07x}"
+                full_name = f"Benchmark user {index}"
+                # bulk_create skips Profile.save(), which keeps search_text
+                yield Profile(
+                    user_id=user_id, profile_id=profile_id, full_name=full_name,
+                    search_text=profile_search_text(full_name, f"user{index}@{EMAIL_DOMAIN}", profile_id),
+                )
+
+        profile_ids = self.insert(Profile, profiles())
+        staff = profile_ids[:self.options['staff']]
+        return profile_ids[self.options['staff']:], staff
+
+    def create_courses(self):
+        return self.insert(Course, (
+            Course(title=f"{COURSE_PREFIX} {index + 1}", description="Generated by seed_benchmark_data")
+            for index in range(self.options['courses'])
+        ))
+
+    def create_videos(self, courses, staff):
+        per_course = self.options['videos_per_course']
+        video_ids = self.insert(Video, (
+            Video(
+                title=f"Video {priority + 1}", course_id=course_id, embed_code='-',
+                author_id=self.rng.choice(staff), priority=priority + 1,
+            )
+            for course_id in courses for priority in range(per_course)
+        ))
+        # videos were inserted course by course
+        return video_ids, {
+            course_id: video_ids[index * per_course:(index + 1) * per_course]
+            for index, course_id in enumerate(courses)
+        }
+
+    def create_subscriptions(self, users, courses):
+        per_user = min(self.options['subscriptions_per_user'], len(courses))
+        subscriptions = {user_id: self.rng.sample(courses, per_user) for user_id in users}
+        total = self.insert(SubscribeCourse, (
+            SubscribeCourse(user_id=user_id, course_id=course_id)
+            for user_id, course_ids in subscriptions.items() for course_id in course_ids
+        ), ids=False)
+        return total, subscriptions
+
+    def create_video_likes(self, users, subscriptions, videos, counts):
+        def likes():
+            for user_id in users:
+                visible = [video_id for course_id in subscriptions[user_id] for video_id in videos[course_id]]
+                for video_id in self.rng.sample(visible, min(self.options['video_likes_per_user'], len(visible))):
+                    counts[video_id]['likes_count'] += 1
+                    yield VideoLike(user_id=user_id, video_id=video_id)
+
+        return self.insert(VideoLike, likes(), ids=False)
+
+    def create_comments(self, users, videos, counts):
+        """
+        Shape every thread first (parent, level), count descendants bottom-up,
+        then insert level by level so parents have ids before their replies.
+        """
+        fanout = self.options['fanout']
+        parents, roots, levels, video_of = [], [], [], []
+        for video_ids in videos.values():
+            for video_id in video_ids:
+                level_nodes = []
+                for _ in range(self.options['comments_per_video']):
+                    level_nodes.append(len(parents))
+                    parents.append(None)
+                    roots.append(None)
+                    levels.append(0)
+                    video_of.append(video_id)
+                for level in range(1, self.options['depth'] + 1):
+                    next_nodes = []
+                    for parent in level_nodes:
+                        for _ in range(self.rng.randint(0, 2 * fanout)):
+                            next_nodes.append(len(parents))
+                            parents.append(parent)
+                            roots.append(roots[parent] if roots[parent] is not None else parent)
+                            levels.append(level)
+                            video_of.append(video_id)
+                    level_nodes = next_nodes
+
+        descendants = [0] * len(parents)
+        for node in range(len(parents) - 1, -1, -1):
+            if parents[node] is not None:
+                descendants[parents[node]] += 1 + descendants[node]
+
+        ids = [None] * len(parents)
+        by_level = defaultdict(list)
+        for node, level in enumerate(levels):
+            by_level[level].append(node)
+        for level in sorted(by_level):
+            nodes = by_level[level]
+            created = self.insert(VideoComment, (
+                VideoComment(
+                    video_id=video_of[node], user_id=self.rng.choice(users), content="Benchmark comment",
+                    parent_id=ids[parents[node]] if parents[node] is not None else None,
+                    root_id=ids[roots[node]] if roots[node] is not None else None,
+                    descendants_count=descendants[node],
+                )
+                for node in nodes
+            ))
+            for node, comment_id in zip(nodes, created):
+                ids[node] = comment_id
+
+        for video_id in video_of:
+            counts[video_id]['comments_count'] += 1
+        return ids
+
+    def create_comment_likes(self, users, comments):
+        average = self.options['comment_likes']
+
+        def likes():
+            for comment_id in comments:
+                for user_id in self.rng.sample(users, min(self.rng.randint(0, 2 * average), len(users))):
+                    yield CommentLike(user_id=user_id, comment_id=comment_id)
+
+        return self.insert(CommentLike, likes(), ids=False)
+
+    def create_viewers(self, videos, counts):
+        average = self.options['viewers_per_video']
+
+        def viewers():
+            for video_ids in videos.values():
+                for video_id in video_ids:
+                    viewers_count = self.rng.randint(0, 2 * average)
+                    counts[video_id]['views_count'] += viewers_count
+                    for index in range(viewers_count):
+                        yield VideoViewer(video_id=video_id, viewer_hash=hash_viewer(f"benchmark-{video_id}-{index}"))
+
+        return self.insert(VideoViewer, viewers(), ids=False)
+
+    def create_stats(self, videos, counts):
+        return self.insert(VideoStats, (
+            VideoStats(video_id=video_id, **counts[video_id])
+            for video_ids in videos.values() for video_id in video_ids
+        ), ids=False)
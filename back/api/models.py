@@ -1,10 +1,28 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.expressions import OrderBy
 from users.models import Profile
 
 class ActiveObjectsQuerySet(models.QuerySet):
     def active(self):
         return self.filter(is_active=True)
 
+class NullsLastIndex(models.Index):
+    """
+    Index over descending NULLS LAST expressions, the order KeysetPagination
+    pages nullable fields in. SQLite can't spell NULLS LAST in an index but
+    already sorts NULLs last in descending order, so it gets a plain one.
+    """
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        index = self
+        if schema_editor.connection.vendor == 'sqlite':
+            index = self.clone()
+            index.expressions = tuple(
+                OrderBy(e.expression, descending=e.descending) if isinstance(e, OrderBy) else e
+                for e in self.expressions
+            )
+        return super(NullsLastIndex, index).create_sql(model, schema_editor, using=using, **kwargs)
+
 class Course(models.Model):
     class ActiveCourses(models.Manager):
         def get_queryset(self):
@@ -55,6 +73,8 @@ class VideoLike(models.Model):
     def __str__(self):
         return f"{self.user.full_name} liked {self.video.title}"
 
+# legacy per-video list of viewer IPs, superseded by VideoViewer.
+# only read by the convert_video_views command.
 class VideoViews(models.Model):
     video = models.OneToOneField(Video, on_delete=models.CASCADE, related_name='views')
     views = models.JSONField(default=list,blank=True)
@@ -62,6 +82,58 @@ class VideoViews(models.Model):
     def __str__(self):
         return self.video.title
 
+class VideoViewer(models.Model):
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='viewers')
+    viewer_hash = models.CharField(max_length=64)
+    first_seen = models.DateField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('video', 'viewer_hash')
+
+    def __str__(self):
+        return f"{self.viewer_hash[:12]} viewed {self.video_id}"
+
+class VideoStats(models.Model):
+    video = models.OneToOneField(Video, on_delete=models.CASCADE, related_name='stats')
+    likes_count = models.IntegerField(default=0)
+    comments_count = models.IntegerField(default=0)
+    views_count = models.IntegerField(default=0)
+    update_dt = models.DateTimeField(auto_now=True, null=True, blank=True)
+    
+    def __str__(self):
+        return self.video.title
+
+# related videos precomputed by `manage.py build_recommendations` (api/recommendations.py)
+class VideoRecommendation(models.Model):
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='recommendations')
+    recommended = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='recommended_in')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['video', 'rank']
+        unique_together = ('video', 'rank')
+
+    def __str__(self):
+        return f"{self.recommended_id} recommended for {self.video_id} (#{self.rank})"
+
+# inverted index over course and video titles and descriptions (api/search_index.py);
+# video is null for the course's own postings
+class SearchPosting(models.Model):
+    term = models.CharField(max_length=64)
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='search_postings')
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='search_postings', null=True, blank=True)
+    weight = models.FloatField()
+
+    class Meta:
+        indexes = [
+            # searches are limited to the user's courses first, then match terms within them
+            models.Index(fields=['course', 'term'], name='search_posting_course_term_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.term} in {self.video_id or self.course_id}"
+
 class VideoComment(models.Model):
     video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='comments')
     user = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='user_comment')
@@ -69,7 +141,13 @@ class VideoComment(models.Model):
     parent = models.ForeignKey(
         'self', on_delete=models.CASCADE, related_name='replies', null=True, blank=True
     )
+    # top-level comment of the thread (null for top-level comments), so a whole thread loads in one query
+    root = models.ForeignKey(
+        'self', on_delete=models.CASCADE, related_name='thread', null=True, blank=True
+    )
     is_active = models.BooleanField(default=True)
+    # active replies below this comment, counted through active replies only
+    descendants_count = models.IntegerField(default=0)
     created_dt = models.DateTimeField(auto_now_add=True, null=True, blank=True)
     update_dt = models.DateTimeField(auto_now=True, null=True, blank=True)
     
@@ -78,6 +156,69 @@ class VideoComment(models.Model):
     
     class Meta:
         ordering = ['-created_dt']
+        indexes = [
+            # keyset pagination of top-level comments and of a comment's replies (NULLs last, as paged)
+            NullsLastIndex(
+                F('video'), F('parent'), F('created_dt').desc(nulls_last=True), F('id').desc(),
+                name='comment_video_page_idx',
+            ),
+            NullsLastIndex(
+                F('parent'), F('created_dt').desc(nulls_last=True), F('id').desc(),
+                name='comment_replies_page_idx',
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_is_active = instance.__dict__.get('is_active')
+        return instance
+
+    def save(self, *args, **kwargs):
+        if self.parent_id and not self.root_id:
+            self.root_id = self.parent.root_id or self.parent_id
+
+        adding = self._state.adding
+        if not adding and kwargs.get('update_fields') is None:
+            # descendants_count is only ever changed with F() updates, never from a stale instance
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name != 'descendants_count' and f.attname not in deferred
+            ]
+        was_active = getattr(self, '_loaded_is_active', None)
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding and self.is_active:
+                self.shift_ancestor_counts(1)
+            elif not adding and was_active is not None and was_active != self.is_active:
+                subtree = 1 + self.stored_descendants_count()
+                self.shift_ancestor_counts(subtree if self.is_active else -subtree)
+        self._loaded_is_active = self.is_active
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            if self.is_active:
+                self.shift_ancestor_counts(-(1 + self.stored_descendants_count()))
+            return super().delete(*args, **kwargs)
+
+    def stored_descendants_count(self):
+        return VideoComment.objects.filter(pk=self.pk).values_list('descendants_count', flat=True).first() or 0
+
+    def shift_ancestor_counts(self, delta):
+        # the change reaches every ancestor up to and including the first inactive one
+        ancestors = []
+        node_id = self.parent_id
+        while node_id:
+            ancestors.append(node_id)
+            parent_id, is_active = VideoComment.objects.filter(pk=node_id).values_list('parent_id', 'is_active').first() or (None, False)
+            if not is_active:
+                break
+            node_id = parent_id
+        if ancestors:
+            VideoComment.objects.filter(pk__in=ancestors).update(descendants_count=F('descendants_count') + delta)
+
     def __str__(self):
         if self.parent:
             return f'{self.content} Reply by ({self.user.full_name if self.user.full_name else self.user.user.email}) on comment ({self.parent.id})'
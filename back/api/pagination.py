@@ -0,0 +1,196 @@
+import base64
+import binascii
+import json
+import operator
+from functools import reduce
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def estimate_count(queryset):
+    """Planner row estimate on PostgreSQL (no table scan); an exact count elsewhere."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination. The cursor holds the ordering values of the
+    last row of the page, so any page is one indexed range scan instead of
+    an OFFSET that grows with the page number. The ordering must end with a
+    unique, non-null field (usually `id`); NULLs of nullable fields sort last.
+
+    No total is computed unless asked for with `?count=exact` or
+    `?count=estimate`.
+    """
+    ordering = ('-created_dt', '-id')
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = getattr(view, 'keyset_ordering', self.ordering)
+        self.model = queryset.model
+
+        queryset = queryset.order_by(*self.order_by())
+        self.count = self.get_count(queryset)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_count(self, queryset):
+        mode = self.request.query_params.get(self.count_query_param)
+        if mode == 'exact':
+            return queryset.count()
+        if mode == 'estimate':
+            return estimate_count(queryset)
+        return None
+
+    def order_by(self):
+        expressions = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            nulls_last = True if self.model._meta.get_field(name).null else None
+            column = F(name)
+            expressions.append(column.desc(nulls_last=nulls_last) if field.startswith('-') else column.asc(nulls_last=nulls_last))
+        return expressions
+
+    def after(self, position):
+        # (a, b) > (x, y) expanded as a > x OR (a = x AND b > y), per field direction;
+        # NULLs sort last, so they come after any value and nothing but NULLs equals one
+        conditions = []
+        equal = Q()
+        for field in self.ordering:
+            name = field.lstrip('-')
+            value = position[name]
+            if value is None:
+                equal &= Q(**{f'{name}__isnull': True})
+                continue
+            beyond = Q(**{f'{name}__{"lt" if field.startswith("-") else "gt"}': value})
+            if self.model._meta.get_field(name).null:
+                beyond |= Q(**{f'{name}__isnull': True})
+            conditions.append(equal & beyond)
+            equal &= Q(**{name: value})
+        return reduce(operator.or_, conditions, Q(pk__in=[]))
+
+    def encode_cursor(self, row):
+        position = {}
+        for field in self.ordering:
+            name = field.lstrip('-')
+            value = getattr(row, name)
+            position[name] = value.isoformat() if hasattr(value, 'isoformat') else value
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            fields = [self.model._meta.get_field(field.lstrip('-')) for field in self.ordering]
+            position = {field.name: field.to_python(position[field.name]) for field in fields}
+        except (binascii.Error, ValueError, KeyError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if any(position[field.name] is None and not field.null for field in fields):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        body = {'next': self.get_next_link()}
+        if self.count is not None:
+            body['count'] = self.count
+        body['results'] = data
+        return Response(body)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'count': {'type': 'integer'},
+                'results': schema,
+            },
+        }
+
+
+class AdminKeysetPagination(KeysetPagination):
+    ordering = ('-id',)
+    page_size = 50
+    max_page_size = 500
+
+
+class RankedPagination(KeysetPagination):
+    """
+    For orderings that aren't columns, like search scores: the cursor holds
+    how many rows were already returned, so a page costs an OFFSET. Search
+    results are rarely paged far, and never past `max_offset`.
+    """
+    page_size = 20
+    max_offset = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.count = None
+        self.offset = self.decode_cursor(request)
+
+        rows = list(queryset[self.offset:self.offset + self.page_size + 1])
+        self.has_next = len(rows) > self.page_size and self.offset + self.page_size < self.max_offset
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return 0
+        try:
+            offset = json.loads(base64.urlsafe_b64decode(encoded.encode()))['offset']
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(offset, int) or not 0 <= offset <= self.max_offset:
+            raise NotFound(self.invalid_cursor_message)
+        return offset
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        cursor = base64.urlsafe_b64encode(json.dumps({'offset': self.offset + self.page_size}).encode()).decode()
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
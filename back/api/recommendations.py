@@ -0,0 +1,123 @@
+"""
+Related videos for the recommendations endpoint, computed offline by
+`manage.py build_recommendations` into VideoRecommendation: for every active
+video, the TOP_K active videos that score highest from
+
+- likes: profiles that liked both videos (cosine over the like sets),
+- views: viewers (VideoViewer.viewer_hash) that watched both, same measure,
+- subscriptions: profiles subscribed to both courses, which brings in the
+  first videos of related courses,
+- the course itself: the next (and, less, the previous) videos by priority,
+  so a video nobody interacted with yet still gets the rest of its course.
+
+Who may see which course is decided per request, see RecommendedVideosAPIView.
+"""
+import heapq
+import math
+from collections import Counter, defaultdict
+from itertools import groupby
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import SubscribeCourse, Video, VideoLike, VideoRecommendation, VideoViewer
+
+DEFAULTS = {
+    "TOP_K": 20,
+    "LIMIT": 10,
+    "WEIGHTS": {"likes": 3.0, "views": 1.0, "subscriptions": 0.5, "course": 0.25},
+    # people with more items than this link everything to everything, at O(n²); only their totals count
+    "MAX_ITEMS_PER_USER": 200,
+}
+
+
+def recommendation_settings():
+    conf = {**DEFAULTS, **getattr(settings, "RECOMMENDATIONS", {})}
+    conf["WEIGHTS"] = {**DEFAULTS["WEIGHTS"], **conf["WEIGHTS"]}
+    return conf
+
+
+def grouped(rows):
+    """The item ids of each owner, from (owner, item) rows ordered by owner."""
+    for _, items in groupby(rows, key=lambda row: row[0]):
+        yield {item for _, item in items}
+
+
+def similarities(groups, max_items):
+    """{(a, b): cosine} for a < b, from how often a and b appear in the same group."""
+    pairs = Counter()
+    totals = Counter()
+    for items in groups:
+        totals.update(items)
+        if len(items) > max_items:
+            continue
+        items = sorted(items)
+        for index, first in enumerate(items):
+            for second in items[index + 1:]:
+                pairs[first, second] += 1
+    return {(a, b): count / math.sqrt(totals[a] * totals[b]) for (a, b), count in pairs.items()}
+
+
+def compute_recommendations(conf=None):
+    """{video_id: [(recommended_id, score), ...]} best first, for every active video."""
+    conf = conf or recommendation_settings()
+    top_k, weights, max_items = conf["TOP_K"], conf["WEIGHTS"], conf["MAX_ITEMS_PER_USER"]
+
+    course_of = dict(
+        Video.active_objects.active().filter(course__is_active=True)
+        .order_by('course_id', 'priority', 'id').values_list('id', 'course_id')
+    )
+    course_videos = defaultdict(list)
+    for video_id, course_id in course_of.items():
+        course_videos[course_id].append(video_id)
+
+    scores = defaultdict(Counter)
+
+    def add(pairs, weight):
+        for (a, b), similarity in pairs.items():
+            if a in course_of and b in course_of:
+                scores[a][b] += weight * similarity
+                scores[b][a] += weight * similarity
+
+    likes = VideoLike.objects.order_by('user_id').values_list('user_id', 'video_id')
+    add(similarities(grouped(likes.iterator(chunk_size=5000)), max_items), weights["likes"])
+    views = VideoViewer.objects.order_by('viewer_hash').values_list('viewer_hash', 'video_id')
+    add(similarities(grouped(views.iterator(chunk_size=5000)), max_items), weights["views"])
+
+    subscriptions = SubscribeCourse.objects.filter(is_active=True).order_by('user_id').values_list('user_id', 'course_id')
+    related_courses = defaultdict(Counter)
+    for (a, b), similarity in similarities(grouped(subscriptions.iterator(chunk_size=5000)), max_items).items():
+        related_courses[a][b] = related_courses[b][a] = similarity
+
+    for course_id, video_ids in course_videos.items():
+        others = [
+            (other_id, similarity) for other_id, similarity in related_courses[course_id].most_common(top_k)
+            if other_id in course_videos
+        ]
+        for position, video_id in enumerate(video_ids):
+            for distance, other in enumerate(video_ids[position + 1:position + 1 + top_k], 1):
+                scores[video_id][other] += weights["course"] / distance
+            for distance, other in enumerate(reversed(video_ids[max(0, position - top_k):position]), 1):
+                scores[video_id][other] += weights["course"] / (2 * distance)
+            for other_id, similarity in others:
+                for distance, other in enumerate(course_videos[other_id][:top_k], 1):
+                    scores[video_id][other] += weights["subscriptions"] * similarity / distance
+
+    return {
+        video_id: heapq.nsmallest(top_k, ((other, score) for other, score in scores[video_id].items() if score > 0),
+                                  key=lambda item: (-item[1], item[0]))
+        for video_id in course_of
+    }
+
+
+def build_recommendations(conf=None, batch_size=1000):
+    """Replace the whole index, returns the number of rows written."""
+    rows = [
+        VideoRecommendation(video_id=video_id, recommended_id=other, rank=rank, score=score)
+        for video_id, recommended in compute_recommendations(conf).items()
+        for rank, (other, score) in enumerate(recommended, 1)
+    ]
+    with transaction.atomic():
+        VideoRecommendation.objects.all().delete()
+        VideoRecommendation.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
@@ -0,0 +1,147 @@
+"""
+Inverted index behind the student course/video search: one SearchPosting per
+term and course or video, weighted by where the term occurs (a title counts
+more than a description) and how often. The receivers below keep it current
+whenever a title, description or a video's course changes, and
+`manage.py build_search_index` rebuilds all of it (after deploying this or
+loading data with queryset.update / raw SQL).
+
+Terms are normalize_arabic()'d words with the Arabic definite article, and
+the prepositions attached to it, dropped, so a query matches whatever the
+diacritics, alef/yaa variants or article.
+"""
+import re
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, CharField, Count, F, Q, Sum, Value, When
+from django.db.models.signals import post_init, post_save
+from django.dispatch import receiver
+
+from users.search import normalize_arabic
+from .models import Course, SearchPosting, Video
+
+FIELD_WEIGHTS = {'title': 3.0, 'description': 1.0}
+MAX_TERM_LENGTH = 64
+WORD = re.compile(r'\w+')
+# ال / وال / بال / كال / فال / لل, when at least three letters are left
+ARTICLE = re.compile('^(?:وال|بال|كال|فال|لل|ال)(?=\\w{3})')
+
+
+def tokenize(text):
+    words = (ARTICLE.sub('', word) for word in WORD.findall(normalize_arabic(text)))
+    return [word[:MAX_TERM_LENGTH] for word in words]
+
+
+def weighted_terms(title, description):
+    weights = Counter()
+    for field, text in (('title', title), ('description', description)):
+        for term in tokenize(text):
+            weights[term] += FIELD_WEIGHTS[field]
+    return weights
+
+
+def postings(course_id, video_id, title, description):
+    return [
+        SearchPosting(term=term, course_id=course_id, video_id=video_id, weight=weight)
+        for term, weight in weighted_terms(title, description).items()
+    ]
+
+
+def index_course(course, created=False):
+    with transaction.atomic(savepoint=False):
+        if not created:
+            SearchPosting.objects.filter(course_id=course.id, video__isnull=True).delete()
+        SearchPosting.objects.bulk_create(postings(course.id, None, course.title, course.description))
+
+
+def index_video(video, created=False):
+    with transaction.atomic(savepoint=False):
+        if not created:
+            SearchPosting.objects.filter(video_id=video.id).delete()
+        SearchPosting.objects.bulk_create(postings(video.course_id, video.id, video.title, video.description))
+
+
+def rebuild_search_index(batch_size=500):
+    """Index every course and video from scratch, returns the number of postings."""
+    total = 0
+    with transaction.atomic():
+        SearchPosting.objects.all().delete()
+        for course_id, title, description in Course.objects.order_by('id').values_list('id', 'title', 'description').iterator():
+            batch = postings(course_id, None, title, description)
+            SearchPosting.objects.bulk_create(batch, batch_size=batch_size)
+            total += len(batch)
+        videos = Video.objects.order_by('id').values_list('id', 'course_id', 'title', 'description')
+        batch = []
+        for video_id, course_id, title, description in videos.iterator(chunk_size=batch_size):
+            batch.extend(postings(course_id, video_id, title, description))
+            if len(batch) >= batch_size:
+                SearchPosting.objects.bulk_create(batch, batch_size=batch_size)
+                total += len(batch)
+                batch = []
+        SearchPosting.objects.bulk_create(batch, batch_size=batch_size)
+        total += len(batch)
+    return total
+
+
+def search(query, courses):
+    """
+    Rows of {course_id, video_id (None for the course itself), matched, score}
+    for the active videos and the `courses` matching `query`, best first.
+    The last word also matches as a prefix, for search as you type; `matched`
+    counts the query words found, however many terms the prefix matched.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return SearchPosting.objects.none().values('course_id', 'video_id')
+    *words, last = terms
+    return (
+        SearchPosting.objects
+        .filter(course__in=courses.values('id'))
+        .filter(Q(term__in=words) | Q(term__startswith=last))
+        .filter(Q(video__isnull=True) | Q(video__is_active=True))
+        .values('course_id', 'video_id')
+        .annotate(
+            matched=Count(
+                Case(When(term__in=words, then=F('term')), default=Value(last), output_field=CharField()),
+                distinct=True,
+            ),
+            score=Sum('weight'),
+        )
+        .order_by('-matched', '-score', 'course_id', 'video_id')
+    )
+
+
+def indexed_fields(instance, fields):
+    # read from __dict__, so deferred fields aren't loaded
+    return tuple(instance.__dict__.get(field) for field in fields)
+
+
+COURSE_FIELDS = ('title', 'description')
+VIDEO_FIELDS = ('title', 'description', 'course_id')
+
+
+@receiver(post_init, sender=Course)
+def remember_course(sender, instance, **kwargs):
+    instance._indexed_fields = indexed_fields(instance, COURSE_FIELDS)
+
+
+@receiver(post_save, sender=Course)
+def course_saved(sender, instance, created, **kwargs):
+    current = indexed_fields(instance, COURSE_FIELDS)
+    if created or current != instance._indexed_fields:
+        index_course(instance, created)
+    instance._indexed_fields = current
+
+
+@receiver(post_init, sender=Video)
+def remember_video(sender, instance, **kwargs):
+    instance._indexed_fields = indexed_fields(instance, VIDEO_FIELDS)
+
+
+@receiver(post_save, sender=Video)
+def video_saved(sender, instance, created, **kwargs):
+    current = indexed_fields(instance, VIDEO_FIELDS)
+    if created or current != instance._indexed_fields:
+        index_video(instance, created)
+    instance._indexed_fields = current
@@ -1,32 +1,41 @@
 from rest_framework import serializers
 from .models import *
 from users.serializers import ProfileSerializerSpecific
+from .stats import get_video_stats
+from .comment_tree import REPLY_PREVIEW_SIZE
+from .liked_state import LikedStateListSerializer, liked_state
+from . import video_payloads
 
 class VideoViewSerializer(serializers.ModelSerializer):
+    views = serializers.IntegerField(source='views_count', read_only=True)
+
     class Meta:
-        model = VideoViews
+        model = VideoStats
         fields = ('views',)
 
 class VideoSerializer(serializers.ModelSerializer):
     author = ProfileSerializerSpecific(read_only=True)
-    more_info = VideoViewSerializer(source='views',read_only=True)
+    more_info = serializers.SerializerMethodField()
     likes_count = serializers.SerializerMethodField()
     is_liked_by_user = serializers.SerializerMethodField()
     course_title = serializers.CharField(source='course.title',read_only=True)
     cover = serializers.SerializerMethodField()
     
+    liked_kind = 'video'
+    
     class Meta:
         model = Video
         fields = ['id','course', 'title', 'priority','course_title', 'description', 'embed_code','is_active', 'cover', 'created_dt','update_dt','author','more_info','likes_count','is_liked_by_user']
+        list_serializer_class = LikedStateListSerializer
         
     def get_likes_count(self, obj):
-        return obj.likes.count()
+        return get_video_stats(obj).likes_count
+
+    def get_more_info(self, obj):
+        return VideoViewSerializer(get_video_stats(obj)).data
     
     def get_is_liked_by_user(self, obj):
-        request = self.context.get('request', None)
-        if request and request.user.is_authenticated:
-            return obj.likes.filter(user=request.user.profile).exists()
-        return False
+        return liked_state(self.context.get('request')).is_liked('video', obj.id)
     
     def get_cover(self, obj):
         request = self.context.get("request")
@@ -34,10 +43,16 @@ class VideoSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.cover.url) if request else obj.cover.url
         return None 
 
+class VideoPayloadSerializer(VideoSerializer):
+    # what VideoSerializer returns to every user alike, see video_payloads
+    class Meta(VideoSerializer.Meta):
+        fields = [field for field in VideoSerializer.Meta.fields if field != 'is_liked_by_user']
+        list_serializer_class = serializers.ListSerializer
+
 class RecommendedVideoSerializer(serializers.ModelSerializer):
     author = serializers.CharField(source='author.full_name',read_only=True)
     course_name = serializers.CharField(source='course.title',read_only=True)
-    more_info = VideoViewSerializer(source='views', read_only=True)
+    more_info = serializers.SerializerMethodField()
     likes_count = serializers.SerializerMethodField()
     cover = serializers.SerializerMethodField()
     
@@ -46,7 +61,10 @@ class RecommendedVideoSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'is_active', 'priority', 'description', 'cover','course_name', 'created_dt', 'author', 'more_info', 'likes_count']
         
     def get_likes_count(self, obj):
-        return obj.likes.count()
+        return get_video_stats(obj).likes_count
+
+    def get_more_info(self, obj):
+        return VideoViewSerializer(get_video_stats(obj)).data
     
     def get_cover(self, obj):
         request = self.context.get("request")
@@ -54,16 +72,39 @@ class RecommendedVideoSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.cover.url) if request else obj.cover.url
         return None 
 
+class CourseListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        # the videos of every listed course are loaded, and their liked state resolved, once for all courses
+        courses = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        request = self.context.get('request')
+        self.child.course_videos = video_payloads.course_videos(request, [course.id for course in courses], VideoPayloadSerializer)
+        liked_state(request).prime('video', [video['id'] for videos in self.child.course_videos.values() for video in videos])
+        return super().to_representation(courses)
+
 class CourseSerializer(serializers.ModelSerializer):
     videos = serializers.SerializerMethodField()
 
     class Meta:
         model = Course
         fields = ('id', 'title','cover', 'description', 'created_dt', 'update_dt','videos')
+        list_serializer_class = CourseListSerializer
         
     def get_videos(self, obj):
-        active_videos = obj.videos.filter(is_active=True) 
-        return VideoSerializer(active_videos, many=True,context=self.context).data
+        request = self.context.get('request')
+        course_videos = getattr(self, 'course_videos', {})
+        if obj.id not in course_videos:
+            course_videos = video_payloads.course_videos(request, [obj.id], VideoPayloadSerializer)
+        return video_payloads.with_liked_state(request, course_videos[obj.id])
+
+class SearchHitSerializer(serializers.Serializer):
+    # a search_index.search() row with its course and video (or course again) attached, see CourseSearchView
+    kind = serializers.CharField()
+    id = serializers.IntegerField(source='object.id')
+    title = serializers.CharField(source='object.title')
+    description = serializers.CharField(source='object.description', allow_null=True)
+    course_id = serializers.IntegerField(source='course.id')
+    course_title = serializers.CharField(source='course.title')
+    score = serializers.FloatField()
 
 class SubscribeSerializer(serializers.ModelSerializer):
     user = ProfileSerializerSpecific(read_only=True)
@@ -107,6 +148,20 @@ class CourseSerializerAdmin(serializers.ModelSerializer):
         model = Course
         fields = ('id', 'title','is_active','cover', 'description', 'created_dt', 'update_dt','videos','subscribers')
 
+class CourseSummarySerializerAdmin(serializers.ModelSerializer):
+    # expects the annotations added by views.with_course_summary
+    videos_count = serializers.IntegerField(read_only=True)
+    subscribers_count = serializers.IntegerField(read_only=True)
+    last_update = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Course
+        fields = ('id', 'title','is_active','cover', 'description', 'created_dt', 'update_dt','videos_count','subscribers_count','last_update')
+        
+    def get_last_update(self, obj):
+        dates = [date for date in (obj.update_dt, obj.last_video_update) if date]
+        return serializers.DateTimeField().to_representation(max(dates)) if dates else None
+
  
 class CourseSerializerOptions(serializers.ModelSerializer):
     class Meta:
@@ -115,79 +170,61 @@ class CourseSerializerOptions(serializers.ModelSerializer):
 
 
 # comment serializers
+# the fields read what comment_tree.active_comments / active_threads attach
+# to each comment and only fall back to per-comment queries for comments
+# loaded some other way (e.g. a freshly created one).
 class ReplySerializer(serializers.ModelSerializer):
+    # one level of a thread; deeper levels are paged through comment/<id>/replies
     author = ProfileSerializerSpecific(source='user',read_only=True)
-    replies = serializers.SerializerMethodField()
     total_replies = serializers.SerializerMethodField()
     likes_count = serializers.SerializerMethodField()  
     is_liked_by_user = serializers.SerializerMethodField()
+    liked_kind = 'comment'
 
     class Meta:
         model = VideoComment
-        fields = ['id', 'author', 'content', 'created_dt','replies','total_replies','likes_count','is_liked_by_user']
+        fields = ['id', 'author', 'content', 'created_dt','total_replies','likes_count','is_liked_by_user']
+        list_serializer_class = LikedStateListSerializer
         
-    def get_replies(self, obj):
-        replies = obj.replies.filter(is_active=True)
-        return ReplySerializer(replies, many=True, context=self.context).data
-    
     def get_total_replies(self, obj):
-        def count_replies(comment):
-            replies = comment.replies.filter(is_active=True)
-            total = replies.count()
-            for reply in replies:
-                total += count_replies(reply)
-            return total
-
-        return count_replies(obj)
+        return obj.descendants_count
     
     def get_likes_count(self, obj):
-        return obj.likes.count()  # ✅ إرجاع عدد اللايكات
+        likes = getattr(obj, 'likes_total', None)
+        if likes is None:
+            likes = obj.likes.count()  # ✅ إرجاع عدد اللايكات
+        return likes
 
     def get_is_liked_by_user(self, obj):
-        request = self.context.get('request', None)
-        if request and request.user.is_authenticated:
-            return obj.likes.filter(user=request.user.profile).exists()
-        return False
+        liked = getattr(obj, 'liked_by_user', None)
+        if liked is None:
+            liked = liked_state(self.context.get('request')).is_liked('comment', obj.id)
+        return liked
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(ReplySerializer):
     # user_name = serializers.CharField(source="user.user.user_name", read_only=True)
     
-    author = ProfileSerializerSpecific(source='user',read_only=True)
-    replies = ReplySerializer(many=True, read_only=True)
+    replies = serializers.SerializerMethodField()
     total_comments = serializers.SerializerMethodField()
-    total_replies = serializers.SerializerMethodField()
-    likes_count = serializers.SerializerMethodField()  
-    is_liked_by_user = serializers.SerializerMethodField()
 
     class Meta:
         model = VideoComment
         fields = ['id', 'author', 'content', 'created_dt', 'replies','total_comments','total_replies','likes_count','is_liked_by_user']
+        list_serializer_class = LikedStateListSerializer
         
+    def get_replies(self, obj):
+        # a preview of the newest replies; the rest is paged through comment/<id>/replies
+        replies = getattr(obj, 'active_replies', None)
+        if replies is None:
+            replies = obj.replies.filter(is_active=True)[:REPLY_PREVIEW_SIZE]
+        return ReplySerializer(replies, many=True, context=self.context).data
+
     def get_total_comments(self, obj):
-        return VideoComment.objects.filter(video=obj.video).count()
+        return get_video_stats(obj.video).comments_count
     
     def get_replies_count(self, obj):
         return obj.replies.filter(is_active=True).count()
     
-    def get_total_replies(self, obj):
-        def count_replies(comment):
-            replies = comment.replies.filter(is_active=True)
-            total = replies.count()
-            for reply in replies:
-                total += count_replies(reply)
-            return total
-
-        return count_replies(obj)
-    
-    def get_likes_count(self, obj):
-        return obj.likes.distinct().count() 
-
-    def get_is_liked_by_user(self, obj):
-        request = self.context.get('request', None)
-        if request and request.user.is_authenticated:
-            return obj.likes.filter(user=request.user.profile).exists()
-        return False
-    
 
 class CreateCommentSerializer(serializers.ModelSerializer):
     class Meta:
@@ -0,0 +1,110 @@
+"""
+Keeps the version stamps of api/versions.py current. Counter changes go
+through stats.update_video_stats, which replaces the stamps itself.
+"""
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from users.models import Profile, User
+from . import versions
+from .models import CommentLike, Course, SubscribeCourse, Video, VideoComment
+
+# what videos and comments show of their author (ProfileSerializerSpecific)
+AUTHOR_FIELDS = ('profile_id', 'full_name', 'avatar', 'is_private')
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def course_changed(sender, instance, **kwargs):
+    versions.bump(versions.COURSE, instance.pk)
+
+
+@receiver(post_init, sender=Course)
+def remember_course(sender, instance, **kwargs):
+    instance._was_active = instance.__dict__.get('is_active')
+
+
+@receiver(post_save, sender=Course)
+def course_saved(sender, instance, created, **kwargs):
+    # (de)activating a course adds it to or drops it from its subscribers' lists
+    if not created and instance.is_active != instance._was_active:
+        subscribers = SubscribeCourse.objects.filter(course=instance).values_list('user_id', flat=True)
+        versions.bump(versions.SUBSCRIPTIONS, *subscribers)
+    instance._was_active = instance.is_active
+
+
+# Deleting a course or a user cascades to its subscriptions, which this delete
+# receiver keeps from being fast-deleted: the cascade SELECTs them first (one
+# query). Deleting the course alone would be covered by its own stamp, but
+# subscriptions are also deleted directly (API, admin), which only this sees.
+@receiver(post_save, sender=SubscribeCourse)
+@receiver(post_delete, sender=SubscribeCourse)
+def subscription_changed(sender, instance, **kwargs):
+    versions.bump(versions.SUBSCRIPTIONS, instance.user_id)
+
+
+@receiver(post_save, sender=Video)
+@receiver(post_delete, sender=Video)
+def video_changed(sender, instance, **kwargs):
+    versions.bump_videos(instance.pk, course_ids=[instance.course_id])
+
+
+@receiver(post_save, sender=VideoComment)
+@receiver(post_delete, sender=VideoComment)
+def comment_changed(sender, instance, **kwargs):
+    versions.bump(versions.COMMENTS, instance.video_id)
+
+
+@receiver(post_save, sender=CommentLike)
+@receiver(post_delete, sender=CommentLike)
+def comment_like_changed(sender, instance, origin=None, **kwargs):
+    # likes deleted along with their comment or user are handled there, without a lookup per like
+    if origin is not None and getattr(origin, 'model', type(origin)) is not CommentLike:
+        return
+    versions.bump(versions.COMMENTS, instance.comment.video_id)
+
+
+@receiver(pre_delete, sender=Profile)
+def profile_deleted(sender, instance, **kwargs):
+    liked = set(CommentLike.objects.filter(user=instance).values_list('comment__video_id', flat=True))
+    versions.bump(versions.COMMENTS, *liked)
+
+
+def author_fields(instance, fields):
+    # read from __dict__, so deferred fields aren't loaded
+    return tuple(str(instance.__dict__.get(field)) for field in fields)
+
+
+def author_changed(profile_id):
+    videos = list(Video.objects.filter(author_id=profile_id).values_list('id', 'course_id'))
+    if videos:
+        versions.bump_videos(*(video_id for video_id, _ in videos), course_ids={course_id for _, course_id in videos})
+    commented = set(VideoComment.objects.filter(user_id=profile_id).values_list('video_id', flat=True))
+    versions.bump(versions.COMMENTS, *commented)
+
+
+@receiver(post_init, sender=Profile)
+def remember_profile(sender, instance, **kwargs):
+    instance._author_fields = author_fields(instance, AUTHOR_FIELDS)
+
+
+@receiver(post_save, sender=Profile)
+def profile_changed(sender, instance, created, **kwargs):
+    current = author_fields(instance, AUTHOR_FIELDS)
+    if not created and current != instance._author_fields:
+        author_changed(instance.pk)
+    instance._author_fields = current
+
+
+@receiver(post_init, sender=User)
+def remember_user(sender, instance, **kwargs):
+    instance._author_fields = author_fields(instance, ('email',))
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, created, **kwargs):
+    current = author_fields(instance, ('email',))
+    if not created and current != instance._author_fields:
+        for profile_id in Profile.objects.filter(user=instance).values_list('id', flat=True):
+            author_changed(profile_id)
+    instance._author_fields = current
@@ -0,0 +1,121 @@
+import hashlib
+
+from django.conf import settings
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Video, VideoComment, VideoLike, VideoStats, VideoViewer
+from .versions import bump_videos
+
+
+def count_subquery(queryset, field):
+    counted = (
+        queryset.filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counted, output_field=IntegerField()), 0)
+
+
+def hash_viewer(client_ip):
+    # keyed so stored hashes can't be reversed by brute-forcing the IPv4 space; not with
+    # SECRET_KEY, which may rotate, while the same viewer must keep the same hash
+    return hashlib.sha256(f"{settings.VIDEO_VIEWER_HASH_SALT}:{client_ip}".encode()).hexdigest()
+
+
+def source_counts(video_ids):
+    """(video id, likes, comments, views) counted from the source tables."""
+    return Video.objects.filter(id__in=video_ids).annotate(
+        source_likes=count_subquery(VideoLike.objects.all(), 'video'),
+        source_comments=count_subquery(VideoComment.objects.all(), 'video'),
+        source_views=count_subquery(VideoViewer.objects.all(), 'video'),
+    ).values_list('id', 'source_likes', 'source_comments', 'source_views')
+
+
+def rebuild_video_stats(video_ids):
+    """Recompute the counters of the given videos from the source tables."""
+    rebuilt = []
+    for video_id, likes, comments, views in source_counts(video_ids):
+        stats, _ = VideoStats.objects.update_or_create(
+            video_id=video_id,
+            defaults={
+                'likes_count': likes,
+                'comments_count': comments,
+                'views_count': views,
+            },
+        )
+        rebuilt.append(stats)
+    bump_videos(*video_ids)
+    return rebuilt
+
+
+def update_video_stats(video_id, *, course_id=None, **deltas):
+    """
+    Apply counter deltas (e.g. likes_count=1) to a video's stats row and
+    return the refreshed row. Must be called inside the transaction that
+    changed the source rows so both commit together. Pass the video's
+    `course_id` when it's at hand, to spare the lookup for its stamp.
+    """
+    updated = VideoStats.objects.filter(video_id=video_id).update(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+    if not updated:
+        # first write for this video: build the row from the source tables,
+        # which already include the change being recorded
+        return rebuild_video_stats([video_id])[0]
+    if set(deltas) - {'views_count'}:
+        # views alone don't replace the stamps, see api/versions.py
+        bump_videos(video_id, course_ids=None if course_id is None else [course_id])
+    return VideoStats.objects.get(video_id=video_id)
+
+
+def sync_comments_count(video_id):
+    # deleting a comment cascades through its whole reply tree, so recount
+    # instead of applying a delta
+    comments = VideoComment.objects.filter(video_id=video_id).count()
+    updated = VideoStats.objects.filter(video_id=video_id).update(comments_count=comments)
+    if not updated:
+        rebuild_video_stats([video_id])
+    else:
+        bump_videos(video_id)
+
+
+def sync_views_count(video_id):
+    """
+    Set views_count to the stored viewers. Must be called inside the
+    transaction that inserted them: the stats row is locked first, so the
+    count also sees viewers committed by a concurrent writer meanwhile.
+    """
+    locked = list(VideoStats.objects.select_for_update().filter(video_id=video_id).values_list('id', flat=True))
+    if not locked:
+        rebuild_video_stats([video_id])
+        return
+    views = VideoViewer.objects.filter(video_id=video_id).count()
+    # views alone don't replace the stamps, see api/versions.py
+    VideoStats.objects.filter(id__in=locked).update(views_count=views)
+
+
+def record_view(video, client_ip):
+    """Register a unique viewer for the video and return its stats row."""
+    _, created = VideoViewer.objects.get_or_create(video=video, viewer_hash=hash_viewer(client_ip))
+    if created:
+        return update_video_stats(video.id, views_count=1)
+    return get_video_stats(video)
+
+
+def get_video_stats(video):
+    """
+    The video's stats row. Reads never write: a video without one (created
+    before the row existed, or with bulk_create; `manage.py
+    reconcile_video_stats` backfills them) gets unsaved counters counted
+    from the source tables.
+    """
+    try:
+        return video.stats
+    except VideoStats.DoesNotExist:
+        _, likes, comments, views = source_counts([video.id]).get()
+        stats = VideoStats(video=video, likes_count=likes, comments_count=comments, views_count=views)
+        video.stats = stats
+        return stats
@@ -0,0 +1,284 @@
+import copy
+import json
+import os
+from contextlib import contextmanager
+from importlib import import_module
+from time import perf_counter
+from types import SimpleNamespace
+from unittest import mock
+
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import URLPattern, resolve, reverse
+from rest_framework.serializers import ListSerializer, Serializer
+
+from users.models import User
+from .models import CommentLike, Course, SubscribeCourse, Video, VideoComment, VideoLike
+from .stats import rebuild_video_stats
+
+
+def create_user(email, password='pass12345!', full_name='', **extra):
+    user = User.objects.create_user(email=email, password=password, **extra)
+    user.profile.full_name = full_name or email.split('@')[0]
+    user.profile.save()
+    return user
+
+
+@contextmanager
+def count_queries():
+    """Collects every query executed on the default connection (no 9000 cap like CaptureQueriesContext)."""
+    queries = []
+
+    def record(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(record):
+        yield queries
+
+
+class QueryBudgetMixin:
+    """
+    TestCase helpers for the `query_budget` that views declare: the most
+    queries one request may run, authentication included, whatever the
+    number of courses and videos.
+    """
+    password = 'pass12345!'
+
+    def login(self, user):
+        response = self.client.post(
+            '/users/token/', {'email': user.email, 'password': self.password}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+
+    def assertWithinQueryBudget(self, url, method='get', **kwargs):
+        view = resolve(url).func.view_class
+        budget = getattr(view, 'query_budget', None)
+        self.assertIsNotNone(budget, f"{view.__name__} declares no query_budget")
+        with count_queries() as queries:
+            response = getattr(self.client, method)(url, **kwargs)
+        self.assertLess(response.status_code, 400, response.content)
+        self.assertLessEqual(
+            len(queries), budget,
+            f"{view.__name__} ran {len(queries)} queries, over its budget of {budget}:\n" + "\n".join(queries),
+        )
+        return response
+
+
+def seed_dataset(courses=3, videos_per_course=4, comments_per_video=3, replies_per_comment=2):
+    """
+    A small but complete dataset for walking the API: one user per role,
+    subscribed courses with videos, comment threads, likes and stats.
+    """
+    data = SimpleNamespace()
+    data.superuser = create_user('superuser@example.com', is_staff=True, is_superuser=True)
+    data.staff = create_user('staff@example.com', is_staff=True)
+    data.student = create_user('student@example.com')
+    data.other = create_user('other@example.com')
+    # never logged in, so the login route can be measured
+    data.spare = create_user('spare@example.com')
+
+    data.courses = []
+    for course_index in range(courses):
+        course = Course.objects.create(title=f"course {course_index + 1}", description="seeded")
+        for user in (data.student, data.other):
+            SubscribeCourse.objects.create(user=user.profile, course=course)
+        videos = Video.objects.bulk_create(
+            Video(title=f"video {i + 1}", course=course, embed_code='-', author=data.staff.profile, priority=i + 1)
+            for i in range(videos_per_course)
+        )
+        for video in videos:
+            for comment_index in range(comments_per_video):
+                author = (data.student, data.other)[comment_index % 2].profile
+                comment = VideoComment.objects.create(video=video, user=author, content="comment")
+                parent = comment
+                for _ in range(replies_per_comment):
+                    parent = VideoComment.objects.create(video=video, user=author, content="reply", parent=parent)
+                CommentLike.objects.create(comment=comment, user=data.student.profile)
+            VideoLike.objects.create(video=video, user=data.other.profile)
+        VideoLike.objects.create(video=videos[0], user=data.student.profile)
+        rebuild_video_stats([video.id for video in videos])
+        data.courses.append(course)
+
+    data.course = data.courses[0]
+    data.video = data.course.videos.order_by('priority').first()
+    data.comment = data.video.comments.filter(parent__isnull=True).first()
+    data.subscription = SubscribeCourse.objects.filter(user=data.other.profile, course=data.course).get()
+    return data
+
+
+@contextmanager
+def time_serialization():
+    """Wall time spent in outermost serializer to_representation calls (queries they trigger included)."""
+    spent = [0.0]
+    depth = [0]
+
+    def timed(original):
+        def to_representation(self, instance):
+            depth[0] += 1
+            started = perf_counter()
+            try:
+                return original(self, instance)
+            finally:
+                depth[0] -= 1
+                if not depth[0]:
+                    spent[0] += perf_counter() - started
+        return to_representation
+
+    with mock.patch.object(Serializer, 'to_representation', timed(Serializer.to_representation)), \
+            mock.patch.object(ListSerializer, 'to_representation', timed(ListSerializer.to_representation)):
+        yield spent
+
+
+def measure_request(client, method, url, data=None):
+    """Run one request and return its status, query count, SQL time and serialization time."""
+    sql = {'queries': 0, 'seconds': 0.0}
+
+    def record(execute, *args):
+        started = perf_counter()
+        try:
+            return execute(*args)
+        finally:
+            sql['queries'] += 1
+            sql['seconds'] += perf_counter() - started
+
+    with connection.execute_wrapper(record), time_serialization() as serialization:
+        response = getattr(client, method)(url, data if data is not None else {}, content_type='application/json')
+    return {
+        'status': response.status_code,
+        'queries': sql['queries'],
+        'sql_ms': sql['seconds'] * 1000,
+        'serialize_ms': serialization[0] * 1000,
+    }
+
+
+class RouteWalkMixin:
+    """
+    Walks every route of `urlconf` with every method its view implements, as
+    every role, and compares status, query count, SQL time and serialization
+    time to the committed `baseline_file`. Each request runs in a rolled back
+    transaction, so writes don't leak into the next request.
+
+    `route_kwargs` maps a route name to `f(data, role) -> kwargs` and must
+    cover every route with parameters; `payloads` maps a route name (or
+    `(name, method)`) to `f(data, role) -> body`.
+
+    Query counts must match exactly, so every change shows up as a diff of
+    the baseline file. Run with UPDATE_PERF_BASELINES=1 to record lower
+    counts and new or removed routes; a higher count is only written with
+    UPDATE_PERF_BASELINES=raise, and its commit has to say why. Timings
+    (the fastest of `repeat` runs) may grow up to PERF_TIME_FACTOR times plus
+    PERF_TIME_SLACK_MS, to absorb machine noise, and are rewritten with the
+    counts.
+    """
+    urlconf = None
+    baseline_file = None
+    roles = ('student', 'staff', 'superuser')
+    methods = ('get', 'post', 'put', 'patch', 'delete')
+    route_kwargs = {}
+    payloads = {}
+    repeat = int(os.environ.get('PERF_REPEAT', 3))
+    password = 'pass12345!'
+
+    def setUp(self):
+        super().setUp()
+        self.clients = {}
+        for role in self.roles:
+            client = Client()
+            user = getattr(self.data, role)
+            response = client.post(
+                '/users/token/', {'email': user.email, 'password': self.password}, content_type='application/json'
+            )
+            self.assertEqual(response.status_code, 200, response.content)
+            self.clients[role] = client
+
+    def routes(self):
+        module = import_module(self.urlconf)
+        namespace = f"{module.app_name}:" if getattr(module, 'app_name', None) else ''
+        for pattern in module.urlpatterns:
+            if isinstance(pattern, URLPattern):
+                yield f"{namespace}{pattern.name}", pattern
+
+    def walk(self):
+        results = {}
+        missing = []
+        for name, pattern in self.routes():
+            short_name = name.split(':')[-1]
+            view = pattern.callback.view_class
+            if pattern.pattern.converters and short_name not in self.route_kwargs:
+                missing.append(short_name)
+                continue
+            for role in self.roles:
+                kwargs = self.route_kwargs[short_name](self.data, role) if pattern.pattern.converters else {}
+                url = reverse(name, kwargs=kwargs)
+                for method in self.methods:
+                    if not hasattr(view, method):
+                        continue
+                    payload = self.payloads.get((short_name, method), self.payloads.get(short_name))
+                    body = payload(self.data, role) if payload else None
+                    results[f"{role} {method.upper()} {short_name}"] = self.measure(role, method, url, body)
+        self.assertEqual(missing, [], "routes without route_kwargs")
+        return results
+
+    def measure(self, role, method, url, body):
+        client = self.clients[role]
+        runs = []
+        # the first run warms up caches and is not kept
+        for _ in range(self.repeat + 1):
+            # logout routes clear the client's cookies
+            cookies = copy.deepcopy(client.cookies)
+            with transaction.atomic():
+                runs.append(measure_request(client, method, url, body))
+                transaction.set_rollback(True)
+            client.cookies = cookies
+        runs = runs[1:]
+        return {
+            'status': runs[-1]['status'],
+            'queries': max(run['queries'] for run in runs),
+            'sql_ms': round(min(run['sql_ms'] for run in runs), 2),
+            'serialize_ms': round(min(run['serialize_ms'] for run in runs), 2),
+        }
+
+    def compare_with_baselines(self, results):
+        baselines = {}
+        if os.path.exists(self.baseline_file):
+            with open(self.baseline_file) as baseline:
+                baselines = json.load(baseline)
+        raised = [
+            f"{key}: {baselines[key]['queries']} -> {measured['queries']}"
+            for key, measured in sorted(results.items())
+            if key in baselines and measured['queries'] > baselines[key]['queries']
+        ]
+
+        mode = os.environ.get('UPDATE_PERF_BASELINES')
+        if mode:
+            self.assertFalse(
+                raised and mode != 'raise',
+                "query counts went up, rerun with UPDATE_PERF_BASELINES=raise if that's intended:\n" + "\n".join(raised),
+            )
+            with open(self.baseline_file, 'w') as baseline:
+                json.dump(results, baseline, indent=2, sort_keys=True)
+                baseline.write('\n')
+            return
+
+        self.assertEqual(sorted(set(baselines) - set(results)), [], "baselines of routes that are gone")
+        factor = float(os.environ.get('PERF_TIME_FACTOR', 3))
+        slack = float(os.environ.get('PERF_TIME_SLACK_MS', 25))
+        for key, measured in results.items():
+            with self.subTest(key):
+                expected = baselines.get(key)
+                self.assertIsNotNone(expected, "no baseline recorded, run with UPDATE_PERF_BASELINES=1")
+                self.assertEqual(measured['status'], expected['status'])
+                report = ", ".join(
+                    f"{metric} {expected[metric]} -> {measured[metric]}"
+                    for metric in ('queries', 'sql_ms', 'serialize_ms')
+                )
+                self.assertEqual(
+                    measured['queries'], expected['queries'],
+                    f"query count changed ({report}), see RouteWalkMixin on updating the baselines",
+                )
+                for timing in ('sql_ms', 'serialize_ms'):
+                    self.assertLessEqual(
+                        measured[timing], expected[timing] * factor + slack, f"{timing} regression ({report})"
+                    )
+
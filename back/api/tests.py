@@ -0,0 +1,599 @@
+import base64
+import json
+import os
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from .models import Course, SearchPosting, SubscribeCourse, Video, VideoComment, VideoLike, VideoRecommendation, VideoStats, VideoViewer, VideoViews
+from . import versions, view_buffer
+from .search_index import tokenize
+from .stats import hash_viewer, rebuild_video_stats, update_video_stats
+from .testing import QueryBudgetMixin, RouteWalkMixin, count_queries, create_user, seed_dataset
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class StudentEndpointsQueryBudgetTests(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_user('admin@example.com', is_staff=True, is_superuser=True)
+        cls.student = create_user('student@example.com')
+
+    def add_courses(self, courses, videos_per_course):
+        created = []
+        for _ in range(courses):
+            course = Course.objects.create(title=f"course {Course.objects.count() + 1}")
+            SubscribeCourse.objects.create(user=self.student.profile, course=course)
+            videos = Video.objects.bulk_create(
+                Video(title=f"video {i}", course=course, embed_code='-', author=self.admin.profile, priority=i + 1)
+                for i in range(videos_per_course)
+            )
+            VideoLike.objects.create(video=videos[0], user=self.student.profile)
+            rebuild_video_stats([video.id for video in videos])
+            created.append(course)
+        return created
+
+    def count(self, url):
+        # warm per-user caches first, only the steady state is compared
+        self.client.get(url)
+        with count_queries() as queries:
+            self.client.get(url)
+        return len(queries)
+
+    def test_courses_list(self):
+        self.add_courses(1, 2)
+        self.login(self.student)
+        small = self.count('/api/courses_list')
+
+        self.add_courses(5, 10)
+        response = self.assertWithinQueryBudget('/api/courses_list')
+        self.assertEqual(self.count('/api/courses_list'), small)
+        self.assertEqual(len(response.json()), 6)
+        self.assertEqual(
+            [video['is_liked_by_user'] for video in response.json()[-1]['videos']],
+            [True] + [False] * 9,
+        )
+
+    def test_videos_list(self):
+        small_course, large_course = self.add_courses(1, 2) + self.add_courses(1, 20)
+        for user in (self.student, self.admin):
+            self.login(user)
+            self.assertWithinQueryBudget(f'/api/courses_list/{small_course.title}/videos')
+            response = self.assertWithinQueryBudget(f'/api/courses_list/{large_course.title}/videos')
+            self.assertEqual(len(response.json()), 20)
+
+    def test_retrieve_video(self):
+        course, = self.add_courses(1, 3)
+        video = course.videos.first()
+        for user in (self.student, self.admin):
+            self.login(user)
+            response = self.assertWithinQueryBudget(f'/api/video/{video.id}')
+            self.assertEqual(response.json()['is_liked_by_user'], user == self.student)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class VideoStatsTests(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset(courses=1, videos_per_course=2, comments_per_video=1, replies_per_comment=0)
+
+    def test_reads_without_a_stats_row_dont_write(self):
+        VideoStats.objects.filter(video=self.data.video).delete()
+        self.login(self.data.student)
+        video = self.client.get(f'/api/video/{self.data.video.id}').json()
+        self.assertEqual(video['likes_count'], 2)
+        self.assertFalse(VideoStats.objects.filter(video=self.data.video).exists())
+
+        call_command('reconcile_video_stats', stdout=StringIO())
+        self.assertEqual(VideoStats.objects.get(video=self.data.video).comments_count, 1)
+
+
+@override_settings(VIDEO_VIEWS_BUFFER={'ENABLED': True, 'BACKGROUND_FLUSH': False, 'MAX_SIZE': 10, 'CACHE': 'video_views'})
+class ViewBufferTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset(courses=1, videos_per_course=1, comments_per_video=0, replies_per_comment=0)
+
+    def setUp(self):
+        cache.clear()
+        caches['video_views'].clear()
+
+    def views_count(self):
+        return VideoStats.objects.get(video=self.data.video).views_count
+
+    def test_flush_waits_for_a_slot_taken_but_not_yet_written(self):
+        video_id = self.data.video.id
+        view_buffer.record_hit(video_id, 'a')
+        # another worker took seq 2 and hasn't written its slot yet
+        seq = view_buffer._next_seq(caches['video_views'])
+        view_buffer.record_hit(video_id, 'b')
+
+        self.assertEqual(view_buffer.flush(), 1)
+        self.assertEqual(self.views_count(), 1)
+
+        caches['video_views'].set(view_buffer._slot_key(seq), (video_id, 'c'), timeout=None)
+        self.assertEqual(view_buffer.flush(), 2)
+        self.assertEqual(self.views_count(), 3)
+
+    def test_viewer_inserted_concurrently_is_counted_once(self):
+        video_id = self.data.video.id
+        bulk_create = VideoViewer.objects.bulk_create
+
+        def racing_bulk_create(objs, **kwargs):
+            # another worker records viewer 'a' between the lookup and the insert
+            VideoViewer.objects.create(video_id=video_id, viewer_hash='a')
+            update_video_stats(video_id, views_count=1)
+            return bulk_create(objs, **kwargs)
+
+        view_buffer.record_hit(video_id, 'a')
+        view_buffer.record_hit(video_id, 'b')
+        with mock.patch.object(VideoViewer.objects, 'bulk_create', side_effect=racing_bulk_create):
+            self.assertEqual(view_buffer.flush(), 2)
+        self.assertEqual(self.views_count(), 2)
+
+    def test_full_buffer_hands_the_hit_back(self):
+        buffer_cache = caches['video_views']
+        for _ in range(20):
+            view_buffer._next_seq(buffer_cache)
+        self.assertFalse(view_buffer.record_hit(self.data.video.id, 'a'))
+
+        buffer_cache.set(view_buffer.CURSOR_KEY, 20, timeout=None)
+        self.assertTrue(view_buffer.record_hit(self.data.video.id, 'a'))
+
+
+class ConvertVideoViewsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset(courses=1, videos_per_course=2, comments_per_video=0, replies_per_comment=0)
+
+    def convert(self, *args):
+        call_command('convert_video_views', *args, stdout=StringIO())
+
+    def test_ip_lists_become_hashed_viewers(self):
+        video, other = self.data.course.videos.order_by('priority')
+        VideoViews.objects.update_or_create(video=video, defaults={'views': ['1.1.1.1', '2.2.2.2', '1.1.1.1', '']})
+        VideoViews.objects.update_or_create(video=other, defaults={'views': ['1.1.1.1']})
+
+        self.convert('--batch-size', '1')
+
+        self.assertEqual(
+            set(VideoViewer.objects.filter(video=video).values_list('viewer_hash', flat=True)),
+            {hash_viewer('1.1.1.1'), hash_viewer('2.2.2.2')},
+        )
+        self.assertEqual(VideoStats.objects.get(video=video).views_count, 2)
+        self.assertEqual(VideoStats.objects.get(video=other).views_count, 1)
+        self.assertFalse(VideoViews.objects.exclude(views=[]).exists())
+
+        # running it again has nothing left to convert
+        self.convert()
+        self.assertEqual(VideoStats.objects.get(video=video).views_count, 2)
+
+    def test_keep_leaves_the_ip_lists(self):
+        video = self.data.video
+        VideoViews.objects.update_or_create(video=video, defaults={'views': ['1.1.1.1']})
+
+        self.convert('--keep')
+
+        self.assertEqual(VideoViews.objects.get(video=video).views, ['1.1.1.1'])
+        self.assertEqual(VideoStats.objects.get(video=video).views_count, 1)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class CommentPagingTests(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset(courses=1, videos_per_course=1, comments_per_video=1, replies_per_comment=0)
+        author = cls.data.other.profile
+        cls.replies = [
+            VideoComment.objects.create(video=cls.data.video, user=author, content=f"reply {i}", parent=cls.data.comment)
+            for i in range(5)
+        ]
+        VideoComment.objects.create(video=cls.data.video, user=author, content="nested", parent=cls.replies[0])
+        # rows written before created_dt was filled in
+        VideoComment.objects.filter(id__in=[reply.id for reply in cls.replies[:2]]).update(created_dt=None)
+
+    def setUp(self):
+        cache.clear()
+        self.login(self.data.student)
+
+    def test_threads_carry_a_bounded_reply_preview(self):
+        comment = self.client.get(f'/api/video/{self.data.video.id}/comments').json()['results'][0]
+        self.assertEqual(comment['total_replies'], 6)
+        self.assertEqual([reply['content'] for reply in comment['replies']], ['reply 4', 'reply 3', 'reply 2'])
+        self.assertNotIn('replies', comment['replies'][0])
+
+    def test_replies_page_through_null_created_dt(self):
+        url = f'/api/comment/{self.data.comment.id}/replies?page_size=2'
+        seen = []
+        while url:
+            body = self.client.get(url).json()
+            seen += [reply['content'] for reply in body['results']]
+            url = body['next']
+        self.assertEqual(seen, ['reply 4', 'reply 3', 'reply 2', 'reply 1', 'reply 0'])
+
+    def descendants(self, *comments):
+        counts = dict(VideoComment.objects.filter(id__in=[c.id for c in comments]).values_list('id', 'descendants_count'))
+        return [counts.get(c.id) for c in comments]
+
+    def test_soft_delete_and_reactivation_shift_the_ancestors(self):
+        comment, reply = self.data.comment, self.replies[0]
+        self.assertEqual(self.descendants(comment, reply), [6, 1])
+
+        reply.is_active = False
+        reply.save()
+        # the hidden reply takes its nested reply along, but keeps counting it itself
+        self.assertEqual(self.descendants(comment, reply), [4, 1])
+
+        reply.is_active = True
+        reply.save()
+        self.assertEqual(self.descendants(comment, reply), [6, 1])
+
+    def test_hard_delete_removes_the_subtree_from_the_ancestors(self):
+        self.replies[0].delete()
+        self.assertEqual(self.descendants(self.data.comment), [4])
+
+        # an inactive comment was already taken off its ancestors
+        self.replies[1].is_active = False
+        self.replies[1].save()
+        self.replies[1].delete()
+        self.assertEqual(self.descendants(self.data.comment), [3])
+
+    def test_reply_under_an_inactive_ancestor_stops_there(self):
+        comment, reply = self.data.comment, self.replies[0]
+        nested = reply.replies.get()
+        reply.is_active = False
+        reply.save()
+
+        VideoComment.objects.create(video=self.data.video, user=self.data.student.profile, content="late", parent=nested)
+        self.assertEqual(self.descendants(comment, reply, nested), [4, 2, 1])
+
+        reply.is_active = True
+        reply.save()
+        self.assertEqual(self.descendants(comment, reply, nested), [7, 2, 1])
+
+    def test_malformed_cursors_are_not_found(self):
+        url = f'/api/comment/{self.data.comment.id}/replies'
+        for position in ('not base64', {'created_dt': 'yesterday', 'id': 1}, {'created_dt': None, 'id': None}, [1]):
+            cursor = position if isinstance(position, str) else base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+            self.assertEqual(self.client.get(url, {'cursor': cursor}).status_code, 404, position)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, VERSION_STAMPS=True)
+class ConditionalGetTests(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset(courses=2, videos_per_course=2, comments_per_video=1, replies_per_comment=1)
+
+    def setUp(self):
+        cache.clear()
+        self.login(self.data.student)
+        self.urls = [
+            '/api/courses_list',
+            f'/api/courses_list/{self.data.course.title}/videos',
+            f'/api/video/{self.data.video.id}',
+            f'/api/video/{self.data.video.id}/recommendations',
+            f'/api/video/{self.data.video.id}/comments',
+        ]
+
+    def revalidate(self, etags):
+        return [self.client.get(url, HTTP_IF_NONE_MATCH=etags[url]).status_code for url in self.urls]
+
+    def test_unchanged_responses_are_not_modified(self):
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls}
+        self.assertEqual(self.revalidate(etags), [304] * len(self.urls))
+
+    @override_settings(VERSION_STAMPS=False)
+    def test_no_etags_without_shared_stamps(self):
+        for url in self.urls:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH='*')
+            self.assertEqual(response.status_code, 200, url)
+            self.assertNotIn('ETag', response)
+
+        def likes():
+            videos = self.client.get(f'/api/courses_list/{self.data.course.title}/videos').json()
+            return next(video['likes_count'] for video in videos if video['id'] == self.data.video.id)
+
+        before = likes()
+        self.client.patch(f'/api/video/{self.data.video.id}/like')
+        # nothing was cached along the way
+        self.assertEqual(likes(), before - 1)
+
+    def test_changes_invalidate_the_etags(self):
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls}
+        self.client.patch(f'/api/video/{self.data.video.id}/like')
+        self.assertEqual(self.revalidate(etags), [200, 200, 200, 200, 304])
+
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls}
+        VideoComment.objects.create(video=self.data.video, user=self.data.other.profile, content="new")
+        self.assertEqual(self.revalidate(etags), [304, 304, 304, 304, 200])
+
+    def test_views_keep_the_etags(self):
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls}
+        self.client.patch(f'/api/video/{self.data.video.id}/views')
+        self.assertEqual(self.revalidate(etags), [304] * len(self.urls))
+
+    def test_missing_videos_get_no_stamp(self):
+        self.assertEqual(self.client.get('/api/video/999999/comments').status_code, 404)
+        self.assertIsNone(cache.get(versions._key(versions.COMMENTS, '999999')))
+
+    def test_etags_are_per_user(self):
+        etag = self.client.get('/api/courses_list')['ETag']
+        self.login(self.data.other)
+        self.assertEqual(self.client.get('/api/courses_list', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, VERSION_STAMPS=True)
+class CoursesListCacheTests(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset(courses=2, videos_per_course=2, comments_per_video=0, replies_per_comment=0)
+
+    def setUp(self):
+        cache.clear()
+        self.login(self.data.student)
+
+    def titles(self, url='/api/courses_list'):
+        return [course['title'] for course in self.client.get(url).json()]
+
+    def queries(self, url):
+        # authentication queries included, the view itself runs none
+        self.client.get(url)
+        with count_queries() as warm:
+            self.client.get(url)
+        cache.clear()
+        with count_queries() as cold:
+            self.client.get(url)
+        return len(warm), len(cold)
+
+    def test_hits_skip_the_view_queries(self):
+        for url in ('/api/courses_list', '/api/courses_list/options'):
+            warm, cold = self.queries(url)
+            self.assertLess(warm, cold)
+
+    def test_changes_invalidate_the_cache(self):
+        course = self.data.course
+        before = self.titles()
+        self.assertIn(course.title, before)
+
+        course.title = 'renamed course'
+        course.save()
+        self.assertIn('renamed course', self.titles())
+        self.assertIn('renamed course', self.titles('/api/courses_list/options'))
+
+        Video.objects.create(title='added video', course=course, embed_code='-', author=self.data.staff.profile, priority=99)
+        videos = next(c for c in self.client.get('/api/courses_list').json() if c['id'] == course.id)['videos']
+        self.assertIn('added video', [video['title'] for video in videos])
+
+        SubscribeCourse.objects.filter(user=self.data.student.profile, course=course).delete()
+        self.assertNotIn('renamed course', self.titles())
+        self.assertNotIn('renamed course', self.titles('/api/courses_list/options'))
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, VERSION_STAMPS=True)
+class VideoPayloadCacheTests(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset(courses=1, videos_per_course=3, comments_per_video=0, replies_per_comment=0)
+
+    def setUp(self):
+        cache.clear()
+        self.url = f'/api/courses_list/{self.data.course.title}/videos'
+        # liked by the other student only
+        self.video = self.data.course.videos.order_by('priority')[1]
+        self.clients = {}
+        for user in (self.data.student, self.data.other):
+            self.client = self.clients[user] = self.client_class()
+            self.login(user)
+
+    def videos(self, user):
+        with count_queries() as queries:
+            response = self.clients[user].get(self.url)
+        return {video['id']: video for video in response.json()}, len(queries)
+
+    def test_payloads_are_shared_between_users(self):
+        for_student, cold = self.videos(self.data.student)
+        for_other, warm = self.videos(self.data.other)
+        self.assertLess(warm, cold)
+        self.assertFalse(for_student[self.video.id]['is_liked_by_user'])
+        self.assertTrue(for_other[self.video.id]['is_liked_by_user'])
+        self.assertEqual(
+            {**for_student[self.video.id], 'is_liked_by_user': None},
+            {**for_other[self.video.id], 'is_liked_by_user': None},
+        )
+
+    def test_likes_and_authors_invalidate_the_payloads(self):
+        before, _ = self.videos(self.data.other)
+        self.clients[self.data.other].patch(f'/api/video/{self.video.id}/like')
+        after, _ = self.videos(self.data.other)
+        self.assertEqual(after[self.video.id]['likes_count'], before[self.video.id]['likes_count'] - 1)
+        self.assertFalse(after[self.video.id]['is_liked_by_user'])
+
+        author = self.data.staff.profile
+        author.full_name = 'renamed author'
+        author.save()
+        after, _ = self.videos(self.data.student)
+        self.assertEqual(after[self.video.id]['author']['full_name'], 'renamed author')
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, VERSION_STAMPS=True)
+class RecommendationTests(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset(courses=3, videos_per_course=3, comments_per_video=0, replies_per_comment=0)
+        cls.hidden = cls.data.courses[2]
+        SubscribeCourse.objects.filter(user=cls.data.student.profile, course=cls.hidden).delete()
+
+    def setUp(self):
+        cache.clear()
+        self.login(self.data.student)
+        self.url = f'/api/video/{self.data.video.id}/recommendations'
+
+    def recommended(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return [video['id'] for video in response.json()]
+
+    def test_falls_back_to_the_course_until_built(self):
+        self.assertEqual(self.recommended(), list(self.data.course.videos.order_by('priority').values_list('id', flat=True)))
+
+    def test_serves_the_index_for_visible_courses(self):
+        call_command('build_recommendations', stdout=StringIO())
+        self.assertTrue(VideoRecommendation.objects.filter(video=self.data.video).exists())
+
+        recommended = self.recommended()
+        self.assertNotIn(self.data.video.id, recommended)
+        courses = set(Video.objects.filter(id__in=recommended).values_list('course_id', flat=True))
+        self.assertIn(self.data.courses[1].id, courses)
+        self.assertNotIn(self.hidden.id, courses)
+
+        with override_settings(RECOMMENDATIONS={'LIMIT': 2}):
+            self.assertEqual(self.recommended(), recommended[:2])
+
+    def test_renaming_a_recommended_course_changes_the_etag(self):
+        call_command('build_recommendations', stdout=StringIO())
+        response = self.client.get(self.url)
+        course = Video.objects.get(id=response.json()[0]['id']).course
+        course.title = 'renamed course'
+        course.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('renamed course', [video['course_name'] for video in response.json()])
+
+    def test_rebuilding_replaces_the_index(self):
+        call_command('build_recommendations', stdout=StringIO())
+        before = self.recommended()
+        Video.objects.filter(id=before[0]).update(is_active=False)
+        call_command('build_recommendations', stdout=StringIO())
+        self.assertNotIn(before[0], self.recommended())
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class CourseSearchTests(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset(courses=2, videos_per_course=2, comments_per_video=0, replies_per_comment=0)
+        cls.course = Course.objects.create(title='أساسيات البرمجة', description='مقدمة في الخوارزميات')
+        SubscribeCourse.objects.create(user=cls.data.student.profile, course=cls.course)
+        cls.video = Video.objects.create(
+            title='الدرس الأول: المتغيرات', description='شرح المتغيرات والبرمجة', course=cls.course,
+            embed_code='-', author=cls.data.staff.profile, priority=1,
+        )
+        hidden = Course.objects.create(title='البرمجة المتقدمة')
+        Video.objects.create(title='البرمجة الكائنية', course=hidden, embed_code='-', author=cls.data.staff.profile)
+
+    def setUp(self):
+        self.login(self.data.student)
+
+    def search(self, query, **params):
+        response = self.client.get('/api/courses_list/search', {'q': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def hits(self, query):
+        return [(hit['kind'], hit['id']) for hit in self.search(query)['results']]
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize('الدَّرسُ الأوَّل، بالبرمجة'), ['درس', 'اول', 'برمجه'])
+
+    def test_ranked_hits_in_subscribed_courses(self):
+        # title matches outrank description matches; the unsubscribed course never shows
+        self.assertEqual(self.hits('برمجه'), [('course', self.course.id), ('video', self.video.id)])
+        self.assertEqual(self.hits('متغير'), [('video', self.video.id)])
+        self.assertEqual(self.hits('كائنيه'), [])
+        self.assertEqual(self.hits(''), [])
+
+    def test_prefix_matches_count_as_one_word(self):
+        both = Video.objects.create(
+            title='python programming', course=self.course, embed_code='-', author=self.data.staff.profile,
+        )
+        Video.objects.create(
+            title='progress program programs', course=self.course, embed_code='-', author=self.data.staff.profile,
+        )
+        self.assertEqual(self.hits('python prog')[0], ('video', both.id))
+
+    def test_index_follows_changes(self):
+        self.video.title = 'الحلقات التكرارية'
+        self.video.save()
+        self.assertEqual(self.hits('حلقات'), [('video', self.video.id)])
+        self.video.is_active = False
+        self.video.save()
+        self.assertEqual(self.hits('حلقات'), [])
+
+        video_id = self.video.id
+        self.video.delete()
+        self.assertFalse(SearchPosting.objects.filter(video_id=video_id).exists())
+
+    def test_pages(self):
+        call_command('build_search_index', stdout=StringIO())
+        first = self.search('video', page_size=3)
+        self.assertEqual(len(first['results']), 3)
+        second = self.client.get(first['next']).json()
+        self.assertEqual(len(second['results']), 1)
+        self.assertIsNone(second['next'])
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, VERSION_STAMPS=True)
+class ApiRoutesPerformanceTests(RouteWalkMixin, TestCase):
+    urlconf = 'api.urls'
+    baseline_file = os.path.join(os.path.dirname(__file__), 'perf_baselines.json')
+    route_kwargs = {
+        'videos_list': lambda data, role: {'course_title': data.course.title},
+        'retrieve_video': lambda data, role: {'pk': data.video.id},
+        'video_recommendations': lambda data, role: {'pk': data.video.id},
+        'video-like-toggle': lambda data, role: {'video_id': data.video.id},
+        'video_views': lambda data, role: {'video_id': data.video.id},
+        'video_comments': lambda data, role: {'pk': data.video.id},
+        'create-comment': lambda data, role: {'video_id': data.video.id},
+        'create-reply': lambda data, role: {'comment_id': data.comment.id},
+        'comment_replies': lambda data, role: {'pk': data.comment.id},
+        'delete_comment': lambda data, role: {'pk': data.comment.id},
+        'comment-like-toggle': lambda data, role: {'comment_id': data.comment.id},
+        'get_course': lambda data, role: {'pk': data.course.id},
+        'edit_course': lambda data, role: {'pk': data.course.id},
+        'delete_course': lambda data, role: {'pk': data.course.id},
+        'course_videos_admin': lambda data, role: {'pk': data.course.id},
+        'course_subscribers_admin': lambda data, role: {'pk': data.course.id},
+        'subscription-activation': lambda data, role: {'pk': data.subscription.id},
+        'delete-subscription': lambda data, role: {'pk': data.subscription.id},
+        'update_video': lambda data, role: {'pk': data.video.id},
+        'delete_video': lambda data, role: {'pk': data.video.id},
+        'swap-video-priority': lambda data, role: {'pk': data.video.id},
+    }
+    payloads = {
+        'create-comment': lambda data, role: {'content': 'new comment'},
+        'create-reply': lambda data, role: {'content': 'new reply'},
+        'add_course': lambda data, role: {'title': 'new course'},
+        # one RetrieveUpdateDestroyCourse view behind three route names
+        'get_course': lambda data, role: {'title': 'renamed course'},
+        'edit_course': lambda data, role: {'title': 'renamed course'},
+        'delete_course': lambda data, role: {'title': 'renamed course'},
+        'add_video': lambda data, role: {'title': 'new video', 'course': data.course.id, 'embed_code': '-', 'priority': 1},
+        'update_video': lambda data, role: {'title': 'renamed video', 'course': data.course.id, 'embed_code': '-', 'priority': 2},
+        'swap-video-priority': lambda data, role: {'direction': 'down'},
+        'add-subscription': lambda data, role: {'profile_id': data.spare.profile.profile_id, 'course': data.course.id},
+        'subscription-activation': lambda data, role: {'is_active': False},
+        'liked_state': lambda data, role: {'videos': f'{data.video.id}', 'comments': f'{data.comment.id}'},
+        'search_course': lambda data, role: {'value': 'course'},
+        'search_subscriptions': lambda data, role: {'value': 'other'},
+        'course_search': lambda data, role: {'q': 'course'},
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset()
+
+    def test_routes_against_baselines(self):
+        self.compare_with_baselines(self.walk())
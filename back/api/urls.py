@@ -5,6 +5,7 @@ urlpatterns = [
     # course
     path('courses_list', CoursesList.as_view(), name='courses_list'),
     path('courses_list/options', CoursesListOptions.as_view(), name='courses_list_options'),
+    path('courses_list/search', CourseSearchView.as_view(), name='course_search'),
     path('courses_list/<str:course_title>/videos', VideosList.as_view(), name='videos_list'),
     
     # video
@@ -15,8 +16,10 @@ urlpatterns = [
     path('video/<str:pk>/comments', VideoCommentsView.as_view(), name='video_comments'),
     path('videos/<int:video_id>/comments/', CreateCommentView.as_view(), name='create-comment'),
     path('comments/<int:comment_id>/replies/', CreateReplyView.as_view(), name='create-reply'),
+    path('comment/<int:pk>/replies', CommentRepliesView.as_view(), name='comment_replies'),
     path('comments/<int:pk>/delete', DeleteComment.as_view(), name='delete_comment'),
     path('comment/<int:comment_id>/like', ToggleCommentLikeView.as_view(), name='comment-like-toggle'),
+    path('likes/state', LikedStateView.as_view(), name='liked_state'),
     
     # admin
     # admin -> course
@@ -27,6 +30,8 @@ urlpatterns = [
     path('admin/courses/course/<int:pk>', RetrieveUpdateDestroyCourse.as_view(), name='get_course'),
     path('admin/courses/course/<int:pk>/edit', RetrieveUpdateDestroyCourse.as_view(), name='edit_course'),
     path('admin/courses/course/<int:pk>/delete', RetrieveUpdateDestroyCourse.as_view(), name='delete_course'),
+    path('admin/courses/course/<int:pk>/videos', CourseVideosAdmin.as_view(), name='course_videos_admin'),
+    path('admin/courses/course/<int:pk>/subscribers', CourseSubscribersAdmin.as_view(), name='course_subscribers_admin'),
     # admin -> subscription
     path('admin/courses/subscriptions/', SubscriptionsList.as_view(),name='subscriptions'),
     path('admin/courses/subscriptions/search/', SearchSubscriptions.as_view(),name='search_subscriptions'),
@@ -0,0 +1,75 @@
+"""
+Version stamps for the student read endpoints: an opaque value per course,
+per video, per video's comments and per profile's subscriptions, kept in
+the cache and replaced whenever something those endpoints return changes
+(see api/signals.py and stats.update_video_stats). A video change also replaces its course's stamp,
+since course payloads embed their videos. New views don't: the view counter
+changes on every watch, so it's only as fresh as the stamps, which expire
+after VERSION_STAMP_TIMEOUT (the live count comes with each recorded view).
+
+Only ids of existing objects may be passed to get_versions, so requests
+for made-up ids can't fill the cache with stamps.
+
+Views hash the stamps with the user-specific bits of a response into an
+ETag, so unchanged responses are answered with a 304 before serializing.
+
+Everything keyed by stamps is off unless settings.VERSION_STAMPS is set,
+which needs a cache shared by every process: a stamp replaced in one
+process's cache only would keep the others answering from stale entries.
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+COURSE = 'course'
+VIDEO = 'video'
+COMMENTS = 'comments'
+# per profile: which courses it's actively subscribed to
+SUBSCRIPTIONS = 'subscriptions'
+
+
+def _key(kind, pk):
+    return f'version:{kind}:{pk}'
+
+
+def get_versions(kind, ids):
+    """{id: stamp} for `ids`; objects that have no stamp yet get one."""
+    keys = {_key(kind, pk): pk for pk in ids}
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        for key in missing:
+            cache.add(key, uuid.uuid4().hex, timeout=settings.VERSION_STAMP_TIMEOUT)
+        found.update(cache.get_many(missing))
+    return {keys[key]: stamp for key, stamp in found.items()}
+
+
+def bump(kind, *ids):
+    if not ids or not settings.VERSION_STAMPS:
+        return
+
+    def replace():
+        cache.set_many({_key(kind, pk): uuid.uuid4().hex for pk in ids}, timeout=settings.VERSION_STAMP_TIMEOUT)
+
+    replace()
+    # a request that read the old rows before the commit may have seen the new stamp
+    transaction.on_commit(replace)
+
+
+def bump_videos(*video_ids, course_ids=None):
+    """Replace the stamps of the videos and of their courses (looked up unless given)."""
+    from .models import Video
+
+    if not settings.VERSION_STAMPS:
+        return
+    if course_ids is None:
+        course_ids = set(Video.objects.filter(id__in=video_ids).values_list('course_id', flat=True))
+    bump(VIDEO, *video_ids)
+    bump(COURSE, *course_ids)
+
+
+def make_etag(*parts):
+    return '"%s"' % hashlib.sha256(repr(parts).encode()).hexdigest()
@@ -0,0 +1,66 @@
+"""
+The user-independent part of the video lists: a course's videos serialized
+once and shared by every subscriber through the cache. Entries are keyed by
+the course's version stamp, which a video, like/view count or author change
+replaces (see api/versions.py), and by scheme and host since cover URLs are
+absolute. Only the caller's liked state is merged in per request. Without
+VERSION_STAMPS nothing is shared and every request serializes its videos.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import versions
+from .liked_state import liked_state
+from .models import Video
+
+
+def with_video_relations(videos):
+    # everything VideoSerializer reads besides the liked state
+    return videos.select_related('stats', 'author__user', 'course')
+
+
+def course_videos(request, course_ids, serializer_class, include_inactive=False):
+    """{course_id: serialized videos} for `course_ids`, missing entries built with one query."""
+    course_ids = list(dict.fromkeys(course_ids))
+    if not course_ids:
+        return {}
+    if not settings.VERSION_STAMPS:
+        return serialize_course_videos(request, course_ids, serializer_class, include_inactive)
+    stamps = versions.get_versions(versions.COURSE, course_ids)
+    origin = request.build_absolute_uri('/') if request else ''
+    variant = 'all' if include_inactive else 'active'
+    keys = {
+        course_id: f'payload:{serializer_class.__name__}:{variant}:{origin}:{course_id}:{stamps[course_id]}'
+        for course_id in course_ids
+    }
+    found = cache.get_many(keys.values())
+    payloads = {course_id: found[key] for course_id, key in keys.items() if key in found}
+
+    missing = [course_id for course_id in course_ids if course_id not in payloads]
+    if missing:
+        # stamps were read before this query, a change meanwhile only leaves a stale entry behind
+        built = serialize_course_videos(request, missing, serializer_class, include_inactive)
+        payloads.update(built)
+        cache.set_many({keys[course_id]: built[course_id] for course_id in missing}, settings.API_RESPONSE_CACHE_TIMEOUT)
+    return payloads
+
+
+def serialize_course_videos(request, course_ids, serializer_class, include_inactive):
+    """{course_id: serialized videos} for `course_ids`, with one query."""
+    videos = Video.objects.all() if include_inactive else Video.active_objects.active()
+    grouped = defaultdict(list)
+    for video in with_video_relations(videos.filter(course_id__in=course_ids)).order_by('course_id', 'priority'):
+        grouped[video.course_id].append(video)
+    return {
+        course_id: serializer_class(grouped[course_id], many=True, context={'request': request}).data
+        for course_id in course_ids
+    }
+
+
+def with_liked_state(request, videos):
+    """Copies of the shared `videos` with the caller's `is_liked_by_user`."""
+    state = liked_state(request)
+    state.prime('video', [video['id'] for video in videos])
+    return [{**video, 'is_liked_by_user': state.is_liked('video', video['id'])} for video in videos]
@@ -0,0 +1,193 @@
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import close_old_connections, transaction
+
+from .models import Video, VideoViewer
+from .stats import sync_views_count
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ENABLED": False,
+    "MAX_SIZE": 5000,
+    "FLUSH_INTERVAL": 10,
+    "BATCH_SIZE": 500,
+    "DEDUP_TIMEOUT": 60 * 60,
+    "BACKGROUND_FLUSH": True,
+    # seconds a taken sequence number may stay without its slot (written right
+    # after it's taken) before flush() gives up waiting for it
+    "MISSING_SLOT_TIMEOUT": 30,
+    # cache alias holding the slots, one that never culls them (see settings.CACHES)
+    "CACHE": "default",
+}
+
+SEQ_KEY = "video_views:buffer:seq"
+CURSOR_KEY = "video_views:buffer:cursor"
+LOCK_KEY = "video_views:buffer:lock"
+
+_flush_lock = threading.Lock()
+_flusher_lock = threading.Lock()
+_flusher = None
+_atexit_registered = False
+
+
+def buffer_settings():
+    return {**DEFAULTS, **getattr(settings, "VIDEO_VIEWS_BUFFER", {})}
+
+
+def is_enabled():
+    return buffer_settings()["ENABLED"]
+
+
+def _slot_key(seq):
+    return f"video_views:buffer:{seq}"
+
+
+def _buffer_cache(conf):
+    return caches[conf["CACHE"]]
+
+
+def _next_seq(buffer_cache):
+    try:
+        return buffer_cache.incr(SEQ_KEY)
+    except ValueError:
+        buffer_cache.add(SEQ_KEY, 0, timeout=None)
+        return buffer_cache.incr(SEQ_KEY)
+
+
+def record_hit(video_id, viewer_hash):
+    """
+    Buffer a view hit without touching the database. Hits are appended to a
+    sequence of cache slots; flush() merges them into VideoViewer/VideoStats.
+    Returns False, buffering nothing, when 2 * MAX_SIZE hits are already
+    waiting (flushes failing or falling behind): the caller records the view
+    itself then, so the buffer stays bounded.
+    """
+    conf = buffer_settings()
+    buffer_cache = _buffer_cache(conf)
+    if buffer_cache.get(SEQ_KEY, 0) - buffer_cache.get(CURSOR_KEY, 0) >= 2 * conf["MAX_SIZE"]:
+        return False
+    # the same viewer hammering the same video only needs one slot per window
+    if not cache.add(f"video_views:seen:{video_id}:{viewer_hash}", 1, timeout=conf["DEDUP_TIMEOUT"]):
+        return True
+
+    seq = _next_seq(buffer_cache)
+    buffer_cache.set(_slot_key(seq), (video_id, viewer_hash), timeout=None)
+    _ensure_flusher(conf)
+
+    if seq - buffer_cache.get(CURSOR_KEY, 0) >= conf["MAX_SIZE"]:
+        flush()
+    return True
+
+
+def _merge(hits):
+    viewers_by_video = defaultdict(set)
+    for video_id, viewer_hash in hits:
+        viewers_by_video[video_id].add(viewer_hash)
+
+    live_videos = set(Video.objects.filter(id__in=viewers_by_video).values_list("id", flat=True))
+    for video_id in live_videos:
+        viewers = viewers_by_video[video_id]
+        known = set(
+            VideoViewer.objects.filter(video_id=video_id, viewer_hash__in=viewers)
+            .values_list("viewer_hash", flat=True)
+        )
+        new_viewers = viewers - known
+        if not new_viewers:
+            continue
+        with transaction.atomic():
+            VideoViewer.objects.bulk_create(
+                [VideoViewer(video_id=video_id, viewer_hash=h) for h in new_viewers],
+                ignore_conflicts=True,
+            )
+            # recount rather than add len(new_viewers): a concurrent writer
+            # may have inserted some of them since the lookup above, and
+            # ignore_conflicts doesn't say which rows were skipped
+            sync_views_count(video_id)
+
+
+def _abandoned(buffer_cache, seq, conf):
+    """Whether the slot of `seq`, found missing, has been missing for too long to still be written."""
+    key = f"video_views:buffer:missing:{seq}"
+    buffer_cache.add(key, time.time(), timeout=conf["MISSING_SLOT_TIMEOUT"] * 2)
+    missing_since = buffer_cache.get(key, time.time())
+    if time.time() - missing_since < conf["MISSING_SLOT_TIMEOUT"]:
+        return False
+    buffer_cache.delete(key)
+    return True
+
+
+def flush():
+    """
+    Merge the buffered hits into the database, in sequence order. Returns the
+    number of hits merged. A sequence number is taken before its slot is
+    written, so a missing slot stops the flush there and is retried by the
+    next one, unless it stayed missing for MISSING_SLOT_TIMEOUT.
+    """
+    conf = buffer_settings()
+    buffer_cache = _buffer_cache(conf)
+    with _flush_lock:
+        # cross-process guard for shared caches
+        if not buffer_cache.add(LOCK_KEY, 1, timeout=max(conf["FLUSH_INTERVAL"] * 6, 60)):
+            return 0
+        try:
+            cursor = buffer_cache.get(CURSOR_KEY, 0)
+            end = buffer_cache.get(SEQ_KEY, 0)
+            if end < cursor:
+                # the sequence key was evicted and restarted
+                cursor = 0
+
+            merged = 0
+            while cursor < end:
+                upper = min(cursor + conf["BATCH_SIZE"], end)
+                hits = buffer_cache.get_many([_slot_key(seq) for seq in range(cursor + 1, upper + 1)])
+                ready = next(
+                    (seq - 1 for seq in range(cursor + 1, upper + 1)
+                     if _slot_key(seq) not in hits and not _abandoned(buffer_cache, seq, conf)),
+                    upper,
+                )
+                keys = [_slot_key(seq) for seq in range(cursor + 1, ready + 1)]
+                batch = [hits[key] for key in keys if key in hits]
+                _merge(batch)
+                buffer_cache.delete_many(keys)
+                cursor = ready
+                buffer_cache.set(CURSOR_KEY, cursor, timeout=None)
+                merged += len(batch)
+                if ready < upper:
+                    break
+            return merged
+        finally:
+            buffer_cache.delete(LOCK_KEY)
+
+
+def _flush_forever(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            flush()
+        except Exception as e:
+            logger.error(f"Failed to flush buffered video views: {str(e)}", exc_info=True)
+        finally:
+            close_old_connections()
+
+
+def _ensure_flusher(conf):
+    global _flusher, _atexit_registered
+    if not conf["BACKGROUND_FLUSH"] or (_flusher and _flusher.is_alive()):
+        return
+    with _flusher_lock:
+        if _flusher and _flusher.is_alive():
+            return
+        _flusher = threading.Thread(
+            target=_flush_forever, args=(conf["FLUSH_INTERVAL"],), name="video-views-flusher", daemon=True
+        )
+        _flusher.start()
+        if not _atexit_registered:
+            atexit.register(flush)
+            _atexit_registered = True
@@ -5,11 +5,27 @@ from .serializers import *
 from rest_framework.permissions import BasePermission, AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status,mixins
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import NotFound, PermissionDenied
 from django.db.models import Count
 from itertools import chain
+from types import SimpleNamespace
 from rest_framework.parsers import MultiPartParser, FormParser, FileUploadParser
-from django.db.models import Q
+from django.db.models import Exists, Q, OuterRef, Prefetch, Subquery
+from django.db import transaction
+from .stats import count_subquery, get_video_stats, hash_viewer, record_view, update_video_stats, sync_comments_count
+from . import view_buffer
+from .comment_tree import active_comments, active_threads
+from .pagination import AdminKeysetPagination, KeysetPagination, RankedPagination
+from .liked_state import liked_state
+from . import search_index, versions
+from . import video_payloads
+from .video_payloads import with_video_relations
+from .recommendations import recommendation_settings
+from users.search import in_order, search_profiles
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from django.conf import settings
+from django.core.cache import cache
 
 
 # custom permissions
@@ -37,32 +53,155 @@ def home(request):
     return render(request, "home.html")
 
 
-class CoursesList(generics.ListAPIView):
-    serializer_class = CourseSerializer
-    permission_classes = [IsAuthenticated]
+class ConditionalGetMixin:
+    """
+    Answers a GET with 304 when If-None-Match matches the ETag built from
+    get_version_parts() (version stamps, see api/versions.py) and the user,
+    computed before anything is serialized. Without VERSION_STAMPS responses
+    carry no ETag.
+    """
+    def get_version_parts(self):
+        # the path, the user and the role only
+        return ()
+
+    def get_etag(self):
+        request = self.request
+        user = request.user
+        return versions.make_etag(
+            type(self).__name__, request.get_host(), request.get_full_path(),
+            user.pk, user.is_staff or user.is_superuser, *self.get_version_parts(),
+        )
 
-    def get_queryset(self):
+    def get(self, request, *args, **kwargs):
+        if not settings.VERSION_STAMPS:
+            return super().get(request, *args, **kwargs)
+        etag = self.get_etag()
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = super().get(request, *args, **kwargs)
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            response['Cache-Control'] = 'private, no-cache'
+            patch_vary_headers(response, ('Cookie', 'Authorization'))
+        return response
+
+
+class SubscribedCoursesMixin(ConditionalGetMixin):
+    """
+    Lists the user's subscribed courses from a per-profile cache of the
+    serialized response. An entry is keyed by the profile's subscriptions
+    stamp and keeps the stamps of the courses it lists; while those still
+    match, a request runs no queries and serializes nothing.
+    """
+    def subscribed_courses(self):
         user = self.request.user.profile
         return Course.active_objects.active().filter(
             subscriber__user=user, subscriber__is_active=True
         )
+
+    def get_version_parts(self):
+        entry = self.get_cache_entry()
+        return [entry['subscriptions'], entry['courses']]
+
+    def get_cache_entry(self):
+        if hasattr(self, '_cache_entry'):
+            return self._cache_entry
+        profile_id = self.request.user.profile.id
+        subscriptions = versions.get_versions(versions.SUBSCRIPTIONS, [profile_id])[profile_id]
+        key = f'response:{type(self).__name__}:{self.request.get_host()}:{profile_id}:{subscriptions}'
+        entry = cache.get(key)
+        if entry is None or versions.get_versions(versions.COURSE, entry['courses']) != entry['courses']:
+            course_ids = list(self.subscribed_courses().values_list('id', flat=True))
+            # stamps read before serializing, a change meanwhile only leaves a stale entry behind
+            entry = {'key': key, 'subscriptions': subscriptions, 'courses': versions.get_versions(versions.COURSE, course_ids), 'data': None}
+        self._cache_entry = entry
+        return entry
+
+    def list(self, request, *args, **kwargs):
+        if not settings.VERSION_STAMPS:
+            return super().list(request, *args, **kwargs)
+        entry = self.get_cache_entry()
+        if entry['data'] is None:
+            entry['data'] = super().list(request, *args, **kwargs).data
+            cache.set(entry['key'], entry, settings.API_RESPONSE_CACHE_TIMEOUT)
+        return Response(entry['data'])
+
+
+class CoursesList(SubscribedCoursesMixin, generics.ListAPIView):
+    serializer_class = CourseSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = 8
+
+    def get_queryset(self):
+        # the videos come from video_payloads, see CourseSerializer
+        return self.subscribed_courses()
         
-class CoursesListOptions(generics.ListAPIView):
+class CoursesListOptions(SubscribedCoursesMixin, generics.ListAPIView):
     serializer_class = CourseSerializerOptions
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        user = self.request.user.profile
-        return Course.active_objects.active().filter(
-            subscriber__user=user, subscriber__is_active=True
-        )
+        return self.subscribed_courses()
         
-class VideosList(generics.ListAPIView):
+class CourseSearchView(generics.ListAPIView):
+    """
+    Ranked hits for `?q=` over the titles and descriptions of the user's
+    subscribed courses and of their active videos (api/search_index.py).
+    """
+    serializer_class = SearchHitSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = RankedPagination
+
+    def get_queryset(self):
+        user = self.request.user.profile
+        courses = Course.active_objects.active().filter(subscriber__user=user, subscriber__is_active=True)
+        return search_index.search(self.request.query_params.get('q', ''), courses)
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        courses = Course.objects.in_bulk({row['course_id'] for row in page})
+        videos = Video.objects.in_bulk({row['video_id'] for row in page if row['video_id']})
+        hits = [
+            SimpleNamespace(
+                kind='video' if row['video_id'] else 'course',
+                object=videos.get(row['video_id']) if row['video_id'] else courses.get(row['course_id']),
+                course=courses.get(row['course_id']),
+                score=row['score'],
+            )
+            for row in page
+        ]
+        # rows deleted since the search was run are left out
+        hits = [hit for hit in hits if hit.object is not None and hit.course is not None]
+        return self.get_paginated_response(self.get_serializer(hits, many=True).data)
+
+
+class VideosList(ConditionalGetMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = VideoSerializer
     lookup_field = "course_title"
-    
-    def get_queryset(self):
+    query_budget = 8
+
+    def get_version_parts(self):
+        course = self.get_course()
+        if course is None:
+            return [None]
+        return [course.id, versions.get_versions(versions.COURSE, [course.id])[course.id]]
+
+    def list(self, request, *args, **kwargs):
+        course = self.get_course()
+        if course is None:
+            return Response([])
+        staff = request.user.is_superuser or request.user.is_staff
+        videos = video_payloads.course_videos(request, [course.id], VideoPayloadSerializer, include_inactive=staff)[course.id]
+        return Response(video_payloads.with_liked_state(request, videos))
+
+    def get_course(self):
+        if not hasattr(self, '_course'):
+            self._course = self.find_course()
+        return self._course
+
+    def find_course(self):
         user = self.request.user.profile
         course_pk = self.kwargs["course_title"]
         if user.user.is_superuser or user.user.is_staff:
@@ -77,11 +216,11 @@ class VideosList(generics.ListAPIView):
                             id=course_pk,
                         )
                     except Course.DoesNotExist:
-                        return Video.objects.none()
+                        return None
                 else:
-                    return Video.objects.none()
+                    return None
                 
-            return Video.objects.all().filter(course=course)
+            return course
         else:
             try:
                 course = Course.active_objects.get(
@@ -98,25 +237,39 @@ class VideosList(generics.ListAPIView):
                             subscriber__is_active=True
                         )
                     except Course.DoesNotExist:
-                        return Video.active_objects.none()
+                        return None
                 else:
-                    return Video.active_objects.none()
+                    return None
                 
-            return Video.active_objects.active().filter(course=course)
+            return course
 
 
-class RetrieveVideo(generics.RetrieveAPIView):
+class RetrieveVideo(ConditionalGetMixin, generics.RetrieveAPIView):
     serializer_class = VideoSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = 8
+
+    def get_version_parts(self):
+        video = self.get_object()
+        return [
+            video.id,
+            versions.get_versions(versions.VIDEO, [video.id])[video.id],
+            versions.get_versions(versions.COURSE, [video.course_id])[video.course_id],
+        ]
 
     def get_object(self):
+        if not hasattr(self, '_video'):
+            self._video = self.find_video()
+        return self._video
+
+    def find_video(self):
         user = self.request.user.profile
         video_id = self.kwargs["pk"]
         
         if self.request.user.is_superuser or self.request.user.is_staff :
-            video = get_object_or_404(Video, id=video_id)
+            video = get_object_or_404(with_video_relations(Video.objects.all()), id=video_id)
         else:
-            video = get_object_or_404(Video, id=video_id, is_active=True)
+            video = get_object_or_404(with_video_relations(Video.objects.all()), id=video_id, is_active=True)
             course = video.course
 
             is_subscribed = SubscribeCourse.objects.filter(
@@ -134,52 +287,79 @@ class ToggleVideoLikeView(generics.UpdateAPIView):
         user = request.user.profile  
         video = get_object_or_404(Video, id=self.kwargs['video_id'])
 
-        like, created = VideoLike.objects.get_or_create(user=user, video=video)
+        with transaction.atomic():
+            like, created = VideoLike.objects.get_or_create(user=user, video=video)
 
-        if not created:
-            like.delete() 
-            return Response({'message': 'Like removed', 'likes_count': video.likes.count()}, status=status.HTTP_200_OK)
+            if not created:
+                like.delete() 
+                stats = update_video_stats(video.id, course_id=video.course_id, likes_count=-1)
+                return Response({'message': 'Like removed', 'likes_count': stats.likes_count}, status=status.HTTP_200_OK)
 
-        return Response({'message': 'Like added', 'likes_count': video.likes.count()}, status=status.HTTP_201_CREATED)
+            stats = update_video_stats(video.id, course_id=video.course_id, likes_count=1)
+
+        return Response({'message': 'Like added', 'likes_count': stats.likes_count}, status=status.HTTP_201_CREATED)
 
 
 
 class IncreaseVideoViews(generics.UpdateAPIView):
-    queryset = VideoViews.objects.all()
+    queryset = VideoViewer.objects.all()
 
     def update(self, request, *args, **kwargs):
         video_id = self.kwargs.get("video_id")
-        video = get_object_or_404(Video, id=video_id)
-        video_views, created = VideoViews.objects.get_or_create(video=video)
-
+        video = get_object_or_404(Video.objects.select_related('stats'), id=video_id)
         client_ip = get_client_ip(request)
-        
-        if client_ip and client_ip not in video_views.views:
-            video_views.views.append(client_ip)
-            video_views.save()
-        
-        print(client_ip, video_views.views)
+
+        if client_ip and view_buffer.is_enabled() and view_buffer.record_hit(video.id, hash_viewer(client_ip)):
+            # counted once the buffer is flushed
+            stats = get_video_stats(video)
+        elif client_ip:
+            with transaction.atomic():
+                stats = record_view(video, client_ip)
+        else:
+            stats = get_video_stats(video)
 
         return Response(
             {
                 "message": "views updated successfully.!",
-                "total_views": len(video_views.views),
+                "total_views": stats.views_count,
             },
             status=status.HTTP_200_OK,
         )
 
 
 # comments
-class VideoCommentsView(generics.ListAPIView):
+class VideoCommentsView(ConditionalGetMixin, generics.ListAPIView):
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+
+    def get_version_parts(self):
+        video = self.get_video()
+        return [video.id, versions.get_versions(versions.COMMENTS, [video.id])[video.id]]
+
+    def get_video(self):
+        if not hasattr(self, 'video'):
+            self.video = get_object_or_404(Video.objects.select_related('stats'), id=self.kwargs["pk"])
+        return self.video
 
     def get_queryset(self):
-        video_id = self.kwargs["pk"]
-        video = get_object_or_404(Video, id=video_id)
-        return VideoComment.active_objects.active().filter(
-            video=video, parent__isnull=True 
-        )
+        return active_comments(self.request, video=self.get_video(), parent__isnull=True)
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        threads = active_threads(request, page, self.video)
+        serializer = self.get_serializer(threads, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class CommentRepliesView(generics.ListAPIView):
+    serializer_class = ReplySerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        comment = get_object_or_404(VideoComment, id=self.kwargs["pk"], is_active=True)
+        return active_comments(self.request, parent=comment)
 
 
 def get_client_ip(request):
@@ -197,7 +377,8 @@ class ToggleCommentLikeView(generics.UpdateAPIView):
         user = request.user.profile
         comment = get_object_or_404(VideoComment, id=self.kwargs['comment_id'])
 
-        existing_like = CommentLike.objects.filter(user=user, comment=comment).first()
+        # through the related manager, so the like already knows its comment (see signals.comment_like_changed)
+        existing_like = comment.likes.filter(user=user).first()
 
         if existing_like:
             existing_like.delete()
@@ -210,6 +391,25 @@ class ToggleCommentLikeView(generics.UpdateAPIView):
 
         return Response({'message': message, 'likes_count': likes_count}, status=status.HTTP_200_OK)
 
+
+class LikedStateView(generics.GenericAPIView):
+    # ?videos=1,2,3&comments=4,5 -> {"videos": {"1": true, ...}, "comments": {...}}
+    permission_classes = [IsAuthenticated]
+    max_ids = 200
+
+    def get(self, request, *args, **kwargs):
+        state = liked_state(request)
+        data = {}
+        for kind, param in (('video', 'videos'), ('comment', 'comments')):
+            try:
+                ids = [int(value) for value in request.query_params.get(param, '').split(',') if value.strip()]
+            except ValueError:
+                return Response({'detail': f'{param} must be a comma separated list of ids'}, status=status.HTTP_400_BAD_REQUEST)
+            if len(ids) > self.max_ids:
+                return Response({'detail': f'at most {self.max_ids} {param} per request'}, status=status.HTTP_400_BAD_REQUEST)
+            data[param] = state.as_dict(kind, ids)
+        return Response(data, status=status.HTTP_200_OK)
+
                 
 class DeleteComment(generics.DestroyAPIView):
     serializer_class = CommentSerializer
@@ -222,6 +422,11 @@ class DeleteComment(generics.DestroyAPIView):
         if user:
             comment = get_object_or_404(VideoComment, user=user, id=kwargs.get('pk'))
             return super().destroy(request, *args, **kwargs)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            sync_comments_count(instance.video_id)
     
 # create comments
 class CreateCommentView(mixins.CreateModelMixin, generics.GenericAPIView):
@@ -233,7 +438,9 @@ class CreateCommentView(mixins.CreateModelMixin, generics.GenericAPIView):
         serializer = self.get_serializer(data=request.data)
 
         if serializer.is_valid():
-            serializer.save(user=request.user.profile, video=video)
+            with transaction.atomic():
+                serializer.save(user=request.user.profile, video=video)
+                update_video_stats(video.id, course_id=video.course_id, comments_count=1)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -251,7 +458,9 @@ class CreateReplyView(mixins.CreateModelMixin, generics.GenericAPIView):
         serializer = self.get_serializer(data=request.data)
 
         if serializer.is_valid():
-            serializer.save(user=request.user.profile, video=parent_comment.video, parent=parent_comment)
+            with transaction.atomic():
+                serializer.save(user=request.user.profile, video=parent_comment.video, parent=parent_comment)
+                update_video_stats(parent_comment.video_id, course_id=parent_comment.video.course_id, comments_count=1)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -260,47 +469,107 @@ class CreateReplyView(mixins.CreateModelMixin, generics.GenericAPIView):
         return self.create(request, *args, **kwargs)
     
 # video recommendations
-class RecommendedVideosAPIView(generics.ListAPIView):
+class RecommendedVideosAPIView(ConditionalGetMixin, generics.ListAPIView):
+    """
+    Up to RECOMMENDATIONS['LIMIT'] related videos from the precomputed index
+    (api/recommendations.py), limited to courses the user may watch. Until
+    the index covers the video, the rest of its course, ordered by priority.
+    """
     permission_classes = [IsAuthenticated]
     serializer_class = RecommendedVideoSerializer
 
-    def get_queryset(self):
-        user = self.request.user.profile
-        video_id = self.kwargs.get('pk')
-        if self.request.user.is_superuser or self.request.user.is_staff:
-            current_video = Video.objects.get(id=video_id)
-            course = current_video.course
-            same_course_videos = Video.objects.filter(course=course)
-            final_recommendations = same_course_videos.order_by('priority')
-            
-            return final_recommendations
-        else:
-            current_video = Video.active_objects.active().get(id=video_id)
-            course = current_video.course
-            same_course_videos = Video.active_objects.active().filter(course=course)
-            final_recommendations = same_course_videos.order_by('priority')
-            
-            return final_recommendations
+    def get_version_parts(self):
+        course_id = self.get_course_id()
+        if course_id is None:
+            return [None]
+        recommended = self.get_recommended()
+        if recommended:
+            stamps = versions.get_versions(versions.VIDEO, [video.id for video in recommended])
+            # the payloads show their course's name too
+            courses = versions.get_versions(versions.COURSE, {video.course_id for video in recommended})
+            return ['index', [(video.id, stamps[video.id]) for video in recommended], sorted(courses.items())]
+        return ['course', course_id, versions.get_versions(versions.COURSE, [course_id])[course_id]]
+
+    def get_course_id(self):
+        if not hasattr(self, '_course_id'):
+            videos = Video.objects.all() if self.is_staff() else Video.active_objects.active()
+            self._course_id = videos.filter(id=self.kwargs.get('pk')).values_list('course_id', flat=True).first()
+        return self._course_id
+
+    def get_recommended(self):
+        if not hasattr(self, '_recommended'):
+            rows = VideoRecommendation.objects.filter(video_id=self.kwargs.get('pk'))
+            if not self.is_staff():
+                rows = rows.filter(
+                    recommended__is_active=True, recommended__course__is_active=True,
+                    recommended__course__subscriber__user=self.request.user.profile,
+                    recommended__course__subscriber__is_active=True,
+                )
+            rows = rows.select_related('recommended__stats', 'recommended__author', 'recommended__course').order_by('rank')
+            self._recommended = [row.recommended for row in rows[:recommendation_settings()["LIMIT"]]]
+        return self._recommended
+
+    def is_staff(self):
+        return self.request.user.is_superuser or self.request.user.is_staff
+
+    def list(self, request, *args, **kwargs):
+        course_id = self.get_course_id()
+        if course_id is None:
+            raise NotFound()
+        recommended = self.get_recommended()
+        if recommended:
+            return Response(self.get_serializer(recommended, many=True).data)
+        payloads = video_payloads.course_videos(request, [course_id], RecommendedVideoSerializer, include_inactive=self.is_staff())
+        return Response(payloads[course_id][:recommendation_settings()["LIMIT"]])
     
     
 # admin view
 # admin -> course
+def with_course_summary(courses):
+    last_video_update = Video.objects.filter(course=OuterRef('pk')).order_by('-update_dt').values('update_dt')[:1]
+    return courses.annotate(
+        videos_count=count_subquery(Video.objects.all(), 'course'),
+        subscribers_count=count_subquery(SubscribeCourse.objects.filter(is_active=True), 'course'),
+        last_video_update=Subquery(last_video_update),
+    )
+
 class CoursesListAdmin(generics.ListAPIView):
-    serializer_class = CourseSerializerAdmin
+    serializer_class = CourseSummarySerializerAdmin
     permission_classes = [IsAuthenticated,IsStaffOrSuperUser]
-    queryset = Course.objects.all()
+    pagination_class = AdminKeysetPagination
+    queryset = with_course_summary(Course.objects.all())
     
 class SearchCoursesForAdmin(generics.ListAPIView):
-    serializer_class = CourseSerializerAdmin
+    serializer_class = CourseSummarySerializerAdmin
     permission_classes = [IsAuthenticated,IsStaffOrSuperUser]
+    pagination_class = AdminKeysetPagination
     def get_queryset(self):
         value = self.request.query_params.get('value', '').strip()
         if not value:
-            return Course.objects.all()
+            return with_course_summary(Course.objects.all())
         
-        return Course.objects.filter(
+        return with_course_summary(Course.objects.filter(
             Q(title__icontains=value)
-        )
+        ))
+
+class CourseVideosAdmin(generics.ListAPIView):
+    serializer_class = VideoSerializer
+    permission_classes = [IsAuthenticated,IsStaffOrSuperUser]
+    pagination_class = AdminKeysetPagination
+    keyset_ordering = ('priority', 'id')
+
+    def get_queryset(self):
+        course = get_object_or_404(Course, id=self.kwargs['pk'])
+        return Video.objects.filter(course=course).select_related('stats', 'author__user', 'course')
+
+class CourseSubscribersAdmin(generics.ListAPIView):
+    serializer_class = SubscribeSerializer
+    permission_classes = [IsAuthenticated,IsStaffOrSuperUser]
+    pagination_class = AdminKeysetPagination
+
+    def get_queryset(self):
+        course = get_object_or_404(Course, id=self.kwargs['pk'])
+        return SubscribeCourse.objects.filter(course=course).select_related('user__user')
 
 class CoursesListAdminOptions(generics.ListAPIView):
     serializer_class = CourseSerializerOptions
@@ -343,7 +612,7 @@ class AddVideo(generics.CreateAPIView):
 
             video = serializer.save(author=user)
             if video:
-                VideoViews.objects.create(video=video)
+                VideoStats.objects.create(video=video)
             else:
                 video.delete()
             return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -448,22 +717,28 @@ class SwapVideoPriorityView(generics.GenericAPIView):
 class SubscriptionsList(generics.ListAPIView):
     permission_classes = [IsAuthenticated,IsStaffOrSuperUser]
     serializer_class = SubscribeSerializerAdmin
-    queryset = SubscribeCourse.objects.all()
+    pagination_class = AdminKeysetPagination
+    queryset = SubscribeCourse.objects.select_related('user__user', 'course')
 
 class SearchSubscriptions(generics.ListAPIView):
     permission_classes = [IsAuthenticated, IsStaffOrSuperUser]
     serializer_class = SubscribeSerializerAdmin
+    pagination_class = AdminKeysetPagination
 
     def get_queryset(self):
-        value = self.request.query_params.get('value', '').strip()
+        return SubscribeCourse.objects.select_related('user__user', 'course')
+
+    def list(self, request, *args, **kwargs):
+        value = request.query_params.get('value', '').strip()
         if not value:
-            return SubscribeCourse.objects.all()
-        
-        return SubscribeCourse.objects.filter(
-            Q(user__full_name__icontains=value) |
-            Q(user__user__email__icontains=value) |
-            Q(user__profile_id__icontains=value)
-        )
+            return super().list(request, *args, **kwargs)
+        # subscriptions of the best matching subscribers first, one page of them
+        limit = self.paginator.get_page_size(request)
+        profile_ids = search_profiles(value, Profile.objects.filter(Exists(SubscribeCourse.objects.filter(user=OuterRef('pk')))), limit=limit)
+        subscriptions = in_order(
+            self.get_queryset().filter(user_id__in=profile_ids).order_by('-id'), profile_ids, key=lambda subscription: subscription.user_id
+        )[:limit]
+        return Response({'next': None, 'results': self.get_serializer(subscriptions, many=True).data})
 class SubscriptionActivationUpdate(generics.UpdateAPIView):
     permission_classes = [IsAuthenticated,IsStaffOrSuperUser]
     serializer_class = SubscriptionActivationSerializer
@@ -486,4 +761,5 @@ class getAllUsersForAddSubscription(generics.ListAPIView):
 class getAllCoursesForAddSubscription(generics.ListAPIView):
     permission_classes = [IsAuthenticated, IsStaffOrSuperUser]
     serializer_class = CourseSerializerOptions
+    pagination_class = AdminKeysetPagination
     queryset = Course.objects.all()
\ No newline at end of file
@@ -35,6 +35,7 @@ MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
+    "users.middleware.SessionRefreshMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
@@ -97,6 +98,78 @@ AUTH_USER_MODEL = "users.User"
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# cache
+# the default in-process cache is only shared by the threads of one worker;
+# point CACHE_BACKEND/CACHE_LOCATION at redis when running several workers.
+CACHES = {
+    "default": {
+        "BACKEND": config("CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": config("CACHE_LOCATION", default="engineeringsozy"),
+    }
+}
+# whether every process sees the same cache (e.g. redis); the LocMem default is
+# per process, so entries another process drops on a change stay visible in
+# the others until they expire.
+SHARED_CACHE = not CACHES["default"]["BACKEND"].endswith("LocMemCache")
+
+# buffered video view hits (api/view_buffer.py) must not be culled before they're
+# flushed: they get their own alias, sized above the buffer's hard limit.
+CACHES["video_views"] = {**CACHES["default"], "KEY_PREFIX": "video_views"}
+if not SHARED_CACHE:
+    CACHES["default"]["OPTIONS"] = {"MAX_ENTRIES": config("CACHE_MAX_ENTRIES", default=50000, cast=int)}
+    CACHES["video_views"]["LOCATION"] += "-video-views"
+
+# authentication
+# seconds an authenticated user + profile stay cached (users/identity.py);
+# saves to either drop the entry right away, but only from a shared cache:
+# without one, other processes may act on a logout or deactivation that late.
+AUTH_IDENTITY_CACHE_TIMEOUT = config("AUTH_IDENTITY_CACHE_TIMEOUT", default=30 if SHARED_CACHE else 5, cast=int)
+# in-process Bloom filter over blacklisted refresh tokens (users/blacklist_filter.py);
+# with several processes it needs a cache they all share.
+JWT_BLACKLIST_FILTER = {
+    "ENABLED": config("JWT_BLACKLIST_FILTER", default=False, cast=bool),
+    "CAPACITY": config("JWT_BLACKLIST_FILTER_CAPACITY", default=10000, cast=int),
+}
+
+# seconds a cached API response (e.g. a student's course list) is kept; entries are
+# validated against version stamps (api/versions.py), so this only bounds memory.
+API_RESPONSE_CACHE_TIMEOUT = config("API_RESPONSE_CACHE_TIMEOUT", default=60 * 60, cast=int)
+# ETags, cached responses and shared video payloads, all keyed by version stamps
+# (api/versions.py). A change replaces the stamps only in the cache of the process
+# that made it, so they need a shared cache; without one they're off by default.
+VERSION_STAMPS = config("VERSION_STAMPS", default=SHARED_CACHE, cast=bool)
+# seconds a version stamp lives; view counts don't replace stamps, so they lag by
+# up to this long in cached responses.
+VERSION_STAMP_TIMEOUT = config("VERSION_STAMP_TIMEOUT", default=15 * 60, cast=int)
+
+# related videos (api/recommendations.py), rebuilt by `manage.py build_recommendations`;
+# TOP_K are stored per video, at most LIMIT of those the user may see are returned.
+RECOMMENDATIONS = {
+    "TOP_K": config("RECOMMENDATIONS_TOP_K", default=20, cast=int),
+    "LIMIT": config("RECOMMENDATIONS_LIMIT", default=10, cast=int),
+}
+
+# video views ingestion
+# key of the stored viewer hashes (api/stats.hash_viewer). It must never rotate:
+# a new value counts every returning viewer again. Deployments that hashed with
+# SECRET_KEY before this setting existed set it to that value once.
+VIDEO_VIEWER_HASH_SALT = config("VIDEO_VIEWER_HASH_SALT")
+# when enabled, view hits are buffered in the cache and merged into the
+# database in batches by a background thread or `manage.py flush_video_views`.
+VIDEO_VIEWS_BUFFER = {
+    "ENABLED": config("VIDEO_VIEWS_BUFFERED", default=False, cast=bool),
+    "MAX_SIZE": config("VIDEO_VIEWS_BUFFER_SIZE", default=5000, cast=int),
+    "FLUSH_INTERVAL": config("VIDEO_VIEWS_FLUSH_INTERVAL", default=10, cast=int),
+    "BATCH_SIZE": 500,
+    "DEDUP_TIMEOUT": 60 * 60,
+    "BACKGROUND_FLUSH": True,
+    "MISSING_SLOT_TIMEOUT": 30,
+    "CACHE": "video_views",
+}
+if CACHES["video_views"]["BACKEND"].endswith("LocMemCache"):
+    # at most 2 * MAX_SIZE pending slots, plus their missing-slot markers
+    CACHES["video_views"]["OPTIONS"] = {"MAX_ENTRIES": VIDEO_VIEWS_BUFFER["MAX_SIZE"] * 4 + 100}
+
 # cors settings
 CORS_ALLOWED_ORIGINS = config("CORS_ALLOWED_ORIGINS", cast=Csv())
 CSRF_TRUSTED_ORIGINS = config("CSRF_TRUSTED_ORIGINS", cast=Csv())
@@ -149,6 +222,7 @@ SIMPLE_JWT = {
     "AUTH_COOKIE_HTTP_ONLY": True,
     "AUTH_COOKIE_PATH": "/",
     "AUTH_COOKIE_SAMESITE": "None",
+    "TOKEN_REFRESH_SERIALIZER": "users.serializers.TokenRefreshSerializer",
 }
 AUTH_COOKIE_SAMESITE = "None"
 AUTH_COOKIE_SECURE = True
@@ -156,7 +230,13 @@ AUTH_COOKIE_HTTP_ONLY = True
 AUTH_COOKIE_DOMAIN = ".engineeringsozy.com"
 
 SESSION_COOKIE_AGE = 24 * 60 * 60  
-SESSION_SAVE_EVERY_REQUEST = True
+# sessions are not saved on every request: users.middleware.SessionRefreshMiddleware
+# re-saves one (extending its expiry to SESSION_COOKIE_AGE from now) once this
+# fraction of SESSION_COOKIE_AGE has passed since it was last saved.
+SESSION_SAVE_EVERY_REQUEST = False
+SESSION_REFRESH_FRACTION = config("SESSION_REFRESH_FRACTION", default=0.05, cast=float)
+# e.g. "django.contrib.sessions.backends.cached_db" to read sessions from the cache
+SESSION_ENGINE = config("SESSION_ENGINE", default="django.contrib.sessions.backends.db")
 
 if not DEBUG:
     SECURE_HSTS_SECONDS = 31536000  
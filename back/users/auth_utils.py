@@ -1,5 +1,10 @@
 from django.contrib.sessions.models import Session
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
 from .models import Profile
+from .identity import invalidate_identity
 
 def force_logout_user(user):
     try:
@@ -14,4 +19,39 @@ def force_logout_user(user):
             except Session.DoesNotExist:
                 pass
     except Profile.DoesNotExist:
-        pass
\ No newline at end of file
+        pass
+
+
+def expired_logins(now=None, grace=None):
+    """
+    Logged in profiles whose login is over: none of their refresh tokens
+    expires after `now - grace`, or their current session is gone or expired.
+    `grace` defaults to ACCESS_TOKEN_LIFETIME, the longest an access token
+    can outlive the refresh token it came with.
+    """
+    now = now or timezone.now()
+    grace = api_settings.ACCESS_TOKEN_LIFETIME if grace is None else grace
+    live_tokens = OutstandingToken.objects.filter(user_id=OuterRef('user_id'), expires_at__gt=now - grace)
+    live_session = Session.objects.filter(session_key=OuterRef('current_session_key'), expire_date__gt=now)
+    return Profile.objects.filter(is_logged_in=True).filter(
+        ~Exists(live_tokens) | (Q(current_session_key__gt='') & ~Exists(live_session))
+    )
+
+
+def sweep_expired_logins(batch_size=1000, grace=None):
+    """Log out every profile in expired_logins() with bulk UPDATEs, returns how many."""
+    now = timezone.now()
+    swept = 0
+    while True:
+        user_ids = list(expired_logins(now, grace).order_by('id').values_list('user_id', flat=True)[:batch_size])
+        if not user_ids:
+            break
+        # re-check on update, the user may have logged in again meanwhile
+        updated = expired_logins(now, grace).filter(user_id__in=user_ids).update(
+            is_logged_in=False, current_session_key=None,
+        )
+        invalidate_identity(*user_ids)
+        swept += updated
+        if not updated:
+            break
+    return swept
\ No newline at end of file
@@ -1,21 +1,39 @@
 import logging
-import jwt
 from django.conf import settings
-from django.shortcuts import get_object_or_404
-from django.utils import timezone
 
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
 
-from .models import Profile, User
-from .auth_utils import force_logout_user
+from .models import Profile
+from .identity import get_identity
 
 logger = logging.getLogger(__name__)
 
 class CookieJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        # JWTAuthentication.get_user, reading the user (with its profile) from the identity cache
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        user = get_identity(user_id)
+        if user is None:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed("The user's password has been changed.", code="password_changed")
+
+        return user
+
     def authenticate(self, request):
         cookie_name = settings.SIMPLE_JWT['AUTH_COOKIE']
         access_token = request.COOKIES.get(cookie_name)
@@ -27,22 +45,7 @@ class CookieJWTAuthentication(JWTAuthentication):
                 access_token = auth_header.split(' ')[1]
 
         if not access_token:
-            # لو مفيش access token، شيك على refresh token
-            refresh_token = request.COOKIES.get(settings.SIMPLE_JWT['AUTH_COOKIE_REFRESH'])
-            if refresh_token:
-                try:
-                    payload = jwt.decode(
-                        refresh_token,
-                        settings.SECRET_KEY,
-                        algorithms=[api_settings.ALGORITHM],
-                        options={"verify_exp": False}
-                    )
-                    if payload.get("exp", 0) < int(timezone.now().timestamp()):
-                        user_id = payload.get("user_id")
-                        if user_id:
-                            force_logout_user(User.objects.get(id=user_id))
-                except Exception as e:
-                    logger.warning(f"Failed to decode expired refresh token: {str(e)}")
+            # expired logins are cleared by `manage.py sweep_expired_logins`, not here
             return None
 
         try:
@@ -52,7 +55,7 @@ class CookieJWTAuthentication(JWTAuthentication):
             if not user.is_active:
                 raise AuthenticationFailed("User account is disabled")
 
-            profile = get_object_or_404(Profile, user=user)
+            profile = user.profile
             if not profile.is_logged_in:
                 raise AuthenticationFailed("User is not logged in")
 
@@ -64,24 +67,6 @@ class CookieJWTAuthentication(JWTAuthentication):
 
         except (InvalidToken, TokenError) as e:
             logger.warning(f"Invalid token: {str(e)}")
-            try:
-                refresh_token = request.COOKIES.get(settings.SIMPLE_JWT['AUTH_COOKIE_REFRESH'])
-                if refresh_token:
-                    try:
-                        payload = jwt.decode(
-                            refresh_token,
-                            settings.SECRET_KEY,
-                            algorithms=[api_settings.ALGORITHM],
-                            options={"verify_exp": False}
-                        )
-                        if payload.get("exp", 0) < int(timezone.now().timestamp()):
-                            user_id = payload.get("user_id")
-                            if user_id:
-                                force_logout_user(User.objects.get(id=user_id))
-                    except Exception as e:
-                        logger.warning(f"Failed to decode expired refresh token: {str(e)}")
-            except Exception as inner_e:
-                logger.warning(f"Failed to auto-logout using refresh token: {str(inner_e)}")
             raise AuthenticationFailed("Invalid or expired token")
 
         except Profile.DoesNotExist:
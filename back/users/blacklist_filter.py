@@ -0,0 +1,173 @@
+"""
+In-process Bloom filter over the JTIs of blacklisted refresh tokens that
+haven't expired yet, so checking a token that was never blacklisted needs no
+query on token_blacklist_blacklistedtoken.
+
+Processes stay in sync through a version counter in the cache: every
+committed blacklisting bumps it and publishes its JTI under the new version,
+and a process whose filter is behind adds the JTIs it missed. It rebuilds the
+filter from the database only when one of them isn't in the cache (expired,
+evicted, or not written yet). The row is visible before the bump, so a
+blacklisting marks its JTI pending before it's saved, and until it's
+published every process checks that token against the database. With more
+than one process this needs a cache shared by all of them (CACHE_BACKEND).
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+DEFAULTS = {
+    "ENABLED": False,
+    "CAPACITY": 10000,
+    "ERROR_RATE": 0.001,
+    "REBUILD_INTERVAL": 5 * 60,
+    # seconds a blacklisting may stay pending; one whose transaction rolled back never bumps
+    "PENDING_TIMEOUT": 60,
+    # seconds a published JTI stays in the cache; a filter further behind is rebuilt
+    "PUBLISHED_TIMEOUT": 10 * 60,
+    # most published JTIs a filter catches up with before it rather rebuilds
+    "MAX_CATCH_UP": 1000,
+}
+
+VERSION_KEY = "auth:blacklist:version"
+
+
+def pending_key(jti):
+    return f"auth:blacklist:pending:{jti}"
+
+
+def published_key(version):
+    return f"auth:blacklist:published:{version}"
+
+
+def filter_settings():
+    return {**DEFAULTS, **getattr(settings, "JWT_BLACKLIST_FILTER", {})}
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.capacity = max(1, capacity)
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+def _current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # start from the clock, so a counter lost to eviction never repeats an old value
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+class BlacklistFilter:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bloom = None
+        self.version = None
+        self.built_at = 0.0
+
+    def might_contain(self, jti):
+        """False only if `jti` is certainly not blacklisted."""
+        conf = filter_settings()
+        if not conf["ENABLED"]:
+            return True
+        state = cache.get_many([VERSION_KEY, pending_key(jti)])
+        if pending_key(jti) in state:
+            # this token's blacklisting is being committed, the filters may not have it yet
+            return True
+        version = state[VERSION_KEY] if VERSION_KEY in state else _current_version()
+        with self.lock:
+            if version != self.version and not self.catch_up(version, conf):
+                self.bloom = None
+            if (
+                self.bloom is None
+                or self.bloom.count > self.bloom.capacity
+                or time.monotonic() - self.built_at > conf["REBUILD_INTERVAL"]
+            ):
+                self.rebuild(version, conf)
+            return jti in self.bloom
+
+    def catch_up(self, version, conf):
+        """Add the JTIs published since the filter's version; False if some aren't in the cache."""
+        if self.bloom is None or not self.version < version <= self.version + conf["MAX_CATCH_UP"]:
+            return False
+        keys = [published_key(v) for v in range(self.version + 1, version + 1)]
+        published = cache.get_many(keys)
+        if len(published) < len(keys):
+            return False
+        for jti in published.values():
+            self.bloom.add(jti)
+        self.version = version
+        return True
+
+    def rebuild(self, version, conf):
+        # `version` was read before this query, so rows committed meanwhile only cause another rebuild
+        jtis = list(
+            BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now()).values_list('token__jti', flat=True)
+        )
+        bloom = BloomFilter(max(conf["CAPACITY"], 2 * len(jtis)), conf["ERROR_RATE"])
+        for jti in jtis:
+            bloom.add(jti)
+        self.bloom, self.version, self.built_at = bloom, version, time.monotonic()
+
+    def pending(self, jti, conf):
+        """Called before a blacklisting is saved: trust no filter for `jti` until blacklisted() publishes it."""
+        cache.set(pending_key(jti), True, timeout=conf["PENDING_TIMEOUT"])
+
+    def blacklisted(self, jti):
+        """Called once a blacklisting committed: publish it, and keep the local filter if nothing else changed."""
+        conf = filter_settings()
+        try:
+            version = cache.incr(VERSION_KEY)
+        except ValueError:
+            # the counter was lost: every filter rebuilds from the new one
+            _current_version()
+        else:
+            cache.set(published_key(version), jti, timeout=conf["PUBLISHED_TIMEOUT"])
+            with self.lock:
+                if self.bloom is not None and self.version == version - 1:
+                    self.bloom.add(jti)
+                    self.version = version
+        cache.delete(pending_key(jti))
+
+
+blacklist_filter = BlacklistFilter()
+
+
+@receiver(pre_save, sender=BlacklistedToken)
+def token_blacklisting(sender, instance, **kwargs):
+    conf = filter_settings()
+    if instance._state.adding and conf["ENABLED"]:
+        blacklist_filter.pending(instance.token.jti, conf)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def token_blacklisted(sender, instance, created, **kwargs):
+    if created and filter_settings()["ENABLED"]:
+        jti = instance.token.jti
+        transaction.on_commit(lambda: blacklist_filter.blacklisted(jti))
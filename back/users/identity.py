@@ -0,0 +1,74 @@
+"""
+Short-lived cache of the authenticated identity: the User with its Profile
+(is_logged_in, current_session_key, ...) already attached, so authenticating
+a request and reading `request.user.profile` afterwards costs no queries.
+
+Entries are dropped whenever a User or Profile is saved or deleted (see the
+receivers below); code that changes them with queryset.update() must call
+invalidate_identity itself. Dropping an entry only reaches the cache it runs
+against: with several processes the cache has to be shared between them (see
+AUTH_IDENTITY_CACHE_TIMEOUT in settings).
+
+The password hash is never cached: it's deferred, and loaded on access.
+
+The identity is read-only. It can be up to AUTH_IDENTITY_CACHE_TIMEOUT old,
+and saving it would write those stale columns (version included) over
+concurrent changes, so saving the user or the profile it returns raises
+ValueError. Code that changes them loads them first, e.g.
+`Profile.objects.get(user=request.user)`.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Profile, User
+
+KEY_PREFIX = 'auth:identity:'
+
+
+def identity_key(user_id):
+    return f'{KEY_PREFIX}{user_id}'
+
+
+def get_identity(user_id):
+    """The user with `user.profile` loaded, or None if there's no such user or profile."""
+    user = cache.get(identity_key(user_id))
+    if user is None:
+        user = User.objects.select_related('profile').defer('password').filter(id=user_id).first()
+        if user is None or not hasattr(user, 'profile'):
+            return None
+        cache.set(identity_key(user_id), user, settings.AUTH_IDENTITY_CACHE_TIMEOUT)
+    user._read_only_identity = True
+    user.profile._read_only_identity = True
+    return user
+
+
+def invalidate_identity(*user_ids):
+    keys = [identity_key(user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    # a request that read the old rows before the commit may have cached them again
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+@receiver(pre_save, sender=User)
+@receiver(pre_save, sender=Profile)
+def refuse_identity_save(sender, instance, **kwargs):
+    if getattr(instance, '_read_only_identity', False):
+        raise ValueError(
+            f"{sender.__name__} {instance.pk} comes from the identity cache and may be stale, "
+            "load it from the database before saving it"
+        )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    invalidate_identity(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def profile_changed(sender, instance, **kwargs):
+    invalidate_identity(instance.user_id)
@@ -0,0 +1,40 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired outstanding refresh tokens and their blacklist entries in bounded batches. "
+        "Meant to run on a schedule (cron), unlike flushexpiredtokens it never deletes everything in one statement."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--max-batches', type=int, default=None, help="stop after this many batches")
+        parser.add_argument('--sleep', type=float, default=0.0, help="seconds to pause between batches")
+        parser.add_argument('--grace', type=int, default=0, help="keep tokens that expired less than this many seconds ago")
+
+    def handle(self, *args, **options):
+        cutoff = aware_utcnow() - timedelta(seconds=options['grace'])
+        expired = OutstandingToken.objects.filter(expires_at__lte=cutoff).order_by('id').values_list('id', flat=True)
+
+        batches = outstanding = blacklisted = 0
+        while options['max_batches'] is None or batches < options['max_batches']:
+            ids = list(expired[:options['batch_size']])
+            if not ids:
+                break
+            with transaction.atomic():
+                blacklisted += BlacklistedToken.objects.filter(token_id__in=ids).delete()[0]
+                outstanding += OutstandingToken.objects.filter(id__in=ids).delete()[0]
+            batches += 1
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {outstanding} outstanding and {blacklisted} blacklisted token(s) in {batches} batch(es)."
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from users.search import rebuild_profile_search
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute Profile.search_text, which the admin user search matches, from full name, email "
+        "and profile_id. Profile.save() keeps it current; run this after writing profiles or emails "
+        "with bulk_create or queryset.update()."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--missing', action='store_true', help="only profiles without a search_text")
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        changed = rebuild_profile_search(only_missing=options['missing'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Updated the search text of {changed} profile(s)."))
@@ -0,0 +1,29 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from users.auth_utils import sweep_expired_logins
+
+
+class Command(BaseCommand):
+    help = (
+        "Log out profiles whose refresh tokens or session expired (is_logged_in, current_session_key) "
+        "with bulk UPDATEs. Authentication only reads these fields, run this from cron or with --loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="keep sweeping every --interval seconds")
+        parser.add_argument('--interval', type=int, default=60)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--grace', type=int, default=None, help="seconds, defaults to ACCESS_TOKEN_LIFETIME")
+
+    def handle(self, *args, **options):
+        grace = timedelta(seconds=options['grace']) if options['grace'] is not None else None
+
+        while True:
+            swept = sweep_expired_logins(options['batch_size'], grace)
+            self.stdout.write(f"Logged out {swept} expired login(s).")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
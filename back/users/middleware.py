@@ -1,29 +1,91 @@
+import time
+
+from django.conf import settings
 from django.contrib.sessions.models import Session
+from django.core.cache import cache
 from .models import Profile
+from .identity import get_identity
 from django.utils import timezone
 from datetime import timedelta
 
+SESSION_VALID_KEY_PREFIX = 'auth:session-valid-until:'
+SESSION_REFRESHED_KEY = '_refreshed_at'
+
+
 class SingleSessionMiddleware:
+    """
+    Logs a profile out once its current session expired or disappeared.
+
+    The expiry of a session that was found valid is cached under its key, so
+    until then a request only reads the cached identity and that timestamp.
+    Login and logout change `current_session_key` (and drop the identity), so
+    they never hit a stale entry.
+    """
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
-        if request.user.is_authenticated:
-            try:
-                profile = Profile.objects.get(user=request.user)
-                if profile.is_logged_in and profile.current_session_key:
-                    try:
-                        session = Session.objects.get(session_key=profile.current_session_key)
-                        if session.expire_date < timezone.now():
-                            profile.is_logged_in = False
-                            profile.current_session_key = None
-                            profile.save()
-                    except Session.DoesNotExist:
+        if request.user.is_authenticated and not self.session_still_valid(request.user):
+            self.check_session(request.user)
+
+        response = self.get_response(request)
+        return response
+
+    def session_still_valid(self, user):
+        identity = get_identity(user.pk)
+        if identity is None:
+            return True
+        profile = identity.profile
+        if not (profile.is_logged_in and profile.current_session_key):
+            return True
+        valid_until = cache.get(SESSION_VALID_KEY_PREFIX + profile.current_session_key)
+        return valid_until is not None and valid_until > time.time()
+
+    def check_session(self, user):
+        try:
+            profile = Profile.objects.get(user=user)
+            if profile.is_logged_in and profile.current_session_key:
+                try:
+                    session = Session.objects.get(session_key=profile.current_session_key)
+                    if session.expire_date < timezone.now():
                         profile.is_logged_in = False
                         profile.current_session_key = None
                         profile.save()
-            except Profile.DoesNotExist:
-                pass
+                    else:
+                        valid_until = session.expire_date.timestamp()
+                        cache.set(
+                            SESSION_VALID_KEY_PREFIX + session.session_key, valid_until,
+                            max(1, int(valid_until - time.time())),
+                        )
+                except Session.DoesNotExist:
+                    profile.is_logged_in = False
+                    profile.current_session_key = None
+                    profile.save()
+        except Profile.DoesNotExist:
+            pass
+
 
+class SessionRefreshMiddleware:
+    """
+    Replaces SESSION_SAVE_EVERY_REQUEST: a session that wasn't modified is
+    only saved again, pushing its expiry (and cookie) SESSION_COOKIE_AGE
+    ahead, once SESSION_REFRESH_FRACTION of that age passed since its last
+    save. Sessions so expire SESSION_COOKIE_AGE after the last activity, give
+    or take that fraction, without a write per request.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
         response = self.get_response(request)
+
+        session = getattr(request, 'session', None)
+        if session is not None:
+            # loads the session first, one that's gone from the store is empty
+            refreshed_at = session.get(SESSION_REFRESHED_KEY, 0)
+            now = time.time()
+            interval = settings.SESSION_COOKIE_AGE * settings.SESSION_REFRESH_FRACTION
+            if not session.is_empty() and (session.modified or now - refreshed_at >= interval):
+                # marks the session modified, SessionMiddleware saves it
+                session[SESSION_REFRESHED_KEY] = now
         return response
\ No newline at end of file
@@ -80,13 +80,36 @@ class Profile(models.Model):
     is_private = models.BooleanField(default=False)
     is_logged_in = models.BooleanField(default=False)
     current_session_key = models.CharField(max_length=40, blank=True, null=True)
+    # bumped on every save, check-auth hands it out so clients know when to reload the profile
+    version = models.PositiveIntegerField(default=0)
+    # normalized full name, email and profile_id, what the admin search matches (users/search.py)
+    search_text = models.TextField(blank=True, default='', editable=False)
     
     objects = models.Manager()
     active_objects = ActiveObjectsQuerySet.as_manager()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # what search_text was computed from, see save()
+        instance._search_source = (instance.__dict__.get('full_name'), instance.__dict__.get('profile_id'))
+        return instance
+
     def save(self, *args, **kwargs):
         if not self.profile_id:
             self.profile_id = f"profile_{uuid.uuid4().hex[:8]}"  
+        self.version += 1
+        update_fields = kwargs.get('update_fields')
+        # saving search_text explicitly recomputes it (the email changed), otherwise only when its fields did
+        source = (self.full_name, self.profile_id)
+        if (update_fields is not None and 'search_text' in update_fields) or source != getattr(self, '_search_source', None):
+            from .search import profile_search_text
+            self.search_text = profile_search_text(self.full_name, self.user.email, self.profile_id)
+            self._search_source = source
+            if update_fields is not None:
+                update_fields = {*update_fields, 'search_text'}
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'version'}
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -0,0 +1,177 @@
+"""
+Indexed admin search over profiles: full name, email and profile_id.
+
+Profile.search_text keeps those fields normalized (normalize_arabic) and is
+what gets searched, through an index the database can use for substring
+matches:
+
+- PostgreSQL: a pg_trgm GIN index, ranked by trigram word similarity;
+- SQLite: an FTS5 table with the trigram tokenizer, kept in sync by
+  triggers and ranked by bm25.
+
+Both are created after migrate (create_search_index), since migrations are
+generated per deployment. search_text is kept by Profile.save(); rows
+written around it (bulk_create, queryset.update()) are fixed with `manage.py
+rebuild_profile_search`. On other databases, without FTS5 trigram support,
+or for queries shorter than a trigram it falls back to icontains on
+search_text.
+"""
+import logging
+import re
+import unicodedata
+
+from django.db import DatabaseError, connections, router
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_init, post_migrate, post_save
+from django.dispatch import receiver
+
+from .models import Profile, User
+
+logger = logging.getLogger(__name__)
+
+# harakat, Quranic marks and tatweel
+DIACRITICS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+# أ إ آ ٱ -> ا, ى -> ي, ة -> ه
+LETTERS = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ة': 'ه',
+})
+MIN_INDEXED_LENGTH = 3
+
+FTS_TABLE = 'users_profile_search'
+
+
+def normalize_arabic(text):
+    """Casefolded `text` without Arabic diacritics or tatweel, alef/yaa/taa marbuta variants unified."""
+    text = unicodedata.normalize('NFKC', text or '')
+    return DIACRITICS.sub('', text).translate(LETTERS).casefold()
+
+
+def profile_search_text(full_name, email, profile_id):
+    return ' '.join(normalize_arabic(part) for part in (full_name, email, profile_id) if part)
+
+
+def sqlite_statements(table):
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"search_text, content='{table}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text); END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_text) VALUES ('delete', old.id, old.search_text); END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE OF search_text ON {table} BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_text) VALUES ('delete', old.id, old.search_text); "
+        f"INSERT INTO {FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text); END",
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+    ]
+
+
+def postgresql_statements(table):
+    return [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        f"CREATE INDEX IF NOT EXISTS {table}_search_trgm ON {table} USING gin (search_text gin_trgm_ops)",
+    ]
+
+
+def rebuild_profile_search(using='default', only_missing=False, batch_size=500):
+    """Recompute search_text of every profile (or of those without one), returns how many changed."""
+    profiles = Profile.objects.using(using).select_related('user').order_by('id')
+    if only_missing:
+        profiles = profiles.filter(search_text='')
+    changed = []
+    total = 0
+    for profile in profiles.iterator(chunk_size=batch_size):
+        search_text = profile_search_text(profile.full_name, profile.user.email, profile.profile_id)
+        if search_text != profile.search_text:
+            profile.search_text = search_text
+            changed.append(profile)
+        if len(changed) == batch_size:
+            Profile.objects.using(using).bulk_update(changed, ['search_text'])
+            total += len(changed)
+            changed = []
+    if changed:
+        Profile.objects.using(using).bulk_update(changed, ['search_text'])
+        total += len(changed)
+    return total
+
+
+def create_search_index(using='default'):
+    """Fill search_text where it's missing, then create the index (idempotent)."""
+    rebuild_profile_search(using, only_missing=True)
+
+    connection = connections[using]
+    statements = {'sqlite': sqlite_statements, 'postgresql': postgresql_statements}.get(connection.vendor)
+    if statements is None:
+        return
+    try:
+        with connection.cursor() as cursor:
+            for statement in statements(Profile._meta.db_table):
+                cursor.execute(statement)
+    except DatabaseError as error:
+        # e.g. SQLite without FTS5 trigrams (< 3.34) or no permission to create the extension
+        logger.warning("Profile search index not created, searching without it: %s", error)
+
+
+_fts_tables = {}
+
+
+def has_fts_table(connection):
+    key = (connection.alias, connection.settings_dict['NAME'])
+    if not _fts_tables.get(key):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            _fts_tables[key] = cursor.fetchone() is not None
+    return _fts_tables[key]
+
+
+def search_profiles(value, profiles=None, limit=50):
+    """Ids of the `profiles` matching `value`, best match first, at most `limit`."""
+    query = ' '.join(normalize_arabic(value).split())
+    if not query:
+        return []
+    profiles = Profile.objects.all() if profiles is None else profiles
+    connection = connections[router.db_for_read(Profile)]
+    matches = profiles.filter(search_text__contains=query)
+
+    if len(query) >= MIN_INDEXED_LENGTH and connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        matches = matches.annotate(rank=TrigramWordSimilarity(query, 'search_text')).order_by('-rank', '-id')
+    elif len(query) >= MIN_INDEXED_LENGTH and connection.vendor == 'sqlite' and has_fts_table(connection):
+        phrase = '"%s"' % query.replace('"', '""')
+        table = Profile._meta.db_table
+        matches = profiles.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [phrase])
+        ).annotate(
+            # bm25, lower is better
+            rank=RawSQL(f"SELECT rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid = {table}.id", [phrase])
+        ).order_by('rank', '-id')
+    else:
+        matches = matches.order_by('-id')
+    return list(matches.values_list('id', flat=True)[:limit])
+
+
+def in_order(objects, ids, key):
+    """`objects` sorted like `ids` (by `key(obj)`)."""
+    position = {object_id: index for index, object_id in enumerate(ids)}
+    return sorted(objects, key=lambda obj: position[key(obj)])
+
+
+@receiver(post_migrate)
+def search_index_after_migrate(sender, using='default', **kwargs):
+    if sender.name == 'users':
+        create_search_index(using)
+
+
+@receiver(post_init, sender=User)
+def remember_email(sender, instance, **kwargs):
+    instance._search_email = instance.__dict__.get('email')
+
+
+@receiver(post_save, sender=User)
+def email_changed(sender, instance, created, **kwargs):
+    if not created and instance.email != instance._search_email:
+        for profile in Profile.objects.filter(user=instance):
+            profile.user = instance
+            profile.save(update_fields=['search_text'])
+    instance._search_email = instance.email
@@ -1,9 +1,11 @@
 from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
 from .models import User,Profile
 from django import forms
 from django.core.exceptions import ValidationError
 from django.contrib.auth.password_validation import validate_password
 from api.models import Course
+from .tokens import RefreshToken
 
 
 class UserAllData(serializers.ModelSerializer):
@@ -194,4 +196,21 @@ class UserSerializerForAdmin(serializers.ModelSerializer):
     profile = ProfileSerializerForAdmin(read_only=True)
     class Meta:
         model = User
-        fields = ('email','user_name', 'start_date','is_superuser','is_staff','last_login','profile')
\ No newline at end of file
+        fields = ('email','user_name', 'start_date','is_superuser','is_staff','last_login','profile')
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    token_class = RefreshToken
+
+
+# the lean profile check-auth returns by default
+class ProfileSerializerForAuth(serializers.ModelSerializer):
+    avatar = serializers.SerializerMethodField()
+    is_superuser = serializers.CharField(source='user.is_superuser',read_only=True)
+    is_staff = serializers.CharField(source='user.is_staff',read_only=True)
+
+    class Meta:
+        model = Profile
+        fields = ['profile_id', 'full_name', 'avatar', 'is_active', 'is_private', 'is_superuser', 'is_staff', 'version']
+
+    get_avatar = ProfileSerializer.get_avatar
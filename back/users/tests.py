@@ -1,3 +1,372 @@
-from django.test import TestCase
+import os
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import F
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from api.testing import RouteWalkMixin, count_queries, create_user, seed_dataset
+from .blacklist_filter import VERSION_KEY, BlacklistFilter, BloomFilter
+from .identity import get_identity, identity_key
+from .middleware import SESSION_REFRESHED_KEY, SingleSessionMiddleware
+from .models import Profile
+from .search import normalize_arabic, search_profiles
+from .tokens import RefreshToken
+
+
+def profile_kwargs(data, role):
+    # students act on their own profile, admins on somebody else's
+    user = data.student if role == 'student' else data.other
+    return {'profile_id': user.profile.profile_id}
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class UsersRoutesPerformanceTests(RouteWalkMixin, TestCase):
+    urlconf = 'users.urls'
+    baseline_file = os.path.join(os.path.dirname(__file__), 'perf_baselines.json')
+    route_kwargs = {
+        'user-profile': profile_kwargs,
+        'user-profile-update': profile_kwargs,
+        'user-update-permissions': profile_kwargs,
+        'user-profile-update-avatar': profile_kwargs,
+        'delete-user': profile_kwargs,
+        'logout-user': profile_kwargs,
+        'admin-reset-password': profile_kwargs,
+    }
+    payloads = {
+        'token_obtain_pair': lambda data, role: {'email': data.spare.email, 'password': 'pass12345!'},
+        'user-profile-update': lambda data, role: {'full_name': 'renamed', 'bio': '', 'email': data.student.email},
+        'user-update-permissions': lambda data, role: {'is_active': True, 'is_staff': False, 'is_superuser': False},
+        'search_users': lambda data, role: {'value': 'other'},
+        'create_user': lambda data, role: {
+            'email': 'new@example.com', 'full_name': 'new', 'password': 'Str0ng-pass-9876', 'password2': 'Str0ng-pass-9876',
+        },
+        'admin-reset-password': lambda data, role: {'password': 'Str0ng-pass-9876', 'password2': 'Str0ng-pass-9876'},
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_dataset()
+
+    def test_routes_against_baselines(self):
+        self.compare_with_baselines(self.walk())
+
+
+class SingleSessionMiddlewareTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user('student@example.com')
+        self.session = SessionStore()
+        self.session.create()
+        self.user.profile.is_logged_in = True
+        self.user.profile.current_session_key = self.session.session_key
+        self.user.profile.save()
+        self.middleware = SingleSessionMiddleware(lambda request: None)
+
+    def call(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        with count_queries() as queries:
+            self.middleware(request)
+        self.user.profile.refresh_from_db()
+        return len(queries)
+
+    def test_valid_session_is_checked_once(self):
+        self.assertGreater(self.call(), 0)
+        self.assertEqual(self.call(), 0)
+        self.assertTrue(self.user.profile.is_logged_in)
+
+    def test_expired_session_logs_out(self):
+        Session.objects.filter(session_key=self.session.session_key).update(
+            expire_date=timezone.now() - timedelta(seconds=1)
+        )
+        self.call()
+        self.assertFalse(self.user.profile.is_logged_in)
+        self.assertIsNone(self.user.profile.current_session_key)
+
+    def test_new_login_is_checked_again(self):
+        self.call()
+        Session.objects.all().delete()
+        session = SessionStore()
+        session.create()
+        self.user.profile.current_session_key = session.session_key
+        self.user.profile.save()
+        self.assertGreater(self.call(), 0)
+        self.assertTrue(self.user.profile.is_logged_in)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, SESSION_REFRESH_FRACTION=0.1)
+class SessionRefreshMiddlewareTests(TestCase):
+
+    def setUp(self):
+        self.user = create_user('student@example.com')
+        self.client.force_login(self.user)
+
+    def session_writes(self):
+        with count_queries() as queries:
+            self.client.get('/users/check-auth/')
+        return len([sql for sql in queries if sql.startswith(('UPDATE "django_session"', 'INSERT INTO "django_session"'))])
+
+    def test_session_is_saved_once_per_interval(self):
+        self.session_writes()
+        self.assertEqual(self.session_writes(), 0)
+
+        session = self.client.session
+        session[SESSION_REFRESHED_KEY] -= 0.1 * 24 * 60 * 60
+        session.save()
+        expire_date = Session.objects.get(session_key=session.session_key).expire_date
+        self.assertEqual(self.session_writes(), 1)
+        self.assertGreater(Session.objects.get(session_key=session.session_key).expire_date, expire_date)
+        self.assertEqual(self.session_writes(), 0)
+
+
+@override_settings(JWT_BLACKLIST_FILTER={'ENABLED': True})
+class BlacklistFilterTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user('student@example.com')
+
+    def blacklist_lookups(self, token):
+        with count_queries() as queries:
+            RefreshToken(str(token))
+        return len([sql for sql in queries if 'token_blacklist_blacklistedtoken' in sql])
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(1000, 0.01)
+        values = [f'jti-{i}' for i in range(1000)]
+        for value in values:
+            bloom.add(value)
+        self.assertTrue(all(value in bloom for value in values))
+        self.assertLess(sum(f'other-{i}' in bloom for i in range(1000)), 50)
+
+    def test_token_that_was_never_blacklisted_skips_the_lookup(self):
+        token = RefreshToken.for_user(self.user)
+        RefreshToken(str(token))
+        self.assertEqual(self.blacklist_lookups(token), 0)
+
+    def test_blacklisted_token_is_rejected(self):
+        token = RefreshToken.for_user(self.user)
+        RefreshToken(str(token))
+        with self.captureOnCommitCallbacks(execute=True):
+            token.blacklist()
+        with self.assertRaises(TokenError):
+            RefreshToken(str(token))
+
+    def test_token_is_rejected_while_its_blacklisting_commits(self):
+        token = RefreshToken.for_user(self.user)
+        other = RefreshToken.for_user(self.user)
+        RefreshToken(str(token))
+        with self.captureOnCommitCallbacks() as callbacks:
+            token.blacklist()
+            # the row is there, the version isn't bumped yet
+            with self.assertRaises(TokenError):
+                RefreshToken(str(token))
+            # only the token being blacklisted is checked against the database meanwhile
+            self.assertEqual(self.blacklist_lookups(other), 0)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.blacklist_lookups(other), 0)
+
+    def test_other_processes_add_published_tokens_without_rebuilding(self):
+        token = RefreshToken.for_user(self.user)
+        other = RefreshToken.for_user(self.user)
+        process = BlacklistFilter()
+        self.assertFalse(process.might_contain(token['jti']))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            token.blacklist()
+        with count_queries() as queries:
+            self.assertTrue(process.might_contain(token['jti']))
+            self.assertFalse(process.might_contain(other['jti']))
+        self.assertEqual(queries, [])
+
+    def test_token_blacklisted_by_another_process_is_rejected(self):
+        token = RefreshToken.for_user(self.user)
+        RefreshToken(str(token))
+        # another process: commits the row, then bumps the version
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=token['jti']))
+        cache.incr(VERSION_KEY)
+        with self.assertRaises(TokenError):
+            RefreshToken(str(token))
+
+
+class PurgeJwtTokensTests(TestCase):
+
+    def test_deletes_expired_tokens_in_batches(self):
+        user = create_user('student@example.com')
+        now = timezone.now()
+        for index, expires_at in enumerate([now - timedelta(hours=1)] * 3 + [now + timedelta(hours=1)]):
+            token = OutstandingToken.objects.create(user=user, jti=f'jti-{index}', token='-', expires_at=expires_at)
+            BlacklistedToken.objects.create(token=token)
+
+        call_command('purge_jwt_tokens', batch_size=2, max_batches=1, stdout=StringIO())
+        self.assertEqual(OutstandingToken.objects.count(), 2)
+        call_command('purge_jwt_tokens', batch_size=2, stdout=StringIO())
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), ['jti-3'])
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class SweepExpiredLoginsTests(TestCase):
+
+    def logged_in(self, email, token_expires_in, session_key=None):
+        user = create_user(email)
+        OutstandingToken.objects.create(
+            user=user, jti=f'jti-{email}', token='-', expires_at=timezone.now() + token_expires_in,
+        )
+        user.profile.is_logged_in = True
+        user.profile.current_session_key = session_key
+        user.profile.save()
+        return user
+
+    def test_sweeps_expired_tokens_and_sessions(self):
+        expired = self.logged_in('expired@example.com', -timedelta(hours=1))
+        active = self.logged_in('active@example.com', timedelta(minutes=3))
+        no_session = self.logged_in('session@example.com', timedelta(minutes=3), session_key='gone')
+
+        call_command('sweep_expired_logins', batch_size=1, stdout=StringIO())
+        for user, logged_in in ((expired, False), (active, True), (no_session, False)):
+            user.profile.refresh_from_db()
+            self.assertEqual(user.profile.is_logged_in, logged_in, user.email)
+
+    def test_expired_login_does_not_block_a_new_one(self):
+        for token_expires_in, status in ((-timedelta(hours=1), 200), (timedelta(minutes=3), 403)):
+            user = self.logged_in(f'{status}@example.com', token_expires_in)
+            response = self.client.post(
+                '/users/token/', {'email': user.email, 'password': 'pass12345!'}, content_type='application/json'
+            )
+            self.assertEqual(response.status_code, status)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class CheckAuthTests(TestCase):
+
+    def setUp(self):
+        self.user = create_user('student@example.com')
+        response = self.client.post(
+            '/users/token/', {'email': self.user.email, 'password': 'pass12345!'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_lean_payload_and_full_profile(self):
+        profile = self.client.get('/users/check-auth/').json()['user']['profile']
+        self.assertNotIn('devices', profile)
+        self.assertEqual(profile['is_staff'], 'False')
+        self.assertIn('devices', self.client.get('/users/check-auth/?full=1').json()['user']['profile'])
+
+    def test_unchanged_profile_is_not_modified(self):
+        etag = self.client.get('/users/check-auth/')['ETag']
+        with count_queries() as queries:
+            response = self.client.get('/users/check-auth/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(queries, [])
+
+        profile = self.user.profile
+        profile.refresh_from_db()
+        version = profile.version
+        profile.bio = 'changed'
+        profile.save(update_fields=['bio'])
+        response = self.client.get('/users/check-auth/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['user']['profile']['version'], version + 1)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_anonymous(self):
+        self.client.cookies.clear()
+        self.assertEqual(self.client.get('/users/check-auth/').status_code, 401)
+
+    def test_profile_update_keeps_changes_the_cached_identity_missed(self):
+        profile = self.user.profile
+        self.client.get('/users/check-auth/')
+        # written by a process whose cache this one doesn't share, so the identity here stays stale
+        Profile.objects.filter(pk=profile.pk).update(bio='concurrent', version=F('version') + 1)
+        version = Profile.objects.get(pk=profile.pk).version
+
+        response = self.client.patch(
+            f'/users/profile/{profile.profile_id}/update/', {'full_name': 'renamed'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        profile.refresh_from_db()
+        self.assertEqual((profile.full_name, profile.bio, profile.version), ('renamed', 'concurrent', version + 1))
+
+    def test_cached_identity_is_read_only(self):
+        user = get_identity(self.user.id)
+        with self.assertRaises(ValueError):
+            user.profile.save()
+        with self.assertRaises(ValueError):
+            user.save()
+
+    def test_cached_identity_leaves_the_password_out(self):
+        cache.delete(identity_key(self.user.id))
+        get_identity(self.user.id)
+        cached = cache.get(identity_key(self.user.id))
+        self.assertNotIn('password', cached.__dict__)
+        self.assertTrue(cached.check_password('pass12345!'))
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ProfileSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_user('admin@example.com', is_staff=True, full_name='Admin')
+        cls.ahmed = create_user('ahmed@example.com', full_name='أَحْمَد إبراهيم')
+        cls.mostafa = create_user('m.ali@example.com', full_name='مصطفى علي')
+        cls.hidden = create_user('hidden@example.com', full_name='احمد مخفي')
+        cls.hidden.profile.is_private = True
+        cls.hidden.profile.save()
+
+    def setUp(self):
+        response = self.client.post(
+            '/users/token/', {'email': self.admin.email, 'password': 'pass12345!'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def search(self, value):
+        response = self.client.get('/users/all/search/', {'value': value})
+        self.assertEqual(response.status_code, 200)
+        return [user['email'] for user in response.json()['results']]
+
+    def test_normalize_arabic(self):
+        self.assertEqual(normalize_arabic('أَحْمَد إبراهيم مصطفى فاطمة'), normalize_arabic('احمد ابراهيم مصطفي فاطمه'))
+        self.assertEqual(normalize_arabic('ALI'), 'ali')
+
+    def test_ignores_diacritics_and_letter_variants(self):
+        self.assertEqual(self.search('احمد'), [self.ahmed.email])
+        self.assertEqual(self.search('ابراهيم'), [self.ahmed.email])
+        self.assertEqual(self.search('مصطفي'), [self.mostafa.email])
+        self.assertEqual(self.search('M.ALI@'), [self.mostafa.email])
+        self.assertEqual(self.search(self.ahmed.profile.profile_id), [self.ahmed.email])
+        self.assertEqual(self.search('zzz'), [])
+
+    def test_index_follows_changes(self):
+        self.mostafa.email = 'mostafa@example.com'
+        self.mostafa.save()
+        self.assertEqual(self.search('mostafa@'), [self.mostafa.email])
+        self.assertEqual(self.search('m.ali@'), [])
+
+        self.ahmed.delete()
+        self.assertEqual(search_profiles('احمد'), [self.hidden.profile.id])
+
+    def test_rebuild_catches_up_with_bulk_writes(self):
+        Profile.objects.filter(id=self.mostafa.profile.id).update(full_name='Renamed Mostafa')
+        self.assertEqual(self.search('renamed'), [])
+        call_command('rebuild_profile_search', stdout=StringIO())
+        self.assertEqual(self.search('renamed'), [self.mostafa.email])
+
+    def test_results_are_ranked_and_limited(self):
+        profiles = [create_user(f'user{i}@example.com', full_name=f'سارة {i}').profile for i in range(3)]
+        exact = create_user('sara@example.com', full_name='سارة').profile
+        ids = search_profiles('ساره')
+        self.assertEqual(set(ids), {exact.id, *(profile.id for profile in profiles)})
+        self.assertEqual(ids[0], exact.id)
+        self.assertEqual(len(search_profiles('ساره', limit=2)), 2)
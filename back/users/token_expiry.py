@@ -1,5 +1,7 @@
+import jwt
+from django.conf import settings
 from django.utils import timezone
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.settings import api_settings
 from .models import Profile, User
 import logging
 
@@ -21,14 +23,20 @@ def force_logout_user(user_id):
     return False
 
 def check_and_handle_expired_token(request):
+    """
+    Whether the request carries an expired refresh token. Only reads: the
+    login itself is cleared by `manage.py sweep_expired_logins`.
+    """
     refresh_token = request.COOKIES.get('refresh_token')
     if refresh_token:
         try:
-            token = RefreshToken(refresh_token)
-            if token.payload.get('exp') < int(timezone.now().timestamp()):
-                user_id = token.payload.get('user_id')
-                if user_id:
-                    return force_logout_user(user_id)
+            payload = jwt.decode(
+                refresh_token,
+                settings.SECRET_KEY,
+                algorithms=[api_settings.ALGORITHM],
+                options={"verify_exp": False}
+            )
+            return payload.get('exp', 0) < int(timezone.now().timestamp())
         except Exception as e:
             logger.error(f"Token validation error: {str(e)}")
     return False
\ No newline at end of file
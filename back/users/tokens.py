@@ -0,0 +1,12 @@
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.settings import api_settings
+
+from .blacklist_filter import blacklist_filter
+
+
+class RefreshToken(tokens.RefreshToken):
+    """RefreshToken that skips the blacklist query for tokens the blacklist filter rules out."""
+
+    def check_blacklist(self):
+        if blacklist_filter.might_contain(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
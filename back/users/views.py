@@ -2,7 +2,7 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework_simplejwt.tokens import RefreshToken
+from .tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.utils.timezone import now
 from django.utils import timezone
@@ -16,18 +16,22 @@ from django.contrib.auth import authenticate
 from rest_framework import generics
 from .models import User
 from api.views import IsStaffOrSuperUser
+from api.pagination import AdminKeysetPagination
 from rest_framework.parsers import MultiPartParser, FormParser, FileUploadParser
 from django.conf import settings
+import hashlib
 import json
 import logging
 from rest_framework.parsers import JSONParser
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from io import BytesIO
-from .auth_utils import force_logout_user
-import jwt
-from rest_framework_simplejwt.settings import api_settings
+from .auth_utils import expired_logins
+from .identity import invalidate_identity
+from .search import in_order, search_profiles
 from django.db.models import Q, Value
 from django.db.models.functions import Concat
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
 
 
 
@@ -40,7 +44,8 @@ class CustomTokenObtainPairView(TokenObtainPairView):
             user = User.objects.get(email=email)
             profile = Profile.objects.get(user=user)
 
-            if profile.is_logged_in:
+            # a login that expired but wasn't swept yet doesn't block a new one
+            if profile.is_logged_in and not expired_logins().filter(pk=profile.pk).exists():
                 return Response(
                     {
                         "error": "هذا الحساب قيد الاستخدام حالياً من شخص آخر، لا يمكنك استخدامه."
@@ -143,26 +148,8 @@ class CustomTokenRefreshView(TokenRefreshView):
             return response
 
         except (TokenError, InvalidToken) as e:
+            # the login itself is cleared by `manage.py sweep_expired_logins`
             logger.error(f"Refresh token error: {str(e)}")
-            
-            try:
-                try:
-                    payload = jwt.decode(
-                        refresh_token,
-                        settings.SECRET_KEY,
-                        algorithms=[api_settings.ALGORITHM],
-                        options={"verify_exp": False}  # نفك التوكن حتى لو منتهي
-                    )
-                    user_id = payload.get("user_id")
-                    if user_id:
-                        force_logout_user(User.objects.get(id=user_id))
-                except Exception as decode_error:
-                    logger.error(f"Couldn't decode token payload: {decode_error}")
-
-                if user_id:
-                    force_logout_user(User.objects.get(id=user_id))
-            except Exception as e:
-                logger.error(f"Error updating user status: {str(e)}")
 
             response = Response(
                 {"error": "Refresh token expired or invalid, please login again."},
@@ -182,14 +169,7 @@ class CustomTokenRefreshView(TokenRefreshView):
 
         except Exception as e:
             logger.error(f"Error during token refresh: {str(e)}", exc_info=True)
-            try:
-                token = RefreshToken(refresh_token)
-                user_id = token.payload.get('user_id')
-                if user_id:
-                    force_logout_user(User.objects.get(id=user_id))
-            except Exception as e:
-                logger.error(f"Error updating user status: {str(e)}")
-            
+
             response = Response(
                 {"error": "An error occurred during token refresh"},
                 status=status.HTTP_400_BAD_REQUEST,
@@ -315,44 +295,49 @@ class LogoutView(APIView):
 
 
 class CheckAuthView(APIView):
+    """
+    Identity, role flags and the lean profile (with its version); `?full=1`
+    returns the whole ProfileSerializer instead. Responses carry a strong
+    ETag over their content, so an unchanged answer costs a 304.
+    """
+    # authenticated below, so a bad token still gets {"authenticated": false}
+    authentication_classes = []
+
     def get(self, request):
         auth = CookieJWTAuthentication()
         try:
             user_auth_tuple = auth.authenticate(request)
             
             if user_auth_tuple is None:
-                refresh_token = request.COOKIES.get(settings.SIMPLE_JWT['AUTH_COOKIE_REFRESH'])
-                if refresh_token:
-                    try:
-                        token = RefreshToken(refresh_token)
-                        if token.payload.get('exp') < int(timezone.now().timestamp()):
-                            user_id = token.payload.get('user_id')
-                            if user_id:
-                                force_logout_user(User.objects.get(id=user_id))
-                    except Exception:
-                        pass
-                
                 return Response(
                     {"authenticated": False}, 
                     status=status.HTTP_401_UNAUTHORIZED
                 )
 
             user, _ = user_auth_tuple
-            profile = get_object_or_404(Profile, user=user)
-            profile_data = ProfileSerializer(profile, context={"request": request}).data
-
-            return Response(
-                {
-                    "authenticated": True,
-                    "user": {
-                        "id": user.id,
-                        "email": user.email,
-                        "is_superuser": user.is_superuser,
-                        "is_staff": user.is_staff,
-                        "profile": profile_data,
-                    },
-                }
-            )
+            profile = user.profile
+            serializer_class = ProfileSerializer if request.query_params.get('full') == '1' else ProfileSerializerForAuth
+            profile_data = serializer_class(profile, context={"request": request}).data
+
+            data = {
+                "authenticated": True,
+                "user": {
+                    "id": user.id,
+                    "email": user.email,
+                    "is_superuser": user.is_superuser,
+                    "is_staff": user.is_staff,
+                    "profile": profile_data,
+                },
+            }
+            etag = quote_etag(hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest())
+            if etag in parse_etags(request.headers.get('If-None-Match', '')):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                response = Response(data)
+            response['ETag'] = etag
+            response['Cache-Control'] = 'private, no-cache'
+            patch_vary_headers(response, ('Cookie', 'Authorization'))
+            return response
         except Exception as e:
             logger.error(f"Error in CheckAuthView: {str(e)}")
             return Response(
@@ -434,27 +419,30 @@ def get_device_info(request):
 class UsersList(generics.ListAPIView):
     permission_classes = [IsAuthenticated,IsStaffOrSuperUser]
     serializer_class = UserSerializerForAdmin
+    pagination_class = AdminKeysetPagination
     queryset = User.objects.all()
     
     def get_queryset(self):
-        return User.objects.filter(profile__is_private = False)
+        return User.objects.filter(profile__is_private = False).select_related('profile')
     
 class SearchUsersList(generics.ListAPIView):
     permission_classes = [IsAuthenticated, IsStaffOrSuperUser]
     serializer_class = UserSerializerForAdmin
+    pagination_class = AdminKeysetPagination
 
     def get_queryset(self):
-        value = self.request.query_params.get('value', '').strip()
-        queryset = User.objects.filter(profile__is_private=False)
-
-        if value:
-            queryset = queryset.filter(
-                Q(profile__full_name__icontains=value) |
-                Q(email__icontains=value) |
-                Q(profile__profile_id__icontains=value)
-            )
-
-        return queryset
+        return User.objects.filter(profile__is_private=False).select_related('profile')
+
+    def list(self, request, *args, **kwargs):
+        value = request.query_params.get('value', '').strip()
+        if not value:
+            return super().list(request, *args, **kwargs)
+        # ranked matches from the search index, one page of them
+        profile_ids = search_profiles(
+            value, Profile.objects.filter(is_private=False), limit=self.paginator.get_page_size(request)
+        )
+        users = in_order(self.get_queryset().filter(profile__id__in=profile_ids), profile_ids, key=lambda user: user.profile.id)
+        return Response({'next': None, 'results': self.get_serializer(users, many=True).data})
     
     
 # reset passwords to all users from admin
@@ -502,7 +490,9 @@ class DeactivateNonAdminProfilesView(APIView):
             user__is_staff=False,
             is_active=True
         )
+        user_ids = list(profiles.values_list('user_id', flat=True))
         updated_count = profiles.update(is_active=False)
+        invalidate_identity(*user_ids)
 
         return Response(
             {"detail": f"{updated_count} profile(s) deactivated."},
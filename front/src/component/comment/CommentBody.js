@@ -20,9 +20,36 @@ export default function Comment({ comment_id, author, video_id, is_liked_by_user
     const [expandedReplaysForm, setExpandedReplaysForm] = useState(false);
     const [repliesList, setRepliesList] = useState(replies);
     const [repliesCountDefault, setRepliesCountDefault] = useState(replies_count);
+    // comments come with a preview of their replies; the rest is paged in on demand
+    const [repliesFetched, setRepliesFetched] = useState(false);
+    const [repliesNext, setRepliesNext] = useState(null);
+
+    const getReplies = () => {
+        axiosInstance.get(`/api/comment/${comment_id}/replies`)
+            .then((response) => {
+                setRepliesList(response.data.results);
+                setRepliesNext(response.data.next);
+                setRepliesFetched(true);
+            })
+            .catch((error) => console.log(error));
+    }
+
+    const loadMoreReplies = () => {
+        axiosInstance.get(repliesNext)
+            .then((response) => {
+                setRepliesList(prev => [...prev, ...response.data.results]);
+                setRepliesNext(response.data.next);
+            })
+            .catch((error) => console.log(error));
+    }
 
     const toggleExpand = () => setExpanded(!expanded);
-    const toggleExpandReplays = () => setExpandedReplays(!expandedReplays);
+    const toggleExpandReplays = () => {
+        if (!expandedReplays && !repliesFetched && repliesCountDefault > repliesList.length) {
+            getReplies();
+        }
+        setExpandedReplays(!expandedReplays);
+    };
     const toggleExpandedReplaysForm = () => setExpandedReplaysForm(!expandedReplaysForm);
 
     const handleReplyAdded = (newReply) => {
@@ -141,7 +168,7 @@ export default function Comment({ comment_id, author, video_id, is_liked_by_user
                 </div>
             )}
 
-            {repliesList.length > 0 && (
+            {repliesCountDefault > 0 && (
                 <div className="flex items-center space-x-2 ps-4">
                     <Button
                         style={{ fontSize: '1.1em', color: '#3EA6FF', cursor: 'pointer' }}
@@ -186,6 +213,21 @@ export default function Comment({ comment_id, author, video_id, is_liked_by_user
                             changeCommentCount={changeCommentCount}
                         />
                     ))}
+                    {repliesNext && (
+                        <Button
+                            onClick={loadMoreReplies}
+                            sx={{
+                                textTransform: "none",
+                                color: "var(--main-50)",
+                                fontSize: "13px",
+                                fontWeight: "bold",
+                                "&:hover": { backgroundColor: "transparent", textDecoration: 'underline' },
+                            }}
+                        >
+                            رؤية المزيد
+                            <ExpandMoreIcon fontSize="small" />
+                        </Button>
+                    )}
                 </div>
             )}
         </>
@@ -101,7 +101,28 @@ TablePaginationActions.propTypes = {
 function Row(props) {
     const { row } = props;
     const [open, setOpen] = React.useState(false);
+    const [videos, setVideos] = React.useState([]);
+    const [videosNext, setVideosNext] = React.useState(null);
 
+    // videos are loaded only when the row is expanded (and again whenever the course list is refreshed)
+    React.useEffect(() => {
+        if (!open) return;
+        axiosInstance.get(`/api/admin/courses/course/${row.id}/videos`)
+            .then((response) => {
+                setVideos(response.data.results);
+                setVideosNext(response.data.next);
+            })
+            .catch((error) => console.log(error));
+    }, [open, row]);
+
+    const loadMoreVideos = () => {
+        axiosInstance.get(videosNext)
+            .then((response) => {
+                setVideos(prev => [...prev, ...response.data.results]);
+                setVideosNext(response.data.next);
+            })
+            .catch((error) => console.log(error));
+    }
 
     return (
         <React.Fragment>
@@ -123,8 +144,8 @@ function Row(props) {
                 }</TableCell>
                 <TableCell sx={{ fontSize: '1.1rem', whiteSpace: 'nowrap' }} align="right"><span>{formatDate(row.created_dt)}</span></TableCell>
                 <TableCell sx={{ fontSize: '1.1rem', whiteSpace: 'nowrap' }} align="right"><span>{formatDate(row.update_dt)}</span></TableCell>
-                <TableCell sx={{ fontSize: '1.1rem', whiteSpace: 'nowrap' }} align="right"><span>{row.videos.length}</span></TableCell>
-                <TableCell sx={{ fontSize: '1.1rem', whiteSpace: 'nowrap' }} align="right"><span>{row.subscribers.length}</span></TableCell>
+                <TableCell sx={{ fontSize: '1.1rem', whiteSpace: 'nowrap' }} align="right"><span>{row.videos_count}</span></TableCell>
+                <TableCell sx={{ fontSize: '1.1rem', whiteSpace: 'nowrap' }} align="right"><span>{row.subscribers_count}</span></TableCell>
                 <TableCell sx={{ fontSize: '1.1rem', whiteSpace: 'nowrap' }} align="right">
                     <Tooltip component={Link} to={`/courses/course/${row.id}/edit`} title="تعديل">
                         <IconButton aria-label="edit">
@@ -146,7 +167,7 @@ function Row(props) {
                 <TableCell style={{ paddingBottom: 0, paddingTop: 0 }} colSpan={10}>
                     <Collapse in={open} timeout="auto" unmountOnExit>
                         {
-                            row.videos.length === 0 ? <Box className='w-100 text-end m-2' style={{ fontSize: '1.2rem' }}>لا يوجد فيديوهات في هذا االكورس</Box>
+                            row.videos_count === 0 ? <Box className='w-100 text-end m-2' style={{ fontSize: '1.2rem' }}>لا يوجد فيديوهات في هذا االكورس</Box>
                                 :
                                 <Box sx={{ margin: 1 }}>
                                     <Typography sx={{ fontSize: '1.1rem', fontWeight: 'bold' }} align="right" variant="h6" gutterBottom component="div">
@@ -167,7 +188,7 @@ function Row(props) {
                                             </TableRow>
                                         </TableHead>
                                         <TableBody>
-                                            {row.videos.map((video, i) => {
+                                            {videos.map((video, i) => {
                                                 const handleSwap = async (direction) => {
                                                     try {
                                                         props.setLoadingDelete(true);
@@ -197,7 +218,7 @@ function Row(props) {
                                                                 </IconButton>
                                                                 <IconButton
                                                                     onClick={() => handleSwap('down')}
-                                                                    disabled={video.priority === row.videos.length}
+                                                                    disabled={video.priority === row.videos_count}
                                                                     color="primary"
                                                                     title='تحريك لأسفل'
                                                                 >
@@ -229,7 +250,7 @@ function Row(props) {
                                                         <TableCell sx={{ fontSize: '1.1rem', whiteSpace: 'nowrap' }} component="th" scope="row" align="right">{formatDate(video.created_dt)}</TableCell>
                                                         <TableCell sx={{ fontSize: '1.1rem', whiteSpace: 'nowrap' }} component="th" scope="row" align="right">{formatDate(video.update_dt)}</TableCell>
                                                         <TableCell sx={{ fontSize: '1.1rem', whiteSpace: 'nowrap' }} component="th" scope="row" align="right">{video.likes_count}</TableCell>
-                                                        <TableCell sx={{ fontSize: '1.1rem', whiteSpace: 'nowrap' }} component="th" scope="row" align="right">{video.more_info.views.length}</TableCell>
+                                                        <TableCell sx={{ fontSize: '1.1rem', whiteSpace: 'nowrap' }} component="th" scope="row" align="right">{video.more_info.views}</TableCell>
                                                         <TableCell sx={{ fontSize: '1.1rem', whiteSpace: 'nowrap' }} align="right">
                                                             <Tooltip component={Link} to={`/courses/${row.title}/${video.id}`} title="مشاهدة">
                                                                 <IconButton aria-label="edit">
@@ -257,6 +278,11 @@ function Row(props) {
                                             )}
                                         </TableBody>
                                     </Table>
+                                    {videosNext && (
+                                        <Box className='d-flex justify-content-center my-2'>
+                                            <Button variant="outlined" onClick={loadMoreVideos}>تحميل المزيد</Button>
+                                        </Box>
+                                    )}
                                 </Box>
                         }
                     </Collapse>
@@ -269,6 +295,7 @@ function Row(props) {
 
 export default function AllCourses() {
     const [coursesData, setCourseData] = React.useState([]);
+    const [coursesNext, setCoursesNext] = React.useState(null);
 
     const [page, setPage] = React.useState(0);
     const [rowsPerPage, setRowsPerPage] = React.useState(10);
@@ -328,13 +355,22 @@ export default function AllCourses() {
         setLoading(true);
         axiosInstance.get('/api/admin/courses_list')
             .then((response) => {
-                setCourseData(response.data);
-                console.log(response.data);
+                setCourseData(response.data.results);
+                setCoursesNext(response.data.next);
             })
             .catch((error) => console.log(error))
             .finally(() => setLoading(false));
     }
 
+    const loadMoreCourses = () => {
+        axiosInstance.get(coursesNext)
+            .then((response) => {
+                setCourseData(prev => [...prev, ...response.data.results]);
+                setCoursesNext(response.data.next);
+            })
+            .catch((error) => console.log(error));
+    }
+
     const [searchQuery, setSearchQuery] = React.useState('');
     const handleSearchChange = async (e) => {
         let value = e.target.value;
@@ -342,7 +378,8 @@ export default function AllCourses() {
         setLoading(true);
         try {
             const response = await axiosInstance.get(`/api/admin/courses_list/search/`, { params: { value } });
-            setCourseData(response.data);
+            setCourseData(response.data.results);
+            setCoursesNext(response.data.next);
         } catch (error) {
             handleClickVariant('لقد حدث خطأ لايمكن الحصول علي نتيجة', 'error');
         } finally {
@@ -433,6 +470,9 @@ export default function AllCourses() {
                                     </TableRow>
                                 </TableFooter>
                             </Table>
+                            {coursesNext && (
+                                <Button onClick={loadMoreCourses} sx={{ width: '100%' }} variant="text">تحميل المزيد</Button>
+                            )}
                         </TableContainer>
                         :
                         <NoVideos imgStyle={{ width: '200px' }} msg={searchQuery ? "لايوجد كورس بهذا الإسم" : "لايوجد كورسات حتي الأن"} />
@@ -40,8 +40,8 @@ export const AddSubscription = () => {
     const getCourses = React.useCallback(async () => {
         setLoadingData(true);
         try {
-            const res = await axiosInstance.get('api/admin/courses/subscriptions/allCourses');
-            setAllCourses(res.data);
+            const res = await axiosInstance.get('api/admin/courses/subscriptions/allCourses', { params: { page_size: 500 } });
+            setAllCourses(res.data.results);
         } catch {
             handleClickVariant('لقد حدث خطأ اعد تحميل الصفحة', 'error');
         }
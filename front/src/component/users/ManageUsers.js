@@ -215,6 +215,7 @@ export default function ManageUsers() {
   const { user } = React.useContext(AuthContext);
 
   const [usersData, setUsersData] = React.useState([]);
+  const [usersNext, setUsersNext] = React.useState(null);
   const [searchQuery, setSearchQuery] = React.useState('');
   // pagination
   const [page, setPage] = React.useState(0);
@@ -289,12 +290,22 @@ export default function ManageUsers() {
     setLoading(true);
     axiosInstance.get('/users/all')
       .then((response) => {
-        setUsersData(response.data);
+        setUsersData(response.data.results);
+        setUsersNext(response.data.next);
       })
       .catch((error) => console.log(error))
       .finally(() => setLoading(false));
   }
 
+  const loadMoreUsers = () => {
+    axiosInstance.get(usersNext)
+      .then((response) => {
+        setUsersData(prev => [...prev, ...response.data.results]);
+        setUsersNext(response.data.next);
+      })
+      .catch((error) => console.log(error));
+  }
+
   // edit user dialog
   const [isAdmin, setIsAdmin] = React.useState(false);
   const [isAssistant, setIsAssistant] = React.useState(false);
@@ -336,7 +347,8 @@ export default function ManageUsers() {
     setLoading(true);
     try {
       const response = await axiosInstance.get(`/users/all/search/`, { params: { value } });
-      setUsersData(response.data);
+      setUsersData(response.data.results);
+      setUsersNext(response.data.next);
     } catch (error) {
       handleClickVariant('لقد حدث خطأ لايمكن الحصول علي نتيجة', 'error');
     } finally {
@@ -571,6 +583,9 @@ export default function ManageUsers() {
                         </TableRow>
                       </TableFooter>
                     </Table>
+                    {usersNext && (
+                      <Button onClick={loadMoreUsers} sx={{ width: '100%' }} variant="text">تحميل المزيد</Button>
+                    )}
                   </TableContainer>
                   <Stack direction="row" spacing={0} sx={{ width: '100%', marginTop: '15px', display: 'flex', gap: '10px', justifyContent: 'end' }}>
                     <Button onClick={()=>handleClickedActionToAll('delete')} sx={{ fontSize: '1rem' }} dir='ltr' variant="outlined" color="error" startIcon={<DeleteIcon />}>
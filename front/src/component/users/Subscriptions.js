@@ -203,6 +203,7 @@ export default function Subscriptions() {
   const [loading, setLoading] = React.useState(true);
   const [loadingUpdate, setLoadingUpdate] = React.useState(false);
   const [subscriptions, setSubscriptions] = React.useState([]);
+  const [subscriptionsNext, setSubscriptionsNext] = React.useState(null);
   const [clickedSubscriptions, setClickedSubscriptions] = React.useState(null);
   const [clickAction, setClickAction] = React.useState({
     activations: false,
@@ -274,7 +275,8 @@ export default function Subscriptions() {
     try {
       const res = await axiosInstance.get('api/admin/courses/subscriptions/');
       if (res.status === 200) {
-        setSubscriptions(res.data);
+        setSubscriptions(res.data.results);
+        setSubscriptionsNext(res.data.next);
       } else {
         handleClickVariant('حدث خطأ ما', 'error');
       }
@@ -285,6 +287,16 @@ export default function Subscriptions() {
     }
   }
 
+  const loadMoreSubscriptions = async () => {
+    try {
+      const res = await axiosInstance.get(subscriptionsNext);
+      setSubscriptions(prev => [...prev, ...res.data.results]);
+      setSubscriptionsNext(res.data.next);
+    } catch (error) {
+      handleClickVariant('حدث خطأ ما', 'error');
+    }
+  }
+
   const [searchQuery, setSearchQuery] = React.useState('');
   const handleSearchChange = async (e) => {
     let value = e.target.value;
@@ -292,7 +304,8 @@ export default function Subscriptions() {
     setLoading(true);
     try {
       const response = await axiosInstance.get(`api/admin/courses/subscriptions/search/`, { params: { value } });
-      setSubscriptions(response.data);
+      setSubscriptions(response.data.results);
+      setSubscriptionsNext(response.data.next);
     } catch (error) {
       handleClickVariant('لقد حدث خطأ لايمكن الحصول علي نتيجة', 'error');
     } finally {
@@ -395,6 +408,9 @@ export default function Subscriptions() {
                   </TableRow>
                 </TableFooter>
               </Table>
+              {subscriptionsNext && (
+                <Button onClick={loadMoreSubscriptions} sx={{ width: '100%' }} variant="text">تحميل المزيد</Button>
+              )}
             </TableContainer>
             :
             <NoVideos imgStyle={{ width: '200px' }} msg={searchQuery ? "لا يوجد مشتركين بهذه المعلومات" : "ل ايوجد  إشتراكات حتي الأن"} />
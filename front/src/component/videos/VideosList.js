@@ -45,7 +45,7 @@ function Media({ videos, data_loading, ...props }) {
                     <Avatar sx={{ width: 22, height: 22 }} src={item.author.avatar} />{item.author.full_name ? item.author.full_name : item.author.profile_id}
                   </Typography>
                   <Typography dir={'rtl'} variant="caption" sx={{ color: 'text.secondary' }}>
-                    {`${item.more_info.views.length} مشاهدة • ${formatYoutubeTime(item.created_dt)}`}
+                    {`${item.more_info.views} مشاهدة • ${formatYoutubeTime(item.created_dt)}`}
                   </Typography>
                 </Box>
               ) : (
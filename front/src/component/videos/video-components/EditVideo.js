@@ -191,7 +191,7 @@ export default function EditVideo() {
                                     {videoData.author.full_name || videoData.author.profile_id}
                                 </Typography>
                                 <Typography className='d-flex gap-1' variant="caption" sx={{ color: 'text.secondary' }}>
-                                    <span dir='rtl'>{`${videoData.more_info.views.length}`} مشاهدة</span>
+                                    <span dir='rtl'>{`${videoData.more_info.views}`} مشاهدة</span>
                                     •
                                     <span>{`${formatYoutubeTime(videoData.created_dt)}`}</span>
                                 </Typography>
@@ -1,6 +1,6 @@
 import React, { useEffect, useState, useCallback } from 'react';
 import './video.css';
-import { Breadcrumbs, Skeleton, Typography } from '@mui/material';
+import { Breadcrumbs, Button, Skeleton, Typography } from '@mui/material';
 import { Link, useParams } from 'react-router-dom';
 import { CommentForm } from '../../comment/CommentForm';
 import axiosInstance from '../../../Axios';
@@ -39,6 +39,7 @@ export default function VideoPage() {
     mainData: {},
     recommendations: [],
     comments: [],
+    commentsNext: null,
     commentsCount: 0
   });
 
@@ -67,7 +68,7 @@ export default function VideoPage() {
       setVideoData(prev => ({
         ...prev,
         mainData: response.data,
-        views: response.data.more_info.views.length
+        views: response.data.more_info.views
       }));
       setErrors(prev => ({ ...prev, video: null }));
     } catch (error) {
@@ -88,10 +89,12 @@ export default function VideoPage() {
     setLoadingStates(prev => ({ ...prev, comments: true }));
     try {
       const response = await axiosInstance.get(`api/video/${video_id}/comments`);
+      const { results, next } = response.data;
       setVideoData(prev => ({
         ...prev,
-        comments: response.data,
-        commentsCount: response.data.length > 0 ? response.data[0].total_comments : 0
+        comments: results,
+        commentsNext: next,
+        commentsCount: results.length > 0 ? results[0].total_comments : 0
       }));
       setErrors(prev => ({ ...prev, comments: null }));
     } catch (error) {
@@ -101,6 +104,21 @@ export default function VideoPage() {
     }
   }, [video_id]);
 
+  const loadMoreComments = useCallback(async () => {
+    if (!videoData.commentsNext) return;
+    try {
+      const response = await axiosInstance.get(videoData.commentsNext);
+      const { results, next } = response.data;
+      setVideoData(prev => ({
+        ...prev,
+        comments: [...prev.comments, ...results],
+        commentsNext: next
+      }));
+    } catch (error) {
+      setErrors(prev => ({ ...prev, comments: "Can't get comments..!" }));
+    }
+  }, [videoData.commentsNext]);
+
   const RetrieveUpdateVideoViews = useCallback(async () => {
     try {
       const response = await axiosInstance.patch(`api/video/${video_id}/views`);
@@ -244,6 +262,11 @@ export default function VideoPage() {
                 لايوجد تعليقات علي هذا الفيديو
               </span>
             )}
+            {videoData.commentsNext && (
+              <Button variant="text" onClick={loadMoreComments}>
+                عرض المزيد من التعليقات
+              </Button>
+            )}
           </div>
         </div>
       </>
@@ -317,7 +340,7 @@ export default function VideoPage() {
                     <p className='title'>{recommend.title}</p>
                     <span className='author'>{recommend.author}</span>
                     <Typography dir={'rtl'} className='more-info' variant="caption" sx={{ color: 'text.secondary' }}>
-                      {`${recommend.more_info.views.length} مشاهدة • ${formatYoutubeTime(recommend.created_dt)}`}
+                      {`${recommend.more_info.views} مشاهدة • ${formatYoutubeTime(recommend.created_dt)}`}
                     </Typography>
                   </div>
                 </Link>